@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import threading
+from typing import List, Optional
+from blockchain import Blockchain
+from network import P2PNetwork, SENT_BYTES, SENT_MESSAGES, count_frame
+from protocol import FRAME_HEADER, MESSAGE_NAMES, TYPE_MASK, encode_frame_header, frame_limit
+
+log = logging.getLogger(__name__)
+
+
+class AsyncPeer:
+    """asyncio 스트림 하나와 그 피어의 송신 큐"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, address, queue_size: int):
+        self.reader = reader
+        self.writer = writer
+        self.address = address
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer_task: Optional[asyncio.Task] = None
+
+
+class AsyncP2PNetwork(P2PNetwork):
+    """피어당 스레드 대신 하나의 asyncio 이벤트 루프로 모든 연결을 처리하는 P2P 네트워크
+
+    start/connect_to_peer/broadcast_message/close 는 P2PNetwork 와 같은 동기 인터페이스이며,
+    이벤트 루프는 별도 데몬 스레드에서 실행된다. queue_size 외의 키워드 인자 (announce, compact,
+    wire_cache_bytes 등) 는 그대로 P2PNetwork 로 전달된다.
+
+    역압 정책: 전송은 피어별 송신 큐에 프레임을 넣기만 하고 기다리지 않는다. 큐가 queue_size 개로
+    가득 찬 피어는 다른 피어로의 전파를 막지 않도록 그 자리에서 연결을 끊으며, 끊긴 피어는 다시
+    연결해 헤더 동기화로 빠진 블록을 받아야 한다.
+    """
+
+    def __init__(self, host: str, port: int, blockchain: Blockchain, queue_size: int = 1000, **kwargs):
+        super().__init__(host, port, blockchain, **kwargs)
+        self.queue_size = queue_size  # 피어별 송신 대기 프레임 수 제한
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def start(self):
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(128)
+        log.info("P2P 네트워크 시작됨 (asyncio) - %s:%d", self.host, self.port)
+
+        self.loop_thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_server(), self.loop).result()
+
+    async def _start_server(self):
+        self.server = await asyncio.start_server(self._on_connection, sock=self.server_socket)
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        address = writer.get_extra_info("peername")
+        log.info("새로운 피어 연결됨: %s", address)
+        peer = self._add_peer(reader, writer, address)
+        await self._read_loop(peer)
+
+    def connect_to_peer(self, host: str, port: int):
+        try:
+            asyncio.run_coroutine_threadsafe(self._connect(host, port), self.loop).result()
+        except Exception as e:
+            log.warning("피어 연결 실패: %s", e)
+
+    async def _connect(self, host: str, port: int):
+        reader, writer = await asyncio.open_connection(host, port)
+        peer = self._add_peer(reader, writer, (host, port))
+        log.info("피어에 연결됨: %s:%d", host, port)
+        self.loop.create_task(self._read_loop(peer))
+
+        # 인코딩 협상 후 새로 연결된 피어와 블록체인 동기화
+        self.send_hello(peer)
+        self.sync_blockchain(peer)
+
+    def _add_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, address) -> AsyncPeer:
+        peer = AsyncPeer(reader, writer, address, self.queue_size)
+        peer.writer_task = self.loop.create_task(self._write_loop(peer))
+        self.peers.append({"socket": peer, "address": address})
+        return peer
+
+    async def _read_loop(self, peer: AsyncPeer):
+        try:
+            while True:
+                header = await peer.reader.readexactly(FRAME_HEADER.size)
+                length, type_code = FRAME_HEADER.unpack(header)
+                if type_code & TYPE_MASK not in MESSAGE_NAMES or length > frame_limit(type_code):
+                    raise ValueError(f"잘못된 프레임 헤더: 길이 {length}, 타입 {type_code}")
+                message = await peer.reader.readexactly(length)
+
+                # 체인 검증 등 무거운 처리가 루프를 막지 않도록 executor 에서 실행.
+                # 처리가 끝날 때까지 다음 프레임을 읽지 않으므로 수신 측 backpressure 도 유지된다.
+                await self.loop.run_in_executor(None, self.process_message, message, peer, type_code)
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            log.warning("피어 %s 처리 중 오류: %s", peer.address, e)
+        finally:
+            self._remove_peer(peer)
+
+    async def _write_loop(self, peer: AsyncPeer):
+        try:
+            while True:
+                frame = await peer.queue.get()
+                peer.writer.write(frame)
+                # 큐에 쌓인 프레임은 한 번에 쓰고 drain 으로 전송 버퍼가 빠질 때까지 대기
+                while not peer.queue.empty():
+                    peer.writer.write(peer.queue.get_nowait())
+                await peer.writer.drain()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            log.warning("피어 %s 전송 중 오류: %s", peer.address, e)
+            self._remove_peer(peer)
+
+    def _enqueue(self, peer: AsyncPeer, frame: bytes):
+        try:
+            peer.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # 송신 큐가 가득 찬 느린 피어는 다른 피어를 막지 않도록 연결 해제
+            log.warning("피어 %s 송신 큐 초과, 연결 해제", peer.address)
+            self._remove_peer(peer)
+            return
+        count_frame(SENT_BYTES, SENT_MESSAGES, frame[FRAME_HEADER.size - 1], len(frame))
+
+    def _enqueue_all(self, frame: bytes, exclude_socket=None):
+        for entry in list(self.peers):
+            if entry["socket"] is not exclude_socket:
+                self._enqueue(entry["socket"], frame)
+
+    def send_frame(self, peer_socket: AsyncPeer, frame: bytes):
+        """어느 스레드에서 호출해도 이벤트 루프의 피어 송신 큐에 넣음"""
+        self.loop.call_soon_threadsafe(self._enqueue, peer_socket, frame)
+
+    def send_frame_parts(self, peer_socket: AsyncPeer, message_type: str, parts: List[bytes], flags: int = 0):
+        """조각을 하나의 프레임으로 합쳐 송신 큐에 넣음 (스트림 writer 에는 sendmsg 가 없음)"""
+        payload = b"".join(parts)
+        self.send_frame(peer_socket, encode_frame_header(message_type, len(payload), flags) + payload)
+
+    def broadcast_frame(self, frame: bytes, exclude_socket=None):
+        # 같은 bytes 객체를 모든 피어 큐에 넣고 각 피어의 writer 태스크가 동시에 전송
+        self.loop.call_soon_threadsafe(self._enqueue_all, frame, exclude_socket)
+
+    def remove_peer(self, peer_socket: AsyncPeer):
+        self.loop.call_soon_threadsafe(self._remove_peer, peer_socket)
+
+    def _remove_peer(self, peer: AsyncPeer):
+        if not any(entry["socket"] is peer for entry in self.peers):
+            return
+        self.peers = [entry for entry in self.peers if entry["socket"] is not peer]
+        self.sync_states.pop(peer, None)
+        self.backfill_states.pop(peer, None)
+        self.peer_encodings.pop(peer, None)
+        self.hello_sent.discard(peer)
+        if peer.writer_task:
+            peer.writer_task.cancel()
+        peer.writer.close()
+
+    def close(self):
+        if not self.loop.is_running():
+            self.server_socket.close()
+            return
+        asyncio.run_coroutine_threadsafe(self._close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+
+    async def _close(self):
+        if self.server:
+            self.server.close()
+        for entry in list(self.peers):
+            self._remove_peer(entry["socket"])
+        self.server_socket.close()
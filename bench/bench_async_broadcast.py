@@ -0,0 +1,98 @@
+"""200개 이상의 모의 피어에 대한 브로드캐스트 지연 및 연결당 메모리
+
+실행: python -m bench.bench_async_broadcast [--peers 200] [--impl async|thread] [--slow-peers 0] [--seed 1]
+"""
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+from async_network import AsyncP2PNetwork
+from blockchain import Blockchain
+from network import P2PNetwork
+from protocol import FRAME_HEADER
+from bench.workload import load_wallets, signed_transactions
+
+
+async def run_clients(port: int, peers: int, slow_peers: int, node, messages, timeout: float):
+    connections = []
+    for i in range(peers):
+        reader, writer = await asyncio.open_connection("localhost", port)
+        connections.append((reader, writer, i < slow_peers))
+    while len(node.peers) < peers:
+        await asyncio.sleep(0.01)
+
+    async def receive(reader: asyncio.StreamReader):
+        for _ in messages:
+            header = await reader.readexactly(FRAME_HEADER.size)
+            length, _ = FRAME_HEADER.unpack(header)
+            await reader.readexactly(length)
+        return time.perf_counter()
+
+    # 느린 피어는 수신하지 않고 연결만 유지
+    receivers = [asyncio.ensure_future(receive(reader)) for reader, _, slow in connections if not slow]
+    loop = asyncio.get_running_loop()
+    broadcast_done = loop.create_future()
+
+    def broadcast():
+        # 동기 broadcast_message 를 채굴 스레드처럼 별도 스레드에서 호출 (예외는 시간 초과가 아니라 그대로 전달)
+        try:
+            for message in messages:
+                node.broadcast_message(message)
+        except Exception as e:
+            loop.call_soon_threadsafe(broadcast_done.set_exception, e)
+            return
+        loop.call_soon_threadsafe(broadcast_done.set_result, time.perf_counter())
+
+    start = time.perf_counter()
+    threading.Thread(target=broadcast, daemon=True).start()
+    call_done = await asyncio.wait_for(broadcast_done, timeout)
+    finished = await asyncio.wait_for(asyncio.gather(*receivers), timeout)
+
+    for _, writer, _ in connections:
+        writer.close()
+    return call_done - start, max(finished) - start, sorted(t - start for t in finished)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--peers", type=int, default=200)
+    parser.add_argument("--impl", choices=["async", "thread"], default="async")
+    parser.add_argument("--slow-peers", type=int, default=0)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="느린 피어 때문에 스레드 구현이 멈춘 경우 중단할 시간")
+    args = parser.parse_args()
+
+    # 서명된 트랜잭션 본문을 모든 피어에게 바로 보냄 (announce 모드면 INV 만 전송됨)
+    transactions = signed_transactions(args.seed, args.messages, load_wallets(4))
+    messages = [{"type": "NEW_TRANSACTION", "data": transaction.to_dict()} for transaction in transactions]
+
+    network_class = AsyncP2PNetwork if args.impl == "async" else P2PNetwork
+    tracemalloc.start()
+    node = network_class("localhost", 0, Blockchain(), announce=False)
+    node.start()
+    port = node.server_socket.getsockname()[1]
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    try:
+        call_time, total_time, latencies = asyncio.run(run_clients(
+            port, args.peers, args.slow_peers, node, messages, args.timeout))
+        per_connection = tracemalloc.get_traced_memory()[1] - baseline
+    except asyncio.TimeoutError:
+        print(f"구현: {args.impl}, {args.timeout}s 안에 브로드캐스트가 끝나지 않음 (느린 피어에 막힘)")
+        return
+    finally:
+        node.close()
+
+    print(f"구현: {args.impl}, 피어 {args.peers} (느린 피어 {args.slow_peers}), 메시지 {args.messages} "
+          f"(트랜잭션 {transactions[0].size} 바이트)")
+    print(f"broadcast_message 호출 시간: {call_time * 1e3:.1f} ms")
+    print(f"모든 피어 수신 완료: {total_time * 1e3:.1f} ms "
+          f"(p50 {latencies[len(latencies) // 2] * 1e3:.1f} ms)")
+    print(f"연결당 메모리 (클라이언트 포함, 최대치 기준): {per_connection / args.peers / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
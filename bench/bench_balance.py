@@ -0,0 +1,58 @@
+"""get_balance 조회 시간 벤치마크 (1k ~ 1M 블록)
+
+실행: python -m bench.bench_balance [--max-blocks N]
+"""
+import argparse
+import time
+from blockchain import Blockchain, Block
+from transaction import Transaction
+
+
+def legacy_get_balance(blockchain: Blockchain, address: str) -> float:
+    """인덱스 도입 이전의 전체 체인 순회 방식"""
+    balance = 0
+    for block in blockchain.chain:
+        for transaction in block.transactions:
+            if transaction.sender == address:
+                balance -= transaction.amount
+            if transaction.recipient == address:
+                balance += transaction.amount
+    return balance
+
+
+def time_lookup(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-blocks", type=int, default=1_000_000)
+    parser.add_argument("--legacy-max", type=int, default=100_000,
+                        help="전체 순회 방식을 측정할 최대 블록 수")
+    args = parser.parse_args()
+
+    blockchain = Blockchain()
+    # 메모리 절약을 위해 모든 블록이 같은 트랜잭션 리스트를 공유
+    transactions = [Transaction("network", "miner", 10)]
+
+    size = 1000
+    print(f"{'blocks':>10} {'indexed (us)':>14} {'legacy (us)':>14}")
+    while size <= args.max_blocks:
+        while len(blockchain.chain) < size:
+            previous = blockchain.get_latest_block()
+            block = Block(previous.index + 1, transactions, previous.timestamp, previous.hash)
+            blockchain.append_block(block)
+
+        indexed = time_lookup(lambda: blockchain.get_balance("miner"), 10000)
+        legacy = "-"
+        if size <= args.legacy_max:
+            legacy = f"{time_lookup(lambda: legacy_get_balance(blockchain, 'miner'), 3) * 1e6:14.1f}"
+        print(f"{size:>10} {indexed * 1e6:14.3f} {legacy:>14}")
+        size *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""디스크 블록 저장소 콜드 스타트 시간과 RSS (기본 1M 블록)
+
+실행: python -m bench.bench_block_store [--blocks 1000000] [--datadir bench_data/store]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from blockchain import Blockchain
+from difficulty import DifficultyEngine, difficulty_to_target
+from storage import BlockStore
+from transaction import Transaction
+from bench.workload import genesis_block
+
+
+def bench_difficulty() -> DifficultyEngine:
+    """벤치마크 체인의 난이도 규칙 (검증하는 쪽도 같은 규칙을 써야 함)"""
+    return DifficultyEngine(difficulty_to_target(1))
+
+
+def generate(datadir: str, blocks: int):
+    """datadir 에 blocks 개 블록이 없으면 생성"""
+    store = BlockStore(datadir, fsync_policy="never")
+    if len(store) >= blocks:
+        store.close()
+        return
+    blockchain = Blockchain(store=store, difficulty=bench_difficulty())
+    if len(blockchain.chain) == 1:
+        blockchain.replace_chain([genesis_block(blockchain.difficulty)])
+    while len(blockchain.chain) < blocks:
+        previous = blockchain.get_latest_block()
+        transactions = [Transaction("network", f"miner{previous.index % 100}", 10)]
+        block = blockchain.create_block(transactions, previous.timestamp + blockchain.difficulty.block_time)
+        blockchain.proof_of_work(block)
+        blockchain.append_block(block)
+    blockchain.close()
+
+
+def cold_start(datadir: str, mode: str):
+    """별도 프로세스에서 호출되어 시작 시간과 최대 RSS 를 JSON 으로 출력"""
+    start = time.perf_counter()
+    blockchain = Blockchain(store=BlockStore(datadir), difficulty=bench_difficulty())
+    if mode == "parse":
+        # 비교용: 모든 블록 본문을 읽어 메모리에 올리는 방식 (캐시 한도 안의 블록은 메모리에 남음)
+        for height in range(len(blockchain.chain)):
+            blockchain.chain[height]
+    elapsed = time.perf_counter() - start
+    balance = blockchain.get_balance("miner0")
+    print(json.dumps({
+        "mode": mode,
+        "blocks": len(blockchain.chain),
+        "seconds": elapsed,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "balance": balance
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    parser.add_argument("--datadir", default=os.path.join("bench_data", "store"))
+    parser.add_argument("--cold-start", choices=["lazy", "parse"])
+    args = parser.parse_args()
+
+    if args.cold_start:
+        cold_start(args.datadir, args.cold_start)
+        return
+
+    start = time.perf_counter()
+    generate(args.datadir, args.blocks)
+    print(f"저장소 준비: {time.perf_counter() - start:.1f}s")
+    for mode in ("lazy", "parse"):
+        output = subprocess.run(
+            [sys.executable, "-m", "bench.bench_block_store", "--datadir", args.datadir, "--cold-start", mode],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>6}: {result['blocks']} 블록, {result['seconds']:.2f}s, RSS {result['max_rss_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
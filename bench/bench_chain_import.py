@@ -0,0 +1,90 @@
+"""체인 파일 가져오기 처리량(blocks/s)과 최대 RSS: 블록별 검증 vs 병렬 구간 검증
+
+가져오기는 새 프로세스에서 디스크 저장소로 하며, 그 프로세스의 최대 RSS 를 함께 출력한다.
+
+실행: python -m bench.bench_chain_import [--blocks 1000000] [--workers 4]
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from blockchain import Block, Blockchain
+from chainfile import import_chain, read_chain_file, write_chain_file
+from difficulty import DifficultyEngine, difficulty_to_target, meets_target, target_to_hex, target_work
+from storage import BlockStore
+from transaction import Transaction
+from bench.workload import genesis_block
+
+
+def generate(blocks: int, engine: DifficultyEngine):
+    """목표 간격마다 채굴한 블록의 JSON 레코드 (체인을 메모리에 두지 않고 하나씩 생성)"""
+    previous = genesis_block(engine)
+    engine.push(previous.timestamp, target_work(previous.target))
+    yield json.dumps(previous.to_dict()).encode()
+    for index in range(1, blocks):
+        timestamp = previous.timestamp + engine.block_time
+        transactions = [Transaction("network", f"miner{index % 100}", 10, timestamp)]
+        block = Block(index, transactions, timestamp, previous.hash, engine.next_target())
+        target = target_to_hex(block.target)
+        prefix_hash = hashlib.sha256(block.header_prefix())
+        while not meets_target(block.hash, target):
+            block.nonce += 1
+            block.hash = Block.hash_with_nonce(prefix_hash, block.nonce)
+        engine.push(block.timestamp, target_work(block.target))
+        yield json.dumps(block.to_dict()).encode()
+        previous = block
+
+
+def run_import(connection, path: str, datadir: str, workers: int, difficulty: int):
+    blockchain = Blockchain(store=BlockStore(datadir), validation_workers=workers,
+                            difficulty=DifficultyEngine(difficulty_to_target(difficulty)))
+    start = time.perf_counter()
+    count = import_chain(blockchain, path, parallel=workers > 1)
+    elapsed = time.perf_counter() - start
+    blockchain.close()
+    connection.send((count, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def measure(path: str, directory: str, workers: int, difficulty: int):
+    """새 프로세스에서 가져온 (블록 수, 시간, 최대 RSS KiB)"""
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe()
+    datadir = tempfile.mkdtemp(dir=directory)
+    process = context.Process(target=run_import, args=(child, path, datadir, workers, difficulty))
+    process.start()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    parser.add_argument("--difficulty", type=int, default=1, help="초기 목표값의 16진수 0 자리 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="병렬 검증 프로세스 수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        lp_path = os.path.join(directory, "chain.lp")
+        ndjson_path = os.path.join(directory, "chain.ndjson")
+        start = time.perf_counter()
+        write_chain_file(lp_path, generate(args.blocks, DifficultyEngine(difficulty_to_target(args.difficulty))), "lp")
+        write_chain_file(ndjson_path, read_chain_file(lp_path), "ndjson")
+        print(f"체인 파일 {args.blocks} 블록 생성: {time.perf_counter() - start:.1f}s, "
+              f"ndjson {os.path.getsize(ndjson_path) / 1024 / 1024:.0f} MiB, lp {os.path.getsize(lp_path) / 1024 / 1024:.0f} MiB")
+
+        modes = [("ndjson", ndjson_path, 1), ("lp", lp_path, 1), ("lp", lp_path, max(args.workers, 2))]
+        print(f"{'format':>7} {'validation':>14} {'blocks/s':>9} {'peak RSS (MiB)':>15}")
+        for name, path, workers in modes:
+            count, elapsed, peak = measure(path, directory, workers, args.difficulty)
+            assert count == args.blocks - 1
+            validation = "per block" if workers == 1 else f"{workers} workers"
+            print(f"{name:>7} {validation:>14} {count / elapsed:9.0f} {peak / 1024:15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""동시에 들어온 체인 요청(REQUEST_CHAIN)에 응답하는 서버 CPU 시간: 매번 직렬화 vs 블록 바이트 캐시
+
+서버 노드는 별도 프로세스에서 실행하고, 요청 전후의 프로세스 CPU 시간 차이를 잰다.
+
+실행: python -m bench.bench_chain_serving [--blocks 2000] [--txs 20] [--clients 100]
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from blockchain import Blockchain
+from difficulty import DifficultyEngine, difficulty_to_target
+from network import P2PNetwork
+from protocol import FrameReader, MESSAGE_TYPES, TYPE_MASK, encode_message
+from transaction import Transaction
+from bench.workload import genesis_block
+
+
+class LegacyNetwork(P2PNetwork):
+    """요청마다 체인 전체를 딕셔너리로 만들어 협상된 인코딩으로 직렬화하던 방식"""
+
+    def send_chain(self, peer_socket):
+        message = {"type": "CHAIN_RESPONSE", "data": self.blockchain.to_dict()}
+        self.send_frame(peer_socket, encode_message(message, self.peer_encodings.get(peer_socket, 0)))
+
+
+def serve(connection, legacy: bool, blocks: int, txs: int):
+    sys.stdout = open(os.devnull, "w")
+    blockchain = Blockchain(validation_workers=1, difficulty=DifficultyEngine(difficulty_to_target(1)))
+    blockchain.replace_chain([genesis_block(blockchain.difficulty)])
+    for height in range(blocks - 1):
+        previous = blockchain.get_latest_block()
+        transactions = [Transaction(f"user{height % 100}", f"user{i}", 1, previous.timestamp + i) for i in range(txs)]
+        blockchain.append_block(blockchain.create_block(transactions, previous.timestamp + 10))
+    node = (LegacyNetwork if legacy else P2PNetwork)("localhost", 0, blockchain)
+    node.start()
+    connection.send(node.server_socket.getsockname()[1])
+    connection.recv()  # 요청 시작
+    start = time.process_time()
+    connection.recv()  # 모든 응답 수신 완료
+    connection.send(time.process_time() - start)
+    node.close()
+
+
+def request(client: socket.socket, barrier: threading.Barrier, sizes: list):
+    reader = FrameReader(client)
+    barrier.wait()
+    client.sendall(encode_message({"type": "REQUEST_CHAIN", "data": None}))
+    while True:
+        type_code, payload = reader.read_frame()
+        if type_code & TYPE_MASK == MESSAGE_TYPES["CHAIN_RESPONSE"]:
+            sizes.append(len(payload))
+            return
+
+
+def run(legacy: bool, compact: bool, args):
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(child, legacy, args.blocks, args.txs))
+    server.start()
+    port = parent.recv()
+    clients = []
+    for _ in range(args.clients):
+        client = socket.create_connection(("localhost", port))
+        if compact:
+            client.sendall(encode_message({"type": "HELLO", "data": {"encodings": ["binary", "zlib"]}}))
+        clients.append(client)
+    time.sleep(0.5)  # HELLO 처리 대기
+
+    barrier = threading.Barrier(args.clients + 1)
+    sizes = []
+    threads = [threading.Thread(target=request, args=(client, barrier, sizes)) for client in clients]
+    for thread in threads:
+        thread.start()
+    parent.send("start")
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    parent.send("stop")
+    cpu = parent.recv()
+    for client in clients:
+        client.close()
+    server.join()
+    return elapsed, cpu, sum(sizes) / len(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--txs", type=int, default=20, help="블록당 트랜잭션 수")
+    parser.add_argument("--clients", type=int, default=100, help="동시에 체인을 요청하는 피어 수")
+    args = parser.parse_args()
+
+    modes = (("legacy json", True, False), ("legacy compact", True, True), ("cached json", False, False),
+             ("cached compact", False, True))
+    print(f"체인 {args.blocks} 블록 (블록당 {args.txs} 트랜잭션), 동시 요청 {args.clients}개")
+    print(f"{'mode':>15} {'wall (s)':>9} {'server cpu (s)':>15} {'response (KiB)':>15}")
+    for name, legacy, compact in modes:
+        elapsed, cpu, size = run(legacy, compact, args)
+        print(f"{name:>15} {elapsed:9.2f} {cpu:15.2f} {size / 1024:15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""디스크 체인 뷰에서 is_chain_valid 실행 시 최대 메모리 (캐시 한도별)
+
+실행: python -m bench.bench_chain_view [--blocks 200000] [--budgets-mb 1 16 64]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from blockchain import Blockchain
+from storage import BlockStore
+from bench.bench_block_store import bench_difficulty, generate
+
+
+def measure(datadir: str, budget: int = None):
+    """budget 이 None 이면 모든 블록을 리스트로 올린 뒤 검증 (기존 방식)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    if budget is None:
+        blockchain = Blockchain(store=BlockStore(datadir), difficulty=bench_difficulty())
+        blockchain.chain = list(blockchain.chain)
+    else:
+        blockchain = Blockchain(store=BlockStore(datadir), chain_cache_budget=budget,
+                                difficulty=bench_difficulty())
+    valid = blockchain.is_chain_valid()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    blockchain.store.close()
+    return valid, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200_000)
+    parser.add_argument("--datadir", default=os.path.join("bench_data", "chain_view"))
+    parser.add_argument("--budgets-mb", type=float, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args()
+
+    generate(args.datadir, args.blocks)
+    print(f"{'cache budget':>14} {'valid':>6} {'time (s)':>9} {'peak (MB)':>10}")
+    for budget_mb in args.budgets_mb:
+        valid, elapsed, peak = measure(args.datadir, int(budget_mb * 1024 * 1024))
+        print(f"{budget_mb:>11.0f} MB {str(valid):>6} {elapsed:9.2f} {peak / 1e6:10.1f}")
+    valid, elapsed, peak = measure(args.datadir)
+    print(f"{'all in RAM':>14} {str(valid):>6} {elapsed:9.2f} {peak / 1e6:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""블록 인코딩 크기와 인코딩/디코딩 시간: JSON / JSON+zlib / 바이너리 / 바이너리+zlib
+
+실행: python -m bench.bench_codec [--sizes 1000 10000] [--keys 16]
+"""
+import argparse
+import time
+from blockchain import Block
+from protocol import FRAME_HEADER, FLAG_BINARY, FLAG_COMPRESSED, encode_message, decode_message
+from bench.bench_verification import signed_transactions
+
+MODES = (("json", 0), ("json+zlib", FLAG_COMPRESSED), ("binary", FLAG_BINARY),
+         ("binary+zlib", FLAG_BINARY | FLAG_COMPRESSED))
+
+
+def best_time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--keys", type=int, default=16, help="서명 키(보낸 사람) 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    transactions = signed_transactions(max(args.sizes), args.keys)
+    print(f"{'txs':>6} {'mode':>12} {'bytes':>10} {'ratio':>6} {'encode (ms)':>12} {'decode (ms)':>12}")
+    for size in args.sizes:
+        block = Block(1, transactions[:size], 1_700_000_000.0, "0" * 64)
+        message = {"type": "NEW_BLOCK", "data": block.to_dict()}
+        json_size = None
+        for name, flags in MODES:
+            frame = encode_message(message, flags)
+            _, type_code = FRAME_HEADER.unpack_from(frame)
+            payload = frame[FRAME_HEADER.size:]
+            json_size = json_size or len(frame)
+            encode = best_time(lambda: encode_message(message, flags), args.repeat)
+            decode = best_time(lambda: decode_message(type_code, payload), args.repeat)
+            print(f"{size:>6} {name:>12} {len(frame):>10} {len(frame) / json_size:6.2f} "
+                  f"{encode * 1000:12.1f} {decode * 1000:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
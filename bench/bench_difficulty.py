@@ -0,0 +1,76 @@
+"""해시레이트가 바뀔 때 난이도 재조정 후 블록 간격 시뮬레이션
+
+실제로 채굴하지 않고, 목표값의 평균 해시 횟수 / 해시레이트 를 평균으로 하는 지수분포에서
+블록 간격을 뽑아 타임스탬프를 만든다. 구간마다 해시레이트 배율을 바꿔 가며 평균 간격과
+목표 간격(±20%)으로 돌아오기까지 걸린 블록 수를 출력한다.
+
+실행: python -m bench.bench_difficulty [--phases 2000:1 2000:10 2000:0.5] [--window 60] [--seed 0]
+"""
+import argparse
+import random
+import time
+from collections import deque
+from difficulty import BLOCK_TIME, RETARGET_WINDOW, DifficultyEngine, target_work
+
+
+def parse_phase(text: str):
+    blocks, rate = text.split(":")
+    return int(blocks), float(rate)
+
+
+def simulate(engine: DifficultyEngine, phases, seed: int, retarget: bool = True):
+    """구간별 (블록 수, 배율, 평균 간격, 후반 평균 간격, 수렴까지 블록 수) 와 블록당 재조정 시간"""
+    rng = random.Random(seed)
+    base_rate = target_work(engine.initial_target) / engine.block_time  # 초기 목표값에서 목표 간격이 되는 해시레이트
+    timestamp = 0.0
+    engine.reset([(timestamp, target_work(engine.initial_target))])
+    results = []
+    retarget_time = 0.0
+    blocks_total = 0
+    for blocks, rate in phases:
+        intervals = []
+        recent = deque(maxlen=engine.window)
+        settled = None
+        for height in range(blocks):
+            start = time.perf_counter()
+            target = engine.next_target() if retarget else engine.initial_target
+            retarget_time += time.perf_counter() - start
+            interval = rng.expovariate(base_rate * rate / target_work(target))
+            timestamp += interval
+            start = time.perf_counter()
+            engine.push(timestamp, target_work(target))
+            retarget_time += time.perf_counter() - start
+            intervals.append(interval)
+            recent.append(interval)
+            if settled is None and len(recent) == recent.maxlen \
+                    and abs(sum(recent) / len(recent) - engine.block_time) <= engine.block_time * 0.2:
+                settled = height + 1
+        tail = intervals[len(intervals) // 2:]
+        results.append((blocks, rate, sum(intervals) / blocks, sum(tail) / len(tail), settled))
+        blocks_total += blocks
+    return results, retarget_time / blocks_total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phases", type=parse_phase, nargs="+",
+                        default=[(2000, 1.0), (2000, 10.0), (2000, 0.5), (2000, 3.0)],
+                        help="블록수:해시레이트배율 목록")
+    parser.add_argument("--block-time", type=float, default=BLOCK_TIME)
+    parser.add_argument("--window", type=int, default=RETARGET_WINDOW)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = DifficultyEngine(block_time=args.block_time, window=args.window)
+    print(f"목표 간격 {args.block_time:.1f}s, 재조정 창 {args.window} 블록")
+    print(f"{'mode':>9} {'blocks':>7} {'hashrate':>9} {'avg (s)':>8} {'2nd half (s)':>13} {'settled after':>14}")
+    for mode, retarget in (("fixed", False), ("retarget", True)):
+        results, cost = simulate(engine, args.phases, args.seed, retarget)
+        for blocks, rate, average, tail, settled in results:
+            settled_text = f"{settled} blocks" if settled is not None else "-"
+            print(f"{mode:>9} {blocks:>7} {rate:>8.1f}x {average:8.2f} {tail:13.2f} {settled_text:>14}")
+    print(f"재조정 비용: 블록당 {cost * 1e6:.2f} us (창 크기와 무관)")
+
+
+if __name__ == "__main__":
+    main()
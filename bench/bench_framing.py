@@ -0,0 +1,59 @@
+"""두 로컬 노드 간에 수 MB 체인을 프레임 프로토콜로 동기화
+
+실행: python -m bench.bench_framing [--blocks 50] [--tx-per-block 1000]
+"""
+import argparse
+import json
+import time
+from blockchain import Blockchain
+from difficulty import DifficultyEngine, difficulty_to_target
+from network import P2PNetwork
+from transaction import Transaction
+
+
+def build_chain(blockchain: Blockchain, blocks: int, tx_per_block: int):
+    for height in range(blocks):
+        previous = blockchain.get_latest_block()
+        transactions = [
+            Transaction(f"sender{height}-{i}", f"recipient{height}-{i}", i + 1, 1700000000.0 + i)
+            for i in range(tx_per_block)
+        ]
+        block = blockchain.create_block(transactions, previous.timestamp + blockchain.difficulty.block_time)
+        blockchain.proof_of_work(block)
+        blockchain.append_block(block)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=50)
+    parser.add_argument("--tx-per-block", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    source = Blockchain(difficulty=DifficultyEngine(difficulty_to_target(1)))
+    build_chain(source, args.blocks, args.tx_per_block)
+    payload_size = len(json.dumps(source.to_dict()))
+
+    target = Blockchain(difficulty=source.difficulty.clone())
+    source_node = P2PNetwork("localhost", 0, source)
+    target_node = P2PNetwork("localhost", 0, target)
+    source_node.start()
+    target_node.start()
+    try:
+        start = time.perf_counter()
+        target_node.connect_to_peer("localhost", source_node.server_socket.getsockname()[1])
+        while target.get_latest_block().hash != source.get_latest_block().hash:
+            if time.perf_counter() - start > args.timeout:
+                raise SystemExit("동기화 시간 초과")
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+    finally:
+        target_node.close()
+        source_node.close()
+
+    assert [block.hash for block in target.chain] == [block.hash for block in source.chain]
+    print(f"체인 {len(source.chain)} 블록, {payload_size / 1e6:.1f} MB 동기화: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
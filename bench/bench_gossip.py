@@ -0,0 +1,98 @@
+"""20 노드 메시에서 트랜잭션 전파 비용: 중복 제거 없음 / seen-set / INV-GETDATA
+
+실행: python -m bench.bench_gossip [--nodes 20] [--degree 4] [--transactions 50]
+"""
+import argparse
+import random
+import time
+from blockchain import Blockchain
+from network import P2PNetwork
+from bench.bench_verification import signed_transactions
+
+
+class MeshNode(P2PNetwork):
+    """보낸 바이트와 메시지 수를 세는 노드 (dedup=False 면 본 항목을 기억하지 않음)"""
+
+    def __init__(self, blockchain: Blockchain, announce: bool, dedup: bool):
+        super().__init__("localhost", 0, blockchain, announce=announce)
+        self.dedup = dedup
+        self.bytes_sent = 0
+        self.messages_sent = 0
+
+    def send_frame(self, peer_socket, frame: bytes):
+        self.bytes_sent += len(frame)
+        self.messages_sent += 1
+        super().send_frame(peer_socket, frame)
+
+    def has_seen(self, key: str) -> bool:
+        return self.dedup and super().has_seen(key)
+
+    def mark_seen(self, key: str) -> bool:
+        return super().mark_seen(key) if self.dedup else True
+
+
+def build_mesh(nodes: int, degree: int, seed: int):
+    """모든 노드가 연결되고 사이클이 있는 무작위 그래프의 간선 목록"""
+    rng = random.Random(seed)
+    edges = {(i, i + 1) for i in range(nodes - 1)}  # 연결성 보장용 경로
+    while len(edges) < nodes * degree // 2:
+        a, b = sorted(rng.sample(range(nodes), 2))
+        edges.add((a, b))
+    return sorted(edges)
+
+
+def run(edges, node_count: int, transactions, announce: bool, dedup: bool, timeout: float):
+    nodes = [MeshNode(Blockchain(), announce, dedup) for _ in range(node_count)]
+    for node in nodes:
+        node.start()
+    try:
+        for a, b in edges:
+            nodes[a].connect_to_peer("localhost", nodes[b].server_socket.getsockname()[1])
+        time.sleep(1.0)  # 연결 직후의 헤더 동기화가 끝나도록 대기
+        for node in nodes:
+            node.bytes_sent = node.messages_sent = 0
+
+        start = time.perf_counter()
+        rng = random.Random(0)
+        for transaction in transactions:
+            origin = rng.choice(nodes)
+            origin.blockchain.mempool.add(transaction)
+            origin.broadcast_message({"type": "NEW_TRANSACTION", "data": transaction.to_dict()})
+
+        deadline = time.monotonic() + timeout
+        while any(len(node.blockchain.mempool) < len(transactions) for node in nodes):
+            if time.monotonic() > deadline:
+                print("  시간 초과: 일부 노드에 전파되지 않음")
+                break
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        time.sleep(0.5)  # 늦게 도착하는 중복 메시지까지 집계
+    finally:
+        for node in nodes:
+            node.close()
+            node.blockchain.close()
+    return elapsed, sum(node.bytes_sent for node in nodes), sum(node.messages_sent for node in nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--degree", type=int, default=4, help="노드당 평균 연결 수")
+    parser.add_argument("--transactions", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    edges = build_mesh(args.nodes, args.degree, args.seed)
+    transactions = signed_transactions(args.transactions, 4)
+    print(f"노드 {args.nodes}, 연결 {len(edges)}, 트랜잭션 {args.transactions}")
+    print(f"{'mode':>12} {'time (s)':>9} {'bytes/tx':>10} {'msgs/tx':>8}")
+    for name, announce, dedup in (("flood", False, False), ("seen-set", False, True),
+                                  ("inv/getdata", True, True)):
+        elapsed, sent, messages = run(edges, args.nodes, transactions, announce, dedup, args.timeout)
+        count = len(transactions)
+        print(f"{name:>12} {elapsed:9.2f} {sent / count:10.0f} {messages / count:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""트랜잭션 수에 따른 nonce 당 해싱 속도 (기존 전체 직렬화 vs 헤더 prefix)
+
+실행: python -m bench.bench_header_hashing [--tx-counts 1 100 1000 10000]
+"""
+import argparse
+import hashlib
+import json
+import time
+from blockchain import Block
+from transaction import Transaction
+
+
+def legacy_calculate_hash(block: Block) -> str:
+    """헤더/바디 분리 이전의 블록 전체 JSON 해싱"""
+    block_string = json.dumps({
+        "index": block.index,
+        "transactions": [transaction.to_dict() for transaction in block.transactions],
+        "timestamp": block.timestamp,
+        "previous_hash": block.previous_hash,
+        "nonce": block.nonce
+    }, sort_keys=True)
+    return hashlib.sha256(block_string.encode()).hexdigest()
+
+
+def hashes_per_second(func, duration: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for _ in range(100):
+            func(count)
+            count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tx-counts", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--duration", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'transactions':>12} {'legacy H/s':>12} {'prefix H/s':>12}")
+    for tx_count in args.tx_counts:
+        transactions = [
+            Transaction(f"sender{i}", f"recipient{i}", i, 1700000000.0 + i) for i in range(tx_count)
+        ]
+        block = Block(1, transactions, 1700000000.0, "0" * 64)
+
+        def legacy(nonce):
+            block.nonce = nonce
+            legacy_calculate_hash(block)
+
+        prefix_hash = hashlib.sha256(block.header_prefix())
+
+        def prefixed(nonce):
+            Block.hash_with_nonce(prefix_hash, nonce)
+
+        print(f"{tx_count:>12} {hashes_per_second(legacy, args.duration):12.0f} "
+              f"{hashes_per_second(prefixed, args.duration):12.0f}")
+
+
+if __name__ == "__main__":
+    main()
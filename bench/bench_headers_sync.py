@@ -0,0 +1,92 @@
+"""10 블록 뒤처진 노드의 동기화: 헤더 우선 vs 전체 CHAIN_RESPONSE
+
+실행: python -m bench.bench_headers_sync [--blocks 100000] [--behind 10]
+"""
+import argparse
+import time
+from blockchain import Blockchain
+from difficulty import DifficultyEngine, difficulty_to_target
+from network import P2PNetwork
+from protocol import FRAME_HEADER, encode_message
+from transaction import Transaction
+from bench.workload import genesis_block
+
+
+class CountingNetwork(P2PNetwork):
+    """보낸 바이트와 메시지 수를 세는 P2PNetwork"""
+
+    def __init__(self, *args, full_sync: bool = False):
+        super().__init__(*args)
+        self.full_sync = full_sync
+        self.bytes_sent = 0
+        self.messages_sent = 0
+
+    def send_frame(self, peer_socket, frame: bytes):
+        self.bytes_sent += len(frame)
+        self.messages_sent += 1
+        super().send_frame(peer_socket, frame)
+
+    def send_frame_parts(self, peer_socket, message_type: str, parts, flags: int = 0):
+        # CHAIN_RESPONSE 는 캐시된 블록 바이트를 조각째로 보내므로 send_frame 을 거치지 않음
+        self.bytes_sent += FRAME_HEADER.size + sum(len(part) for part in parts)
+        self.messages_sent += 1
+        super().send_frame_parts(peer_socket, message_type, parts, flags)
+
+    def sync_blockchain(self, peer_socket, locator=None):
+        if self.full_sync:
+            self.send_frame(peer_socket, encode_message({"type": "REQUEST_CHAIN", "data": None}))
+        else:
+            super().sync_blockchain(peer_socket, locator)
+
+
+def run(source: Blockchain, behind: int, full_sync: bool):
+    target = Blockchain(difficulty=source.difficulty.clone())
+    target.replace_chain(source.chain[:-behind])
+
+    source_node = CountingNetwork("localhost", 0, source)
+    target_node = CountingNetwork("localhost", 0, target, full_sync=full_sync)
+    source_node.start()
+    target_node.start()
+    try:
+        start = time.perf_counter()
+        target_node.connect_to_peer("localhost", source_node.server_socket.getsockname()[1])
+        while target.get_latest_block().hash != source.get_latest_block().hash:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+    finally:
+        target_node.close()
+        source_node.close()
+    return elapsed, source_node.bytes_sent + target_node.bytes_sent, \
+        source_node.messages_sent + target_node.messages_sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=100_000)
+    parser.add_argument("--behind", type=int, default=10)
+    parser.add_argument("--difficulty", type=int, default=1, help="초기 목표값의 16진수 0 자리 수")
+    args = parser.parse_args()
+
+    # 전체 체인 검증은 작업증명도 확인하므로 낮은 난이도로 실제 채굴
+    # 목표 간격마다 블록을 만들어 목표값을 초기값으로 유지
+    source = Blockchain(difficulty=DifficultyEngine(difficulty_to_target(args.difficulty)))
+    source.replace_chain([genesis_block(source.difficulty)])
+    for _ in range(args.blocks):
+        previous = source.get_latest_block()
+        transactions = [Transaction("network", "miner", 10, previous.timestamp)]
+        block = source.create_block(transactions, previous.timestamp + source.difficulty.block_time)
+        source.proof_of_work(block)
+        source.append_block(block)
+
+    results = {}
+    for name, full_sync in (("headers-first", False), ("full chain", True)):
+        results[name] = run(source, args.behind, full_sync)
+
+    print(f"체인 {args.blocks} 블록, {args.behind} 블록 뒤처진 노드")
+    print(f"{'mode':>14} {'time (s)':>9} {'bytes':>12} {'messages':>9}")
+    for name, (elapsed, sent, messages) in results.items():
+        print(f"{name:>14} {elapsed:9.3f} {sent:12d} {messages:9d}")
+
+
+if __name__ == "__main__":
+    main()
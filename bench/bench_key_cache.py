@@ -0,0 +1,47 @@
+"""공개키/개인키 캐시의 콜드/웜 서명 및 검증 지연
+
+실행: python -m bench.bench_key_cache [--iterations 200]
+"""
+import argparse
+import time
+from wallet.crypto import CryptoHandler
+
+
+def average(func, iterations: int, clear=None) -> float:
+    total = 0.0
+    for _ in range(iterations):
+        if clear:
+            clear()
+        start = time.perf_counter()
+        func()
+        total += time.perf_counter() - start
+    return total / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    private_key, public_key = CryptoHandler.generate_keypair()
+    message = '{"amount": 1.0, "from": "alice", "to": "bob"}'
+    signature = CryptoHandler.sign_message(private_key, message)
+
+    def sign():
+        CryptoHandler.sign_message(private_key, message)
+
+    def verify():
+        assert CryptoHandler.verify_signature(public_key, message, signature)
+
+    print(f"{'operation':>10} {'cold (us)':>10} {'warm (us)':>10}")
+    for name, func, cache in (("sign", sign, CryptoHandler.private_key_cache),
+                              ("verify", verify, CryptoHandler.public_key_cache)):
+        cold = average(func, args.iterations, cache.clear)
+        warm = average(func, args.iterations)
+        print(f"{name:>10} {cold * 1e6:10.1f} {warm * 1e6:10.1f}")
+    print(f"공개키 캐시: {CryptoHandler.public_key_cache.stats()}")
+    print(f"개인키 캐시: {CryptoHandler.private_key_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""트랜잭션/블록 메모리 사용량: 딕셔너리 + 일반 클래스 vs Transaction + __slots__ Block
+
+실행: python -m bench.bench_memory [--transactions 1000000] [--tx-per-block 10]
+"""
+import argparse
+import gc
+import tracemalloc
+from blockchain import Block
+from transaction import Transaction
+
+
+class LegacyBlock:
+    """__slots__ 도입 이전과 같은 __dict__ 기반 블록 (해시 계산 없이 속성만)"""
+
+    def __init__(self, index, transactions, timestamp, previous_hash, merkle_root, block_hash):
+        self.index = index
+        self.transactions = transactions
+        self.timestamp = timestamp
+        self.previous_hash = previous_hash
+        self.merkle_root = merkle_root
+        self._merkle_tree = None
+        self.nonce = 0
+        self.hash = block_hash
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def measure(args, compact: bool):
+    # 주소 문자열은 실제 체인처럼 여러 트랜잭션이 공유
+    addresses = [f"{i:040d}" for i in range(1000)]
+    tracemalloc.start()
+    base = traced()
+    if compact:
+        transactions = [
+            Transaction(addresses[i % 1000], addresses[(i + 1) % 1000], float(i), 1700000000.0 + i)
+            for i in range(args.transactions)
+        ]
+        for transaction in transactions:
+            transaction.digest  # 블록에 포함되면 항상 계산되는 txid 캐시까지 포함해 측정
+    else:
+        transactions = [{
+            "from": addresses[i % 1000],
+            "to": addresses[(i + 1) % 1000],
+            "amount": float(i),
+            "timestamp": 1700000000.0 + i
+        } for i in range(args.transactions)]
+    after_transactions = traced()
+
+    blocks = []
+    previous_hash = "0" * 64
+    for start in range(0, args.transactions, args.tx_per_block):
+        chunk = transactions[start:start + args.tx_per_block]
+        if compact:
+            block = Block(len(blocks), chunk, 1700000000.0 + start, previous_hash)
+        else:
+            # 해시 문자열 크기는 같도록 64자 문자열 사용
+            block = LegacyBlock(len(blocks), chunk, 1700000000.0 + start, previous_hash,
+                                f"{start:064d}", f"{start + 1:064d}")
+        previous_hash = block.hash
+        blocks.append(block)
+    after_blocks = traced()
+    tracemalloc.stop()
+    return (after_transactions - base) / args.transactions, (after_blocks - after_transactions) / len(blocks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--tx-per-block", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'representation':>16} {'bytes/tx':>10} {'bytes/block':>12}")
+    for name, compact in (("dict + __dict__", False), ("slots", True)):
+        per_transaction, per_block = measure(args, compact)
+        print(f"{name:>16} {per_transaction:10.1f} {per_block:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
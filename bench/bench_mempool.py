@@ -0,0 +1,58 @@
+"""멤풀 삽입(중복 20%)과 블록 템플릿 생성 시간
+
+실행: python -m bench.bench_mempool [--transactions 1000000] [--duplicates 0.2]
+"""
+import argparse
+import random
+import time
+from blockchain import MAX_BLOCK_BYTES, MAX_BLOCK_TRANSACTIONS
+from mempool import Mempool, DEFAULT_MAX_BYTES
+from transaction import Transaction
+
+
+def workload(count: int, duplicate_ratio: float, senders: int, seed: int):
+    """count 개의 트랜잭션 스트림 (duplicate_ratio 만큼은 앞에서 나온 것을 다시 보냄)"""
+    rng = random.Random(seed)
+    unique = []
+    for i in range(count):
+        if unique and rng.random() < duplicate_ratio:
+            yield rng.choice(unique)
+            continue
+        transaction = Transaction(f"sender{rng.randrange(senders)}", f"recipient{rng.randrange(senders)}",
+                                  rng.randint(1, 100), 1_700_000_000.0 + i, fee=rng.randint(0, 1000) / 100)
+        unique.append(transaction)
+        yield transaction
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--duplicates", type=float, default=0.2)
+    parser.add_argument("--senders", type=int, default=10_000)
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    stream = list(workload(args.transactions, args.duplicates, args.senders, args.seed))
+    for transaction in stream:
+        transaction.txid  # 해시 계산은 수신 경로에서 이미 끝난 것으로 보고 측정에서 제외
+
+    mempool = Mempool(args.max_bytes)
+    start = time.perf_counter()
+    for transaction in stream:
+        mempool.add(transaction)
+    insert_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = mempool.select(MAX_BLOCK_TRANSACTIONS - 1, MAX_BLOCK_BYTES)
+    select_elapsed = time.perf_counter() - start
+
+    print(f"삽입: {len(stream)}개, {insert_elapsed:.2f}s ({len(stream) / insert_elapsed:,.0f} tx/s)")
+    print(f"중복 거부: {mempool.duplicates}, 크기 한도로 제거: {mempool.evicted}")
+    print(f"멤풀: {len(mempool)}개, {mempool.size_bytes / 1e6:.1f} MB, 보낸 사람 {len(mempool.by_sender)}명")
+    template_bytes = sum(transaction.size for transaction in template)
+    print(f"템플릿: {len(template)}개, {template_bytes / 1e3:.1f} KB, {select_elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""머클 트리 구성 및 포함 증명 검증 벤치마크
+
+실행: python -m bench.bench_merkle [--tx-counts 10000 100000]
+"""
+import argparse
+import random
+import time
+from merkle import MerkleTree, verify_proof
+from transaction import Transaction
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tx-counts", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--proofs", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'transactions':>12} {'build (ms)':>11} {'proof (us)':>11} {'verify (us)':>12} {'proof len':>10}")
+    for tx_count in args.tx_counts:
+        transactions = [
+            Transaction(f"sender{i}", f"recipient{i}", i, 1700000000.0 + i) for i in range(tx_count)
+        ]
+
+        start = time.perf_counter()
+        tree = MerkleTree(transactions)
+        build = time.perf_counter() - start
+
+        indexes = [rng.randrange(tx_count) for _ in range(args.proofs)]
+        start = time.perf_counter()
+        proofs = [tree.get_proof(index) for index in indexes]
+        prove = (time.perf_counter() - start) / args.proofs
+
+        root = tree.root
+        start = time.perf_counter()
+        for index, proof in zip(indexes, proofs):
+            assert verify_proof(transactions[index], proof, root)
+        verify = (time.perf_counter() - start) / args.proofs
+
+        print(f"{tx_count:>12} {build * 1e3:11.1f} {prove * 1e6:11.1f} {verify * 1e6:12.1f} {len(proofs[0]):>10}")
+
+
+if __name__ == "__main__":
+    main()
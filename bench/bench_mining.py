@@ -0,0 +1,42 @@
+"""병렬 채굴 엔진 코어 수별 벤치마크
+
+실행: python -m bench.bench_mining [--difficulties 4 5 6] [--workers 1 2 4]
+"""
+import argparse
+import os
+import time
+from blockchain import Block
+from difficulty import difficulty_to_target
+from miner import ParallelMiner
+from transaction import Transaction
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--difficulties", type=int, nargs="+", default=[4, 5, 6],
+                        help="목표값의 16진수 0 자리 수")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, cpu_count}))
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    transactions = [Transaction("network", "miner", 10)]
+    print(f"{'difficulty':>10} {'workers':>8} {'avg time (s)':>13} {'total H/s':>12}")
+    for difficulty in args.difficulties:
+        for workers in args.workers:
+            miner = ParallelMiner(workers)
+            elapsed = 0.0
+            hashes = 0
+            for round_index in range(args.rounds):
+                target = difficulty_to_target(difficulty)
+                block = Block(round_index + 1, transactions, 1700000000.0 + round_index, "0" * 64, target)
+                start = time.perf_counter()
+                miner.mine(block, target)
+                elapsed += time.perf_counter() - start
+                hashes += sum(stat["hashes"] for stat in miner.last_stats)
+            print(f"{difficulty:>10} {workers:>8} {elapsed / args.rounds:13.3f} {hashes / elapsed:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
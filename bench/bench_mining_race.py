@@ -0,0 +1,91 @@
+"""같은 제네시스에서 두 노드가 동시에 채굴할 때 버려지는 해시 작업량
+
+각 노드는 스레드에서 계속 채굴하고 찾은 블록을 서로에게 전파한다. 상대 블록으로 체인 끝이
+바뀌면 새 끝에서 다시 시작하는 경우(abort)와, 찾을 때까지 낡은 템플릿을 계속 채굴하는
+경우(no-abort)를 비교한다. 낭비한 해시는 상대 블록이 도착한 뒤 낡은 부모 위에서 쓴 해시이고,
+같은 높이를 두고 진 경쟁(최종 체인에서 빠진 블록)은 따로 센다.
+
+실행: python -m bench.bench_mining_race [--duration 20] [--difficulty 4] [--check-interval 2000]
+"""
+import argparse
+import threading
+import time
+from blockchain import Blockchain
+from difficulty import DifficultyEngine, difficulty_to_target
+from network import P2PNetwork
+
+
+def race(engine: DifficultyEngine, duration: float, check_interval: int, abort_on_new_tip: bool):
+    """(노드별 채굴 조정자, 최종 체인 블록 해시 집합, 최종 높이)"""
+    first = Blockchain(difficulty=engine.clone(), mining_check_interval=check_interval)
+    second = Blockchain(difficulty=engine.clone(), mining_check_interval=check_interval)
+    second.replace_chain([first.chain[0]])
+    blockchains = (first, second)
+    for blockchain in blockchains:
+        blockchain.mining.abort_on_new_tip = abort_on_new_tip
+
+    nodes = [P2PNetwork("localhost", 0, blockchain) for blockchain in blockchains]
+    for blockchain, node in zip(blockchains, nodes):
+        blockchain.network = node
+        node.start()
+    stop = threading.Event()
+
+    def mine(blockchain: Blockchain, address: str):
+        while not stop.is_set():
+            blockchain.mine_pending_transactions(address)
+
+    threads = [threading.Thread(target=mine, args=(blockchain, f"miner{i}"), daemon=True)
+               for i, blockchain in enumerate(blockchains)]
+    try:
+        nodes[1].connect_to_peer("localhost", nodes[0].server_socket.getsockname()[1])
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for blockchain in blockchains:
+            blockchain.cancel_mining()
+        for thread in threads:
+            thread.join()
+
+        # 마지막에 찾은 블록까지 전파되어 두 노드가 같은 끝에 모일 때까지 대기
+        deadline = time.monotonic() + 30
+        while first.get_latest_block().hash != second.get_latest_block().hash:
+            if time.monotonic() > deadline:
+                raise TimeoutError("두 노드의 체인이 수렴하지 않음")
+            time.sleep(0.01)
+    finally:
+        for node in nodes:
+            node.close()
+    final = {block.hash for block in first.chain}
+    return [blockchain.mining for blockchain in blockchains], final, len(first.chain) - 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=20.0, help="모드별 채굴 시간 (초)")
+    parser.add_argument("--difficulty", type=int, default=4, help="초기 목표값의 16진수 0 자리 수")
+    parser.add_argument("--block-time", type=float, default=0.5)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--check-interval", type=int, default=2000, help="체인 끝을 확인하는 nonce 간격")
+    args = parser.parse_args()
+
+    engine = DifficultyEngine(difficulty_to_target(args.difficulty), args.block_time, args.window)
+    results = {}
+    for name, abort_on_new_tip in (("abort", True), ("no-abort", False)):
+        results[name] = race(engine, args.duration, args.check_interval, abort_on_new_tip)
+
+    print(f"두 노드 {args.duration:.0f}s 채굴, 목표 간격 {args.block_time}s, 확인 간격 {args.check_interval} nonce")
+    print(f"{'mode':>9} {'height':>7} {'found':>6} {'orphaned':>9} {'restarts':>9} "
+          f"{'hashes':>11} {'stale':>11} {'stale %':>8}")
+    for name, (coordinators, final, height) in results.items():
+        found = [entry for coordinator in coordinators for entry in coordinator.found]
+        orphaned = [block_hash for block_hash, _ in found if block_hash not in final]
+        hashes = sum(coordinator.hashes for coordinator in coordinators)
+        stale = sum(coordinator.stale_hashes for coordinator in coordinators)
+        print(f"{name:>9} {height:7d} {len(found):6d} {len(orphaned):9d} "
+              f"{sum(coordinator.restarts for coordinator in coordinators):9d} "
+              f"{hashes:11d} {stale:11d} {stale / max(hashes, 1) * 100:7.2f}%")
+
+
+if __name__ == "__main__":
+    main()
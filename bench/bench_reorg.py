@@ -0,0 +1,84 @@
+"""긴 체인 끝에서 일어나는 짧은 재구성: 블록 트리 vs 전체 체인 교체(CHAIN_RESPONSE)
+
+실행: python -m bench.bench_reorg [--blocks 100000] [--depth 6] [--txs 100]
+"""
+import argparse
+import time
+from blockchain import Blockchain, Block
+from difficulty import DifficultyEngine, difficulty_to_target
+from metrics import configure_logging
+from bench.workload import genesis_block
+from transaction import Transaction
+
+
+def mine(blockchain: Blockchain, previous: Block, miner: str, transfers: int) -> Block:
+    transactions = [Transaction(f"user{i}", f"user{i + 1}", 1, previous.timestamp) for i in range(transfers)]
+    transactions.append(Transaction("network", miner, blockchain.mining_reward, previous.timestamp))
+    # 목표 간격마다 만든 블록이라 목표값은 어느 분기에서나 초기값으로 유지됨
+    block = Block(previous.index + 1, transactions, previous.timestamp + blockchain.difficulty.block_time,
+                  previous.hash, blockchain.difficulty.next_target())
+    blockchain.proof_of_work(block)
+    return block
+
+
+def build(blocks: int, difficulty: int) -> Blockchain:
+    blockchain = Blockchain(validation_workers=1, difficulty=DifficultyEngine(difficulty_to_target(difficulty)))
+    blockchain.replace_chain([genesis_block(blockchain.difficulty)])
+    for _ in range(blocks - 1):
+        blockchain.append_block(mine(blockchain, blockchain.get_latest_block(), "miner", 0))
+    return blockchain
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=100_000)
+    parser.add_argument("--depth", type=int, default=6, help="롤백되는 블록 수")
+    parser.add_argument("--txs", type=int, default=100, help="분기 블록당 송금 트랜잭션 수")
+    parser.add_argument("--difficulty", type=int, default=1)
+    args = parser.parse_args()
+    # 서명 없는 송금은 재구성 때 멤풀로 돌아가지 못하고 경고가 남으므로 오류만 출력
+    configure_logging("error")
+
+    start = time.perf_counter()
+    blockchain = build(args.blocks, args.difficulty)
+    fork = blockchain.chain[len(blockchain.chain) - 1 - args.depth]
+    print(f"체인 {len(blockchain.chain)} 블록 생성: {time.perf_counter() - start:.1f}s")
+
+    # 같은 부모에서 갈라진 두 분기: 현재 체인 끝 depth 개를 다시 채굴한 것과, 한 블록 더 긴 경쟁 분기
+    current = []
+    for _ in range(args.depth):
+        current.append(mine(blockchain, current[-1] if current else fork, "a", args.txs))
+    competing = []
+    for _ in range(args.depth + 1):
+        competing.append(mine(blockchain, competing[-1] if competing else fork, "b", args.txs))
+    blockchain.reorganize(fork.index + 1, current)
+    legacy = Blockchain(validation_workers=1, difficulty=blockchain.difficulty.clone())
+    legacy.replace_chain(list(blockchain.chain))
+
+    # 블록 트리: 분기 블록은 누적 작업량만 비교하고 보관, 마지막 블록에서 depth 개 롤백 후 적용
+    start = time.perf_counter()
+    for block in competing[:-1]:
+        blockchain.add_block(block)
+    compare = time.perf_counter() - start
+    start = time.perf_counter()
+    blockchain.add_block(competing[-1])
+    reorg = time.perf_counter() - start
+    assert blockchain.get_latest_block().hash == competing[-1].hash
+
+    # 이전 방식: 경쟁 분기를 포함한 전체 체인을 받아 검증하고 교체
+    new_chain = list(legacy.chain[:fork.index + 1]) + competing
+    start = time.perf_counter()
+    assert legacy.validate_chain(new_chain) is None
+    legacy.replace_chain(new_chain)
+    full = time.perf_counter() - start
+    assert legacy.balances == blockchain.balances
+
+    print(f"{args.depth} 블록 재구성 (블록당 송금 {args.txs}건)")
+    print(f"{'mode':>22} {'time (ms)':>10}")
+    print(f"{'tree: side blocks':>22} {compare * 1000:10.2f}")
+    print(f"{'tree: reorg':>22} {reorg * 1000:10.2f}")
+    print(f"{'full chain replace':>22} {full * 1000:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""새 노드가 긴 체인에 합류해 최신 블록까지 따라잡는 시간: 제네시스부터 vs 스냅샷
+
+실행: python -m bench.bench_snapshot_sync [--blocks 1000000] [--after 100]
+"""
+import argparse
+import os
+import tempfile
+import time
+from blockchain import Blockchain
+from difficulty import DifficultyEngine, difficulty_to_target
+from network import P2PNetwork
+from snapshot import read_snapshot, write_snapshot
+from transaction import Transaction
+from bench.workload import genesis_block
+
+
+def grow(blockchain: Blockchain, blocks: int):
+    """목표 간격마다 채굴한 블록을 이어 붙임 (받는 노드가 목표값과 작업증명을 검증하므로)"""
+    for _ in range(blocks):
+        previous = blockchain.get_latest_block()
+        transactions = [Transaction("network", f"miner{previous.index % 100}", 10, previous.timestamp)]
+        block = blockchain.create_block(transactions, previous.timestamp + blockchain.difficulty.block_time)
+        blockchain.proof_of_work(block)
+        blockchain.append_block(block)
+
+
+def join(source_node: P2PNetwork, source: Blockchain, snapshot_path=None, digest=None, timeout=3600.0):
+    """새 노드를 만들고 source 의 최신 블록에 도달할 때까지 걸린 시간"""
+    start = time.perf_counter()
+    snapshot = read_snapshot(snapshot_path, digest) if snapshot_path else None
+    target = Blockchain(snapshot=snapshot, difficulty=source.difficulty.clone())
+    node = P2PNetwork("localhost", 0, target)
+    node.start()
+    try:
+        node.connect_to_peer("localhost", source_node.server_socket.getsockname()[1])
+        deadline = time.monotonic() + timeout
+        while target.get_latest_block().hash != source.get_latest_block().hash:
+            if time.monotonic() > deadline:
+                raise TimeoutError("동기화 시간 초과")
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        assert target.balances == source.balances
+    finally:
+        node.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    parser.add_argument("--after", type=int, default=100, help="스냅샷 이후에 추가되는 블록 수")
+    parser.add_argument("--difficulty", type=int, default=1, help="초기 목표값의 16진수 0 자리 수")
+    args = parser.parse_args()
+
+    source = Blockchain(difficulty=DifficultyEngine(difficulty_to_target(args.difficulty)))
+    source.replace_chain([genesis_block(source.difficulty)])
+    start = time.perf_counter()
+    grow(source, args.blocks - args.after - 1)
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "snapshot.json")
+        digest = write_snapshot(source, snapshot_path)
+        grow(source, args.after)
+        print(f"체인 {len(source.chain)} 블록 생성: {time.perf_counter() - start:.1f}s, "
+              f"스냅샷 높이 {len(source.chain) - args.after - 1}")
+
+        source_node = P2PNetwork("localhost", 0, source)
+        source_node.start()
+        try:
+            with_snapshot = join(source_node, source, snapshot_path, digest)
+            from_genesis = join(source_node, source)
+        finally:
+            source_node.close()
+
+    print(f"{'mode':>14} {'time-to-ready (s)':>18}")
+    print(f"{'genesis':>14} {from_genesis:18.2f}")
+    print(f"{'snapshot':>14} {with_snapshot:18.2f}")
+
+
+if __name__ == "__main__":
+    main()
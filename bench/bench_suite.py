@@ -0,0 +1,242 @@
+"""핫 경로 벤치마크 모음: 시드로 만든 같은 작업량에서 시간을 재고 JSON 으로 저장
+
+calculate_hash, proof_of_work, get_balance, is_chain_valid, add_transaction(서명 검증 포함),
+to_dict 직렬화, 두 노드 P2PNetwork 동기화(루프백)를 잰다. 항목마다 --repeat 번 반복해 한 번당
+최솟값/중앙값을 기록하며, --compare 로 이전 결과 파일을 주면 중앙값이 --threshold 이상 느려진
+항목을 출력하고 종료 코드 1 로 끝난다. 작업량이 같은지는 결과의 fingerprint(체인 끝 해시)로 확인한다.
+
+실행: python -m bench.bench_suite [--seed 0] [--blocks 200] [--per-block 50] [--output bench_data/bench_suite.json]
+                                 [--compare 이전결과.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+from blockchain import Block, Blockchain
+from difficulty import difficulty_to_target
+from metrics import LOG_LEVELS, configure_logging, enable as enable_metrics
+from network import P2PNetwork
+from bench.workload import build_chain, load_wallets, signed_transactions, bench_difficulty
+
+
+def measure(function: Callable[[], int], repeat: int) -> Dict:
+    """function 을 repeat 번 실행한 한 번당 시간 (function 은 한 번에 처리한 작업 수를 반환)"""
+    times = []
+    operations = 1
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operations = function()
+        times.append((time.perf_counter() - start) / operations)
+    median = statistics.median(times)
+    return {"operations": operations, "repeat": repeat, "min_s": min(times), "median_s": median,
+            "ops_per_s": 1 / median if median else None}
+
+
+def bench_calculate_hash(blockchain: Blockchain, rng: random.Random, args) -> Callable[[], int]:
+    blocks = [blockchain.chain[rng.randrange(1, len(blockchain.chain))] for _ in range(args.operations)]
+
+    def run():
+        for block in blocks:
+            block.calculate_hash()
+        return len(blocks)
+    return run
+
+
+def bench_proof_of_work(blockchain: Blockchain, rng: random.Random, args) -> Callable[[], int]:
+    template = blockchain.get_latest_block()
+    target = difficulty_to_target(args.pow_difficulty)
+    # 라운드마다 같은 블록들을 처음부터 다시 채굴해 nonce 탐색량을 고정
+    timestamps = [template.timestamp + rng.random() for _ in range(args.pow_blocks)]
+
+    def run():
+        for timestamp in timestamps:
+            blockchain.proof_of_work(Block(template.index + 1, template.transactions, timestamp, template.hash, target))
+        return len(timestamps)
+    return run
+
+
+def bench_get_balance(blockchain: Blockchain, rng: random.Random, args) -> Callable[[], int]:
+    addresses = [transaction.recipient for block in blockchain.chain for transaction in block.transactions]
+    lookups = [rng.choice(addresses) for _ in range(args.operations)]
+
+    def run():
+        for address in lookups:
+            blockchain.get_balance(address)
+        return len(lookups)
+    return run
+
+
+def bench_is_chain_valid(blockchain: Blockchain, rng: random.Random, args) -> Callable[[], int]:
+    def run():
+        assert blockchain.is_chain_valid()
+        return len(blockchain.chain)
+    return run
+
+
+def bench_add_transaction(blockchain: Blockchain, rng: random.Random, args) -> Callable[[], int]:
+    transactions = args.pending_transactions
+
+    def run():
+        receiver = Blockchain(difficulty=bench_difficulty(), validation_workers=1)
+        for transaction in transactions:
+            # GUI 와 같이 공개키는 PEM 바이트로 전달
+            receiver.add_transaction(transaction.sender, transaction.recipient, transaction.amount,
+                                     transaction.signature, transaction.public_key.encode(), transaction.timestamp,
+                                     transaction.fee)
+        assert len(receiver.mempool) == len(transactions)
+        return len(transactions)
+    return run
+
+
+def bench_block_to_dict(blockchain: Blockchain, rng: random.Random, args) -> Callable[[], int]:
+    def run():
+        for block in blockchain.chain:
+            block.to_dict()
+        return len(blockchain.chain)
+    return run
+
+
+def bench_chain_to_dict(blockchain: Blockchain, rng: random.Random, args) -> Callable[[], int]:
+    def run():
+        json.dumps(blockchain.to_dict())
+        return 1
+    return run
+
+
+def bench_p2p_sync(blockchain: Blockchain, rng: random.Random, args) -> Callable[[], int]:
+    def run():
+        target = Blockchain(difficulty=bench_difficulty(), validation_workers=1)
+        target.replace_chain([blockchain.chain[0]])
+        source_node = P2PNetwork("localhost", 0, blockchain)
+        target_node = P2PNetwork("localhost", 0, target)
+        source_node.start()
+        target_node.start()
+        try:
+            deadline = time.monotonic() + args.timeout
+            target_node.connect_to_peer("localhost", source_node.server_socket.getsockname()[1])
+            while target.get_latest_block().hash != blockchain.get_latest_block().hash:
+                if time.monotonic() > deadline:
+                    raise TimeoutError("동기화 시간 초과")
+                time.sleep(0.001)
+        finally:
+            target_node.close()
+            source_node.close()
+        return len(blockchain.chain) - 1
+    return run
+
+
+# (이름, 단위 작업, 준비 함수)
+CASES = (
+    ("calculate_hash", "block", bench_calculate_hash),
+    ("proof_of_work", "block", bench_proof_of_work),
+    ("get_balance", "lookup", bench_get_balance),
+    ("is_chain_valid", "block", bench_is_chain_valid),
+    ("add_transaction", "transaction", bench_add_transaction),
+    ("block.to_dict", "block", bench_block_to_dict),
+    ("blockchain.to_dict+json", "chain", bench_chain_to_dict),
+    ("p2p_sync", "block", bench_p2p_sync),
+)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict, baseline_path: str, threshold: float) -> List[str]:
+    """기준 결과보다 중앙값이 threshold 비율 이상 느려진 항목 이름"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline["workload"] != results["workload"]:
+        print("경고: 기준 결과와 작업량이 다름 (시드/크기/키 캐시 확인)")
+    print(f"{'case':>24} {'baseline (us)':>14} {'current (us)':>13} {'change':>8}")
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline["cases"].get(name)
+        if previous is None:
+            continue
+        change = current["median_s"] / previous["median_s"] - 1
+        marker = " !" if change > threshold else ""
+        if marker:
+            regressions.append(name)
+        print(f"{name:>24} {previous['median_s'] * 1e6:14.2f} {current['median_s'] * 1e6:13.2f} "
+              f"{change * 100:+7.1f}%{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keys", type=int, default=8, help="서명에 쓰는 지갑 수")
+    parser.add_argument("--blocks", type=int, default=200, help="체인 블록 수 (제네시스 제외)")
+    parser.add_argument("--per-block", type=int, default=50, help="블록당 서명된 송금 수")
+    parser.add_argument("--pending", type=int, default=500, help="add_transaction 으로 넣는 트랜잭션 수")
+    parser.add_argument("--operations", type=int, default=10_000, help="calculate_hash/get_balance 반복 수")
+    parser.add_argument("--pow-difficulty", type=int, default=3, help="proof_of_work 목표값의 16진수 0 자리 수")
+    parser.add_argument("--pow-blocks", type=int, default=5, help="proof_of_work 라운드당 채굴 블록 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="p2p_sync 라운드 제한 시간 (초)")
+    parser.add_argument("--cases", nargs="+", choices=[name for name, _, _ in CASES],
+                        default=[name for name, _, _ in CASES])
+    parser.add_argument("--output", default=os.path.join("bench_data", "bench_suite.json"),
+                        help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 볼 중앙값 증가 비율")
+    parser.add_argument("--metrics", action="store_true", help="지표 기록을 켜고 측정 (계측 비용 비교용)")
+    parser.add_argument("--log-level", choices=LOG_LEVELS, default="error", help="측정 중 로그 수준")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+    enable_metrics(args.metrics)
+
+    start = time.perf_counter()
+    wallets = load_wallets(args.keys)
+    transactions = signed_transactions(args.seed, args.blocks * args.per_block + args.pending, wallets)
+    args.pending_transactions = transactions[args.blocks * args.per_block:]
+    blockchain = build_chain(transactions[:args.blocks * args.per_block], args.per_block, validation_workers=1)
+    print(f"작업량 준비: 체인 {len(blockchain.chain)} 블록, 서명된 트랜잭션 {len(transactions)} 건 "
+          f"({time.perf_counter() - start:.1f}s), 끝 해시 {blockchain.get_latest_block().hash[:16]}")
+
+    results = {
+        "workload": {
+            "seed": args.seed, "keys": args.keys, "blocks": args.blocks, "per_block": args.per_block,
+            "pending": args.pending, "operations": args.operations, "pow_difficulty": args.pow_difficulty,
+            "pow_blocks": args.pow_blocks, "fingerprint": blockchain.get_latest_block().hash,
+        },
+        "environment": {
+            "revision": git_revision(), "python": platform.python_version(),
+            "implementation": platform.python_implementation(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "metrics": args.metrics, "timestamp": time.time(),
+        },
+        "cases": {},
+    }
+    print(f"{'case':>24} {'unit':>12} {'min (us)':>11} {'median (us)':>12} {'ops/s':>11}")
+    for name, unit, setup in CASES:
+        if name not in args.cases:
+            continue
+        # 항목마다 같은 시드의 난수로 조회 대상을 고름
+        result = measure(setup(blockchain, random.Random(args.seed), args), args.repeat)
+        result["unit"] = unit
+        results["cases"][name] = result
+        print(f"{name:>24} {unit:>12} {result['min_s'] * 1e6:11.2f} {result['median_s'] * 1e6:12.2f} "
+              f"{result['ops_per_s']:11.0f}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"결과 저장: {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""txid/주소/블록 해시 조회: 보조 색인 vs 체인 전체 탐색, 그리고 색인 메모리
+
+실행: python -m bench.bench_tx_index [--transactions 1000000] [--per-block 1000] [--addresses 10000]
+"""
+import argparse
+import random
+import time
+from blockchain import Blockchain
+from difficulty import DifficultyEngine, difficulty_to_target
+from transaction import Transaction
+
+
+def build(transactions: int, per_block: int, addresses: int) -> Blockchain:
+    """블록당 per_block 건의 송금으로 채운 체인 (조회만 재므로 작업증명은 생략)"""
+    blockchain = Blockchain(validation_workers=1, difficulty=DifficultyEngine(difficulty_to_target(1)))
+    count = 0
+    while count < transactions:
+        previous = blockchain.get_latest_block()
+        batch = [Transaction(f"user{(count + i) % addresses}", f"user{(count + i * 7 + 1) % addresses}", 1,
+                             previous.timestamp + i * 1e-6)
+                 for i in range(min(per_block, transactions - count))]
+        count += len(batch)
+        blockchain.append_block(blockchain.create_block(batch, previous.timestamp + blockchain.difficulty.block_time))
+    return blockchain
+
+
+def scan_transaction(blockchain: Blockchain, txid: str):
+    for block in blockchain.chain:
+        for transaction in block.transactions:
+            if transaction.txid == txid:
+                return block.index, transaction
+    return None
+
+
+def scan_history(blockchain: Blockchain, address: str):
+    return [(block.index, transaction) for block in blockchain.chain for transaction in block.transactions
+            if address in (transaction.sender, transaction.recipient)]
+
+
+def scan_block(blockchain: Blockchain, block_hash: str):
+    for block in blockchain.chain:
+        if block.hash == block_hash:
+            return block
+    return None
+
+
+def timed(function, arguments) -> float:
+    """인자별 평균 실행 시간 (초)"""
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--per-block", type=int, default=1000)
+    parser.add_argument("--addresses", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=10_000, help="색인 조회 횟수")
+    parser.add_argument("--scans", type=int, default=3, help="전체 탐색 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    blockchain = build(args.transactions, args.per_block, args.addresses)
+    print(f"체인 {len(blockchain.chain)} 블록, 트랜잭션 {len(blockchain.tx_index)} 건 생성: "
+          f"{time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(args.seed)
+    blocks = [blockchain.chain[rng.randrange(1, len(blockchain.chain))] for _ in range(args.lookups)]
+    txids = [rng.choice(block.transactions).txid for block in blocks]
+    hashes = [block.hash for block in blocks]
+    addresses = [f"user{rng.randrange(args.addresses)}" for _ in range(args.lookups)]
+    for txid, block in zip(txids[:args.scans], blocks):
+        assert blockchain.get_transaction(txid)[0] == scan_transaction(blockchain, txid)[0] == block.index
+    assert blockchain.get_address_history(addresses[0]) == scan_history(blockchain, addresses[0])
+
+    rows = [
+        ("txid", timed(blockchain.get_transaction, txids), timed(lambda txid: scan_transaction(blockchain, txid),
+                                                                  txids[:args.scans])),
+        ("block hash", timed(blockchain.get_block_by_hash, hashes),
+         timed(lambda block_hash: scan_block(blockchain, block_hash), hashes[:args.scans])),
+        ("address history", timed(blockchain.get_address_history, addresses),
+         timed(lambda address: scan_history(blockchain, address), addresses[:args.scans])),
+    ]
+    print(f"{'lookup':>16} {'index (us)':>11} {'scan (ms)':>10}")
+    for name, indexed, scanned in rows:
+        print(f"{name:>16} {indexed * 1e6:11.2f} {scanned * 1e3:10.1f}")
+    memory = blockchain.tx_index.memory_bytes()
+    print(f"색인 메모리: {memory / 1024 / 1024:.1f} MiB (트랜잭션당 {memory / len(blockchain.tx_index):.0f} 바이트, "
+          f"주소 {len(blockchain.tx_index.by_address)} 개)")
+
+
+if __name__ == "__main__":
+    main()
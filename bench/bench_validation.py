@@ -0,0 +1,73 @@
+"""전체 체인 검증 시간 (워커 수별), 중간에 잘못된 블록이 있을 때 조기 중단 시간
+
+실행: python -m bench.bench_validation [--blocks 500000] [--workers 1 2 4]
+"""
+import argparse
+import hashlib
+import os
+import time
+from blockchain import Block
+from difficulty import BLOCK_TIME, DifficultyEngine, difficulty_to_target, meets_target, target_to_hex, target_work
+from transaction import Transaction
+from validation import ChainValidator
+
+
+def build_chain(blocks: int, difficulty: int):
+    """목표 간격마다 채굴한 체인 (목표값은 초기값으로 유지, 메모리 절약을 위해 트랜잭션 목록은 공유)"""
+    target = difficulty_to_target(difficulty)
+    target_hex = target_to_hex(target)
+    transactions = [Transaction("network", "miner", 10)]
+    chain = [Block(0, [], 0.0, "0", target)]
+    for _ in range(blocks - 1):
+        previous = chain[-1]
+        block = Block(previous.index + 1, transactions, previous.timestamp + BLOCK_TIME, previous.hash, target)
+        prefix_hash = hashlib.sha256(block.header_prefix())
+        while not meets_target(block.hash, target_hex):
+            block.nonce += 1
+            block.hash = Block.hash_with_nonce(prefix_hash, block.nonce)
+        chain.append(block)
+    return chain
+
+
+def timed(validator: ChainValidator, chain, retarget: DifficultyEngine):
+    start = time.perf_counter()
+    retarget.reset([(chain[0].timestamp, target_work(chain[0].target))])
+    result = validator.validate(chain, retarget)
+    return time.perf_counter() - start, result
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=500_000)
+    parser.add_argument("--difficulty", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, cpu_count}))
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    chain = build_chain(args.blocks, args.difficulty)
+    print(f"체인 {args.blocks} 블록 생성: {time.perf_counter() - start:.1f}s (CPU {cpu_count}개)")
+
+    # 10% 지점의 블록 해시를 망가뜨린 사본 (조기 중단 측정용)
+    bad_position = args.blocks // 10
+    broken = list(chain)
+    original = broken[bad_position]
+    forged = Block(original.index, original.transactions, original.timestamp, original.previous_hash,
+                   original.target)
+    forged.nonce = original.nonce + 1
+    forged.hash = original.hash
+    broken[bad_position] = forged
+
+    print(f"{'workers':>8} {'valid (s)':>10} {'blocks/s':>10} {'bad@10% (s)':>12} {'reported':>9}")
+    for workers in args.workers:
+        validator = ChainValidator(workers, chunk_size=args.chunk_size)
+        retarget = DifficultyEngine(difficulty_to_target(args.difficulty))
+        elapsed, result = timed(validator, chain, retarget)
+        assert result is None
+        abort_elapsed, reported = timed(validator, broken, retarget)
+        print(f"{workers:>8} {elapsed:10.2f} {args.blocks / elapsed:10,.0f} {abort_elapsed:12.2f} {reported:>9}")
+
+
+if __name__ == "__main__":
+    main()
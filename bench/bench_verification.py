@@ -0,0 +1,63 @@
+"""서명 검증 처리량 (검증된 tx/s) - 워커 1, 4, N
+
+실행: python -m bench.bench_verification [--transactions 2000] [--workers 1 4 8]
+"""
+import argparse
+import os
+import threading
+import time
+from transaction import Transaction
+from verification import SignatureVerifier
+from wallet.crypto import CryptoHandler
+
+
+def signed_transactions(count: int, keys: int):
+    keypairs = [CryptoHandler.generate_keypair() for _ in range(keys)]
+    transactions = []
+    for i in range(count):
+        private_key, public_key = keypairs[i % keys]
+        sender = CryptoHandler.get_address_from_public_key(public_key)
+        unsigned = Transaction(sender, f"recipient{i}", float(i + 1), 1700000000.0 + i)
+        signature = CryptoHandler.sign_message(private_key, unsigned.signing_message())
+        transactions.append(Transaction(sender, unsigned.recipient, unsigned.amount, unsigned.timestamp,
+                                        signature, public_key.decode()))
+    return transactions
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--keys", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 4, cpu_count}))
+    args = parser.parse_args()
+
+    transactions = signed_transactions(args.transactions, args.keys)
+    print(f"{'workers':>8} {'batch tx/s':>11} {'pipeline tx/s':>14}")
+    for workers in args.workers:
+        verifier = SignatureVerifier(workers)
+
+        start = time.perf_counter()
+        assert all(verifier.verify_batch(transactions))
+        batch_rate = len(transactions) / (time.perf_counter() - start)
+
+        # submit 으로 하나씩 넣는 네트워크 수신 경로
+        done = threading.Event()
+        accepted = []
+
+        def on_verified(transaction):
+            accepted.append(transaction)
+            if len(accepted) == len(transactions):
+                done.set()
+
+        start = time.perf_counter()
+        for transaction in transactions:
+            verifier.submit(transaction, on_verified)
+        done.wait()
+        pipeline_rate = len(transactions) / (time.perf_counter() - start)
+        verifier.close()
+        print(f"{workers:>8} {batch_rate:11.0f} {pipeline_rate:14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""시드로 재현되는 합성 작업량: 지갑 키, 서명된 트랜잭션 스트림, 채굴된 체인
+
+RSA 키 생성과 PSS 서명은 내부 난수를 써서 시드로 고정할 수 없으므로, 키는 Wallet 으로 한 번 만들어
+bench_data 에 저장해 다시 쓰고 서명도 (시드, 키 수) 별로 저장해 둔다. 나머지(보내는 키, 받는 주소,
+금액, 타임스탬프, 블록 구성, nonce)는 모두 시드에서 정해지므로 같은 캐시를 쓰는 실행끼리는
+체인 끝 해시까지 같다. 스트림은 앞부분이 항상 같아서 더 길게 요청하면 늘어난 부분만 새로 서명한다.
+"""
+import hashlib
+import json
+import os
+import random
+from typing import List
+from blockchain import Block, Blockchain
+from difficulty import DifficultyEngine, difficulty_to_target
+from transaction import Transaction
+from wallet import CryptoHandler, Wallet
+
+WORKLOAD_DIR = os.path.join("bench_data", "workload")
+GENESIS_TIMESTAMP = 1700000000.0
+RECIPIENTS = 1000  # 지갑이 아닌 받는 주소 수
+SIGNATURE_FORMAT = 3  # 서명 메시지 형식 (바뀌면 저장된 서명을 다시 만듦, 2: timestamp 포함, 3: 수수료 포함)
+
+
+def _write_json(path: str, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def load_wallets(count: int, directory: str = WORKLOAD_DIR) -> List[Wallet]:
+    """저장된 키로 만든 지갑 count 개 (모자라면 새로 만들어 저장)"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "keys.json")
+    pairs = []
+    if os.path.exists(path):
+        with open(path) as f:
+            pairs = json.load(f)
+    if len(pairs) < count:
+        for _ in range(count - len(pairs)):
+            wallet = Wallet()
+            wallet.create_new_wallet()
+            pairs.append([wallet.private_key.decode(), wallet.public_key.decode()])
+        _write_json(path, pairs)
+
+    wallets = []
+    for private_key, public_key in pairs[:count]:
+        wallet = Wallet()
+        wallet.private_key = private_key.encode()
+        wallet.public_key = public_key.encode()
+        wallet.address = CryptoHandler.get_address_from_public_key(wallet.public_key)
+        wallets.append(wallet)
+    return wallets
+
+
+def keys_digest(wallets: List[Wallet]) -> str:
+    """지갑 공개키 목록의 SHA-256 (저장된 서명이 같은 키로 만들어졌는지 확인용)"""
+    digest = hashlib.sha256()
+    for wallet in wallets:
+        digest.update(wallet.public_key)
+    return digest.hexdigest()
+
+
+def signed_transactions(seed: int, count: int, wallets: List[Wallet],
+                        directory: str = WORKLOAD_DIR) -> List[Transaction]:
+    """시드로 정해지는 서명된 송금 count 건 (서명은 저장해 두고 다시 씀)"""
+    rng = random.Random(seed)
+    unsigned = []
+    for i in range(count):
+        wallet = wallets[rng.randrange(len(wallets))]
+        if rng.random() < 0.5:
+            recipient = wallets[rng.randrange(len(wallets))].address
+        else:
+            recipient = f"user{rng.randrange(RECIPIENTS)}"
+        # 멤풀의 바이트당 수수료 우선순위가 쓰이도록 수수료도 정함 (서명 메시지에 포함)
+        amount = rng.randint(1, 1000) / 10
+        fee = rng.randint(0, 100) / 100
+        unsigned.append((wallet, Transaction(wallet.address, recipient, amount, GENESIS_TIMESTAMP + i * 0.001,
+                                             fee=fee)))
+
+    path = os.path.join(directory, f"signatures-{seed}-{len(wallets)}.json")
+    digest = keys_digest(wallets)
+    signatures = []
+    if os.path.exists(path):
+        with open(path) as f:
+            cached = json.load(f)
+        if cached["keys"] == digest and cached.get("format") == SIGNATURE_FORMAT:
+            signatures = cached["signatures"]
+    if len(signatures) < count:
+        for wallet, transaction in unsigned[len(signatures):]:
+            signatures.append(wallet.sign_transaction(transaction.signing_message()))
+        _write_json(path, {"keys": digest, "format": SIGNATURE_FORMAT, "signatures": signatures})
+
+    return [Transaction(t.sender, t.recipient, t.amount, t.timestamp, signature, wallet.public_key.decode(), t.fee)
+            for (wallet, t), signature in zip(unsigned, signatures)]
+
+
+def bench_difficulty() -> DifficultyEngine:
+    """합성 체인의 난이도 규칙 (블록당 평균 16 해시)"""
+    return DifficultyEngine(difficulty_to_target(1))
+
+
+def genesis_block(difficulty: DifficultyEngine) -> Block:
+    """GENESIS_TIMESTAMP 의 고정 제네시스 (목표 간격으로 블록을 쌓아도 타임스탬프가 현재 시각을 넘지 않음)"""
+    return Block(0, [], GENESIS_TIMESTAMP, "0", difficulty.initial_target)
+
+
+def build_chain(transactions: List[Transaction], per_block: int, **options) -> Blockchain:
+    """transactions 를 per_block 건씩 담아 목표 간격마다 채굴한 체인 (제네시스도 고정)
+
+    options 는 Blockchain 생성 인자 (난이도 규칙은 bench_difficulty).
+    """
+    blockchain = Blockchain(difficulty=bench_difficulty(), **options)
+    blockchain.replace_chain([genesis_block(blockchain.difficulty)])
+    for start in range(0, len(transactions), per_block):
+        previous = blockchain.get_latest_block()
+        batch = list(transactions[start:start + per_block])
+        batch.append(Transaction("network", f"miner{previous.index % 4}", blockchain.mining_reward))
+        block = blockchain.create_block(batch, previous.timestamp + blockchain.difficulty.block_time)
+        blockchain.proof_of_work(block)
+        blockchain.append_block(block)
+    return blockchain
@@ -1,134 +1,291 @@
 import hashlib
+import itertools
+import logging
+import math
+import os
+import threading
 import time
 import json
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Tuple
 from wallet.crypto import CryptoHandler
+from miner import ParallelMiner, MiningCoordinator, MINING_CHECK_INTERVAL
+from merkle import merkle_root, MerkleTree
+from storage import BlockStore, StoredChain
+from transaction import Transaction
+from verification import SignatureVerifier, key_matches_sender, verify_signature
+from mempool import Mempool, DEFAULT_MAX_BYTES
+from validation import ChainValidator
+from snapshot import SnapshotChain
+from blocktree import BlockTree
+from txindex import TransactionIndex, encode_block_entries
+from difficulty import (DifficultyEngine, INITIAL_TARGET, is_valid_timestamp, meets_target, target_to_hex,
+                        target_work)
+from metrics import REGISTRY
+
+NONCE_SIZE = 8  # 헤더 끝에 붙는 nonce 바이트 수
+STATE_CHECKPOINT_INTERVAL = 1000  # 잔액 상태를 디스크에 저장하는 블록 간격
+MAX_BLOCK_TRANSACTIONS = 5000  # 블록당 최대 트랜잭션 수 (보상 포함)
+MAX_BLOCK_BYTES = 1024 * 1024  # 블록 템플릿에 담는 트랜잭션 직렬화 크기 한도
+HISTORY_DIRECTORY = "history"  # 스냅샷으로 시작한 저장소에서 백필한 이전 블록을 두는 하위 디렉터리
+MAX_REORG_DEPTH = 100  # 블록 트리로 롤백할 수 있는 최대 블록 수 (이보다 깊은 분기 블록은 받지 않고 정리)
+
+log = logging.getLogger(__name__)
+
+CHAIN_HEIGHT = REGISTRY.gauge("blockchain_height", "최선 체인 끝 블록의 높이")
+MEMPOOL_TRANSACTIONS = REGISTRY.gauge("blockchain_mempool_transactions", "멤풀의 보류 트랜잭션 수")
+MEMPOOL_BYTES = REGISTRY.gauge("blockchain_mempool_bytes", "멤풀 트랜잭션의 정규 직렬화 크기 합")
+REORGANIZATIONS = REGISTRY.counter("blockchain_reorganizations_total", "다른 분기로 전환한 횟수")
 
 class Block:
-    def __init__(self, index: int, transactions: List[Dict], timestamp: float, previous_hash: str):
+    __slots__ = ("index", "transactions", "timestamp", "previous_hash", "merkle_root", "target",
+                 "_merkle_tree", "nonce", "hash")
+
+    def __init__(self, index: int, transactions: List[Transaction], timestamp: float, previous_hash: str,
+                 target: int = INITIAL_TARGET):
         self.index = index
-        self.transactions = transactions
+        self.transactions = tuple(transactions)
         self.timestamp = timestamp
         self.previous_hash = previous_hash
+        # 트랜잭션은 머클 루트로 한 번만 커밋하고, 해시는 헤더에 대해서만 계산
+        self.merkle_root = merkle_root(self.transactions)
+        self.target = target  # 작업증명 목표값 (해시를 256비트 정수로 본 값이 이 이하여야 함)
+        self._merkle_tree = None
         self.nonce = 0
         self.hash = self.calculate_hash()
 
+    def header_prefix(self) -> bytes:
+        """nonce 를 제외한 헤더 직렬화 (nonce 는 이 뒤에 고정 길이로 붙음)"""
+        return self.encode_header_prefix(self.index, self.timestamp, self.previous_hash, self.merkle_root,
+                                         target_to_hex(self.target))
+
+    @staticmethod
+    def encode_header_prefix(index: int, timestamp: float, previous_hash: str, merkle_root: str,
+                             target: str) -> bytes:
+        return json.dumps([index, timestamp, previous_hash, merkle_root, target]).encode()
+
+    @staticmethod
+    def header_hash(header: Dict) -> str:
+        """바디 없이 헤더 딕셔너리만으로 블록 해시 계산"""
+        prefix = Block.encode_header_prefix(
+            header["index"], header["timestamp"], header["previous_hash"], header["merkle_root"], header["target"])
+        return Block.hash_with_nonce(hashlib.sha256(prefix), header["nonce"])
+
+    @staticmethod
+    def hash_with_nonce(prefix_hash, nonce: int) -> str:
+        """미리 계산한 헤더 prefix 해시 객체를 복사해 nonce 만 추가로 해싱"""
+        nonce_hash = prefix_hash.copy()
+        nonce_hash.update(nonce.to_bytes(NONCE_SIZE, "big"))
+        return nonce_hash.hexdigest()
+
     def calculate_hash(self) -> str:
-        block_string = json.dumps({
+        return self.hash_with_nonce(hashlib.sha256(self.header_prefix()), self.nonce)
+
+    def has_valid_merkle_root(self) -> bool:
+        return self.merkle_root == merkle_root(self.transactions)
+
+    def get_merkle_proof(self, transaction_index: int) -> List[Dict]:
+        """트랜잭션 포함 증명 생성 (트리는 처음 요청될 때 한 번만 구성)"""
+        if self._merkle_tree is None:
+            self._merkle_tree = MerkleTree(self.transactions)
+        return self._merkle_tree.get_proof(transaction_index)
+
+    def header(self) -> Dict:
+        """트랜잭션 없이 해시 검증과 포함 증명 확인에 필요한 헤더 정보"""
+        return {
             "index": self.index,
-            "transactions": self.transactions,
             "timestamp": self.timestamp,
             "previous_hash": self.previous_hash,
-            "nonce": self.nonce
-        }, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+            "merkle_root": self.merkle_root,
+            "target": target_to_hex(self.target),
+            "nonce": self.nonce,
+            "hash": self.hash
+        }
+
+    def to_dict(self) -> Dict:
+        block_data = self.header()
+        block_data["transactions"] = [transaction.to_dict() for transaction in self.transactions]
+        return block_data
+
+    @classmethod
+    def from_dict(cls, block_data: Dict) -> "Block":
+        """네트워크 형식의 블록 딕셔너리로 Block 생성 (머클 루트는 다시 계산)"""
+        block = cls(
+            block_data["index"],
+            [Transaction.from_dict(transaction) for transaction in block_data["transactions"]],
+            block_data["timestamp"],
+            block_data["previous_hash"],
+            int(block_data["target"], 16)
+        )
+        block.nonce = block_data["nonce"]
+        block.hash = block_data["hash"]
+        return block
 
 class Blockchain:
-    def __init__(self):
-        self.chain = [self.create_genesis_block()]
-        self.difficulty = 4  # 채굴 난이도
-        self.pending_transactions = []
+    def __init__(self, mining_workers: int = 1, store: Optional[BlockStore] = None,
+                 chain_cache_budget: int = 64 * 1024 * 1024, verify_workers: Optional[int] = None,
+                 mempool_max_bytes: int = DEFAULT_MAX_BYTES, validation_workers: Optional[int] = None,
+                 snapshot: Optional[Dict] = None, difficulty: Optional[DifficultyEngine] = None,
+                 mining_check_interval: int = MINING_CHECK_INTERVAL):
+        # 체인/블록 트리/잔액/멤풀 반영을 묶는 잠금 (네트워크 스레드와 채굴 스레드가 공유)
+        self.lock = threading.RLock()
+        self.mempool = Mempool(mempool_max_bytes)  # 보류 중인 트랜잭션 (txid 색인, 우선순위 순 선택)
+        self.store = store  # 지정하면 블록을 디스크에 저장하고 재시작 시 이어서 사용
+        self.chain_cache_budget = chain_cache_budget  # 디스크 체인의 블록 캐시 메모리 한도 (바이트)
+        self.history_store: Optional[BlockStore] = None  # 백필한 스냅샷 이전 블록 저장소 (스냅샷 + 저장소일 때)
+        self.balances: Dict[str, float] = {}  # 주소별 잔액 인덱스 (블록 단위로 갱신)
+        self.height_by_hash: Dict[str, int] = {}  # 블록 해시 -> 높이 (최선 체인)
+        self.tx_index = TransactionIndex()  # txid/주소 -> 트랜잭션 위치 (최선 체인)
+        self.tree = BlockTree()  # 분기를 포함한 모든 검증된 블록과 누적 작업량
+        # 난이도 재조정 엔진 (최선 체인 끝의 창을 유지, 규칙은 네트워크의 모든 노드가 같아야 함)
+        self.difficulty = difficulty or DifficultyEngine()
+        self._snapshot_window: List = []  # 스냅샷 블록 이전의 난이도 창 (타임스탬프, 작업량)
         self.mining_reward = 10  # 채굴 보상
+        # 워커가 2개 이상이면 멀티프로세스 채굴 엔진 사용
+        self.miner = ParallelMiner(mining_workers) if mining_workers > 1 else None
+        self._cancel_mining = threading.Event()
+        # 채굴 중 체인 끝이 바뀌면 새 끝에서 템플릿을 다시 만드는 채굴 조정자
+        self.mining = MiningCoordinator(self, self.miner, mining_check_interval)
+        if store is not None and len(store) > 0:
+            self.load_from_store()
+        elif snapshot is not None:
+            # read_snapshot 으로 digest 를 확인한 스냅샷 (그 이전 블록은 받지 않음)
+            self.load_snapshot(snapshot)
+        else:
+            self.chain = StoredChain(store, cache_budget=chain_cache_budget) if store is not None else []
+            self.append_block(self.create_genesis_block())
         self.network = None  # P2P 네트워크 참조를 위한 속성 추가
+        self.verify_workers = verify_workers  # 수신 트랜잭션 서명 검증 스레드 수 (None 이면 기본값)
+        self._verifier: Optional[SignatureVerifier] = None
+        # 전체 체인 검증 엔진 (구간을 프로세스 풀에 나눠 해시/작업증명/연결 관계 검증)
+        self.validator = ChainValidator(validation_workers)
+        # 이미 있는 값은 지표를 수집할 때만 읽음
+        CHAIN_HEIGHT.set_function(lambda: len(self.chain) - 1)
+        MEMPOOL_TRANSACTIONS.set_function(lambda: len(self.mempool))
+        MEMPOOL_BYTES.set_function(lambda: self.mempool.size_bytes)
 
     def create_genesis_block(self) -> Block:
-        return Block(0, [], time.time(), "0")
+        return Block(0, [], time.time(), "0", self.difficulty.initial_target)
 
     def get_latest_block(self) -> Block:
         return self.chain[-1]
 
-    def mine_pending_transactions(self, miner_address: str):
-        # 채굴 보상 트랜잭션 추가
-        self.pending_transactions.append({
-            "from": "network",
-            "to": miner_address,
-            "amount": self.mining_reward
-        })
-
-        # 새 블록 생성
-        block = Block(
-            len(self.chain),
-            self.pending_transactions,
-            time.time(),
-            self.get_latest_block().hash
-        )
-        
-        # 작업증명(PoW) 수행
-        self.proof_of_work(block)
+    @property
+    def first_height(self) -> int:
+        """블록을 가지고 있는 가장 낮은 높이 (스냅샷으로 시작해 백필 전이면 스냅샷 높이)"""
+        return self.chain.first_height if isinstance(self.chain, SnapshotChain) else 0
 
-        # 블록체인에 추가
-        self.chain.append(block)
+    @property
+    def checkpoint_height(self) -> int:
+        """이보다 아래로는 재구성할 수 없는 높이 (스냅샷 높이, 백필한 뒤에도 유지)"""
+        return self.chain.base_height if isinstance(self.chain, SnapshotChain) else 0
+
+    @property
+    def genesis_hash(self) -> str:
+        if isinstance(self.chain, SnapshotChain):
+            return self.chain.genesis_hash
+        return self.chain[0].hash
+
+    @property
+    def pending_transactions(self) -> List[Transaction]:
+        """보류 중인 트랜잭션 목록 (도착 순서)"""
+        return list(self.mempool)
+
+    def mine_pending_transactions(self, miner_address: str) -> Optional[Block]:
+        """보류 중인 트랜잭션으로 블록을 채굴 (취소되면 None 반환)"""
+        # 템플릿을 채굴해 체인에 추가 (도중에 다른 노드의 블록으로 끝이 바뀌면 새 끝에서 다시 시작,
+        # 취소되면 고른 트랜잭션은 멤풀에 그대로 남음)
+        block = self.mining.mine(miner_address)
+        if block is None:
+            log.info("채굴이 취소됨")
+            return None
         
         # 새 블록을 네트워크에 브로드캐스트
         if self.network:
             message = {
                 "type": "NEW_BLOCK",
-                "data": {
-                    "index": block.index,
-                    "transactions": block.transactions,
-                    "timestamp": block.timestamp,
-                    "previous_hash": block.previous_hash,
-                    "nonce": block.nonce,
-                    "hash": block.hash
-                }
+                "data": block.to_dict()
             }
-            print(f"새 블록 브로드캐스트: 인덱스 {block.index}")  # 디버깅 추가
-            self.network.broadcast_message(json.dumps(message))
-        
-        # 보류 중인 트랜잭션 초기화
-        self.pending_transactions = []
+            log.debug("새 블록 브로드캐스트: 인덱스 %d", block.index)
+            self.network.broadcast_message(message)
+        return block
+
+    def create_template(self, miner_address: str) -> Block:
+        """멤풀에서 우선순위 순으로 블록 한도만큼 고르고 채굴 보상 트랜잭션을 더한 블록 템플릿"""
+        with self.lock:
+            transactions = self.mempool.select(MAX_BLOCK_TRANSACTIONS - 1, MAX_BLOCK_BYTES)
+            transactions.append(Transaction("network", miner_address, self.mining_reward))
+            return self.create_block(transactions)
+
+    def create_block(self, transactions: List[Transaction], timestamp: Optional[float] = None) -> Block:
+        """현재 체인 끝에 이어질, 재조정 규칙의 목표값을 가진 (채굴 전) 블록
+
+        timestamp 를 주지 않으면 현재 시각 (최근 블록들의 중앙값보다는 늦게).
+        """
+        tip = self.get_latest_block()
+        if timestamp is None:
+            timestamp = max(time.time(), math.nextafter(self.difficulty.median_time_past(), math.inf))
+        return Block(tip.index + 1, transactions, timestamp, tip.hash, self.difficulty.next_target())
 
-    def proof_of_work(self, block: Block):
-        while block.hash[:self.difficulty] != "0" * self.difficulty:
+    def proof_of_work(self, block: Block) -> bool:
+        """작업증명 수행 (cancel_mining 으로 중단되면 False)"""
+        self._cancel_mining.clear()
+        if self.miner:
+            return self.miner.mine(block, block.target)
+
+        target = target_to_hex(block.target)
+        prefix_hash = hashlib.sha256(block.header_prefix())
+        while not meets_target(block.hash, target):
+            if self._cancel_mining.is_set():
+                return False
             block.nonce += 1
-            block.hash = block.calculate_hash()
+            block.hash = Block.hash_with_nonce(prefix_hash, block.nonce)
+        return True
+
+    def cancel_mining(self):
+        """진행 중인 작업증명을 중단"""
+        self._cancel_mining.set()
+        self.mining.cancel()
 
-    def add_transaction(self, sender: str, recipient: str, amount: float, signature=None, public_key=None):
+    def add_transaction(self, sender: str, recipient: str, amount: float, signature=None, public_key=None,
+                        timestamp: Optional[float] = None, fee: Optional[float] = None):
         # network에서 오는 채굴 보상 트랜잭션은 검증 제외
         if sender == "network":
-            transaction = {
-                "from": sender,
-                "to": recipient,
-                "amount": amount,
-                "timestamp": time.time()
-            }
-            self.pending_transactions.append(transaction)
+            self.mempool.add(Transaction(sender, recipient, amount, time.time()))
             return
+        unsigned = Transaction(sender, recipient, amount, timestamp, fee=fee)
+        if not unsigned.has_valid_amounts():
+            raise ValueError("Invalid transaction amount or fee")
 
-        # 트랜잭션 데이터 생성 (timestamp 제외)
-        transaction = {
-            "from": sender,
-            "to": recipient,
-            "amount": amount
-        }
-        
-        # 서명 검증
-        try:
-            message = json.dumps(transaction, sort_keys=True)
-            print(f"검증 중인 메시지: {message}")  # 디버깅용
-            print(f"서명: {signature}")  # 디버깅용
-            print(f"공개키: {public_key}")  # 디버깅용
-            
-            if not CryptoHandler.verify_signature(public_key, message, signature):
-                print("서명 검증 실패")  # 디버깅용
-                raise Exception("Invalid transaction signature")
-            print("서명 검증 성공")  # 디버깅용
-            
-            # 검증 성공 후 timestamp 추가
-            transaction["timestamp"] = time.time()
-            self.pending_transactions.append(transaction)
-            
-            # 새 트랜잭션을 네트워크에 브로드캐스트
-            if self.network:
-                message = {
-                    "type": "NEW_TRANSACTION",
-                    "data": transaction
-                }
-                self.network.broadcast_message(json.dumps(message))
-                
-        except Exception as e:
-            print(f"서명 검증 실패: {str(e)}")
-            raise Exception("Invalid transaction signature")
+        # 서명 검증 (timestamp 와 수수료는 서명한 쪽이 정해 서명에 포함)
+        # 실패 사유마다 다른 메시지로 알림 (잘못된 서명, 다른 사람의 키, 이미 확정된 트랜잭션)
+        message = unsigned.signing_message()
+        log.debug("검증 중인 메시지: %s", message)
+        log.debug("서명: %s", signature)
+        log.debug("공개키: %s", public_key)
+
+        if isinstance(public_key, str):
+            public_key = public_key.encode()
+        if not key_matches_sender(public_key, sender):
+            log.warning("공개키가 보내는 주소의 키가 아닌 트랜잭션 거부: %s", unsigned)
+            raise ValueError("Public key does not match sender")
+        if not verify_signature(public_key, message, signature):
+            log.warning("서명 검증 실패: %s", unsigned)
+            raise ValueError("Invalid transaction signature")
+        log.debug("서명 검증 성공")
+
+        # 다른 노드도 검증할 수 있도록 서명과 공개키 포함
+        transaction = Transaction(sender, recipient, amount, timestamp, signature, public_key.decode(), fee)
+        if self.tx_index.lookup(transaction.txid) is not None:
+            log.warning("이미 확정된 트랜잭션 거부: %s", transaction)
+            raise ValueError("Transaction already confirmed")
+
+        # 새 트랜잭션이면 네트워크에 브로드캐스트
+        if self.mempool.add(transaction) and self.network:
+            message = {
+                "type": "NEW_TRANSACTION",
+                "data": transaction.to_dict()
+            }
+            self.network.broadcast_message(message)
 
     def verify_transaction(self, transaction, signature, public_key):
         if not signature or not public_key:
@@ -138,72 +295,502 @@ class Blockchain:
         return CryptoHandler.verify_signature(public_key, message, signature)
 
     def get_balance(self, address: str) -> float:
-        balance = 0
-        for block in self.chain:
-            for transaction in block.transactions:
-                if transaction["from"] == address:
-                    balance -= transaction["amount"]
-                if transaction["to"] == address:
-                    balance += transaction["amount"]
-        return balance
+        return self.balances.get(address, 0)
 
-    def is_chain_valid(self) -> bool:
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        """최선 체인에서 해시로 찾은 블록 (없으면 None)"""
+        with self.lock:
+            height = self.height_by_hash.get(block_hash)
+            return self.chain[height] if height is not None else None
+
+    def get_transaction(self, txid: str) -> Optional[Tuple[int, Transaction]]:
+        """최선 체인에 포함된 트랜잭션과 그 블록 높이 (없으면 None)"""
+        with self.lock:
+            location = self.tx_index.lookup(txid)
+            if location is None:
+                return None
+            height, position = location
+            return height, self.chain[height].transactions[position]
+
+    def get_address_history(self, address: str, limit: Optional[int] = None) -> List[Tuple[int, Transaction]]:
+        """주소가 보내거나 받은 확정 트랜잭션의 (높이, 트랜잭션) 목록, 오래된 순 (limit 이면 최근 것만)"""
+        with self.lock:
+            refs = self.tx_index.address_refs(address)
+            if limit is not None:
+                refs = refs[len(refs) - limit:] if limit < len(refs) else refs
+            return [(height, self.chain[height].transactions[position]) for height, position in refs]
+
+    def append_block(self, block: Block):
+        """검증된 블록을 체인 끝에 추가하고 잔액 인덱스를 갱신"""
+        with self.lock:
+            self.chain.append(block)
+            self.height_by_hash[block.hash] = block.index
+            node = self.tree.get(block.hash)
+            if node is None:
+                node = self.tree.add(block.hash, self.tree.get(block.previous_hash), block.index,
+                                     block.timestamp, target_work(block.target))
+            self.tree.release_block(node)  # 최선 체인의 블록은 체인에서 읽음
+            self.tree.best = node
+            self.tree.prune(block.index - MAX_REORG_DEPTH)
+            self.mining.tip_changed()
+            self.difficulty.push(block.timestamp, target_work(block.target))
+            self._apply_block_balances(block)
+            self.tx_index.add_block(block.index, block.transactions)
+            self.mempool.remove_transactions(block.transactions)
+            if self.store is not None and block.index % STATE_CHECKPOINT_INTERVAL == 0:
+                self.save_state()
+
+    def load_snapshot(self, snapshot: Dict):
+        """스냅샷 블록과 잔액으로 시작 (저장소를 쓰면 기준 상태도 함께 보관)"""
+        base = Block.from_dict(snapshot["block"])
+        blocks = StoredChain(self.store, cache_budget=self.chain_cache_budget) if self.store is not None else []
+        self.chain = SnapshotChain(base.index, blocks, snapshot["genesis_hash"], self._open_history())
+        if self.history_store is not None:
+            self.history_store.truncate(0)  # 빈 저장소 옆에 남은 이전 백필 기록은 이 스냅샷의 것이 아닐 수 있음
+        self.chain.append(base)
+        self.height_by_hash[base.hash] = base.index
+        self.tx_index.add_block(base.index, base.transactions)
+        self.tree.best = self.tree.add(base.hash, None, base.index, base.timestamp, target_work(base.target))
+        self._snapshot_window = [tuple(entry) for entry in snapshot["difficulty_window"]]
+        self.difficulty.reset(self.window_entries(self.tree.best))
+        self.balances = dict(snapshot["balances"])
+        if self.store is not None:
+            self.store.save_snapshot(snapshot)
+            self.save_state()
+        log.info("스냅샷으로 시작: 높이 %d", base.index)
+
+    def load_from_store(self):
+        """저장소의 인덱스와 잔액 체크포인트로 시작 (블록 본문은 필요할 때 읽음)"""
+        blocks = StoredChain(self.store, cache_budget=self.chain_cache_budget)
+        # 스냅샷으로 시작한 저장소는 0번 레코드가 스냅샷 높이의 블록
+        snapshot = self.store.load_snapshot()
+        base = snapshot["height"] if snapshot else 0
+        self.chain = SnapshotChain(base, blocks, snapshot["genesis_hash"], self._open_history()) if snapshot else blocks
+        if snapshot:
+            self._snapshot_window = [tuple(entry) for entry in snapshot["difficulty_window"]]
+            # 이전 실행에서 백필해 둔 블록의 해시와 트랜잭션 색인 복원
+            for height, block_hash in enumerate(self.history_store.iter_hashes()):
+                self.height_by_hash[block_hash] = height
+            for height, record in enumerate(self.history_store.iter_tx_records()):
+                self.tx_index.add_encoded(height, record)
+        node = None
+        for offset, (block_hash, timestamp, target) in enumerate(self.store.iter_headers()):
+            self.height_by_hash[block_hash] = base + offset
+            node = self.tree.add(block_hash, node, base + offset, timestamp, target_work(target))
+        self.tree.best = node
+        self.difficulty.reset(self.window_entries(node))
+
+        # 체크포인트가 현재 체인 위에 있으면 그 이후 블록만 다시 적용
+        start = base
+        if snapshot:
+            self.balances = dict(snapshot["balances"])
+            start = base + 1
+        state = self.store.load_state()
+        if (state and base <= state["height"] < len(self.chain)
+                and self.store.block_hash(state["height"] - base) == state["hash"]):
+            self.balances = state["balances"]
+            start = state["height"] + 1
+        for height in range(start, len(self.chain)):
+            self._apply_block_balances(self.chain[height])
+        # 트랜잭션 색인은 저장된 색인 레코드로 복원하고, 레코드가 없는 블록만 본문을 읽어 다시 만들어 기록
+        for offset, record in enumerate(self.store.iter_tx_records()):
+            self.tx_index.add_encoded(base + offset, record)
+        for offset in range(self.store.tx_record_count, len(self.store)):
+            transactions = [Transaction.from_dict(data)
+                            for data in self.store.read_block_data(offset)["transactions"]]
+            self.tx_index.add_block(base + offset, transactions)
+            self.store.append_tx_record(encode_block_entries(transactions))
+
+    def _open_history(self) -> Optional[StoredChain]:
+        """저장소를 쓰면 백필 블록을 저장소의 history 하위 디렉터리에 보관 (없으면 메모리에만 둠)"""
+        if self.store is None:
+            return None
+        self.history_store = BlockStore(os.path.join(self.store.directory, HISTORY_DIRECTORY),
+                                        self.store.fsync_policy, self.store.fsync_interval)
+        return StoredChain(self.history_store, cache_budget=self.chain_cache_budget)
+
+    def add_history(self, blocks: List[Block]):
+        """백필로 받은 스냅샷 이전 블록 추가 (연결 관계는 호출 쪽에서 확인, 저장소를 쓰면 디스크에도 기록)"""
+        with self.lock:
+            self.chain.extend_history(blocks)
+            for block in blocks:
+                self.height_by_hash[block.hash] = block.index
+                self.tx_index.add_block(block.index, block.transactions)
+            if self.chain.history_complete:
+                log.info("백필 완료: 높이 0 ~ %d", self.chain.base_height - 1)
+
+    def save_state(self):
+        tip = self.get_latest_block()
+        self.store.save_state({"height": tip.index, "hash": tip.hash, "balances": self.balances})
+
+    def close(self):
+        """검증 파이프라인을 멈추고, 저장소를 사용하는 경우 상태를 기록하고 파일을 닫음"""
+        if self._verifier is not None:
+            self._verifier.close()
+            self._verifier = None
+        if self.store is not None:
+            self.save_state()
+            self.store.close()
+        if self.history_store is not None:
+            self.history_store.close()
+
+    def replace_chain(self, new_chain: List[Block]):
+        """체인을 교체 (공통 조상 이후의 블록만 롤백/적용)"""
+        with self.lock:
+            fork = self.checkpoint_height
+            if fork and (len(new_chain) <= fork or new_chain[fork].hash != self.chain[fork].hash):
+                log.warning("스냅샷 이전에서 갈라진 체인은 적용할 수 없음")
+                return
+            while (fork < len(self.chain) and fork < len(new_chain)
+                   and self.chain[fork].hash == new_chain[fork].hash):
+                fork += 1
+            self.reorganize(fork, new_chain[fork:])
+
+    def reorganize(self, height: int, blocks: List[Block]):
+        """height 이상의 블록을 롤백하고 blocks 를 그 자리에 적용"""
+        with self.lock:
+            # 교체되는 블록들을 역순으로 롤백하고, 보상이 아닌 트랜잭션은 서명 검증을 거쳐 멤풀로 되돌림
+            # (블록 검증은 서명을 확인하지 않으므로 다른 노드의 블록에 있던 트랜잭션도 검증해야 함)
+            reverted = []
+            for block in reversed(self.chain[height:]):
+                self._revert_block_balances(block)
+                self.tx_index.remove_block(block.index, block.transactions)
+                del self.height_by_hash[block.hash]
+                node = self.tree.get(block.hash)
+                if node is not None:
+                    self.tree.keep_block(node, block)  # 다시 최선 체인이 될 수 있도록 분기 블록으로 보관
+                reverted.extend(transaction for transaction in block.transactions if transaction.sender != "network")
+            del self.chain[height:]
+            # 난이도 창을 공통 조상 기준으로 되돌린 뒤 새 블록을 차례로 반영
+            self.tree.best = self.tree.get(self.chain[height - 1].hash) if height > 0 else None
+            self.difficulty.reset(self.window_entries(self.tree.best))
+
+            for block in blocks:
+                self.append_block(block)
+            for transaction in reverted:
+                if self.tx_index.lookup(transaction.txid) is None:
+                    self.add_transaction_from_network(transaction)
+
+    def window_entries(self, node) -> List:
+        """node 까지의 최근 난이도 창 (타임스탬프, 작업량) 목록, 오래된 순"""
+        entries = []
+        size = self.difficulty.window + 1
+        while node is not None and len(entries) < size:
+            parent = node.parent
+            entries.append((node.timestamp, node.work - parent.work if parent is not None else node.work))
+            node = parent
+        entries.reverse()
+        if len(entries) < size and self._snapshot_window:
+            # 스냅샷 블록 이전은 트리에 없으므로 스냅샷에 담긴 창으로 채움
+            entries = self._snapshot_window[len(entries) - size:] + entries
+        return entries
+
+    def engine_at(self, parent) -> DifficultyEngine:
+        """parent 노드까지 반영한 난이도 엔진 (최선 끝이면 유지 중인 엔진을 그대로 반환하므로 읽기만 할 것)"""
+        if parent is self.tree.best:
+            return self.difficulty
+        engine = self.difficulty.clone()
+        engine.reset(self.window_entries(parent))
+        return engine
 
-            # 현재 블록의 해시 검증
-            if current_block.hash != current_block.calculate_hash():
+    def expected_target(self, parent) -> int:
+        """parent 노드 다음 블록이 가져야 할 목표값"""
+        return self.engine_at(parent).next_target()
+
+    def has_more_work(self, headers: List[Dict]) -> bool:
+        """연결된 헤더(블록 딕셔너리) 목록을 이었을 때 누적 작업량이 현재 최선 체인보다 큰지"""
+        if not headers:
+            return False
+        parent = self.tree.get(headers[0]["previous_hash"])
+        work = parent.work if parent is not None else 0
+        for header in headers:
+            work += target_work(int(header["target"], 16))
+        return work > self.tree.best.work
+
+    def add_block(self, block: Block) -> bool:
+        """검증된 블록을 트리에 추가하고, 누적 작업량이 최선 끝보다 커지면 그 분기로 재구성
+
+        트리에 새로 추가되면 True (부모를 모르거나, 최선 끝에서 MAX_REORG_DEPTH 보다 깊은 분기이거나,
+        유효하지 않거나 이미 있으면 False). 트리의 루트는 우리 제네시스(또는 스냅샷 블록) 하나뿐이므로
+        부모를 모르는 블록은 헤더를 먼저 받아 부모부터 채워야 한다.
+        """
+        with self.lock:
+            if block.hash in self.tree:
+                return False
+            parent = self.tree.get(block.previous_hash)
+            if parent is None:
+                return False
+            best = self.tree.best
+            if parent is not best and block.index <= best.height - MAX_REORG_DEPTH:
+                return False
+            previous = parent.block if parent.block is not None else self.chain[parent.height]
+            if not self.is_valid_new_block(block, previous):
                 return False
 
-            # 이전 블록 해시 링크 검증
-            if current_block.previous_hash != previous_block.hash:
+            if parent is best:
+                # 최선 끝에 바로 이어지는 블록 (가장 흔한 경우)
+                self.append_block(block)
+                return True
+            node = self.tree.add(block.hash, parent, block.index, block.timestamp, target_work(block.target), block)
+            if node.work > best.work:
+                fork = self.tree.fork_point(best, node)
+                if fork is None or best.height - fork.height > MAX_REORG_DEPTH:
+                    # 정리된 분기에 이어진 블록 (공통 조상이 재구성 한도보다 깊음)
+                    log.warning("재구성 한도(%d 블록)보다 깊은 분기로는 전환하지 않음", MAX_REORG_DEPTH)
+                    return True
+                branch = self.tree.branch(fork, node)
+                height = fork.height + 1
+                log.info("분기 전환: 높이 %d부터 %d개 롤백, %d개 적용", height, len(self.chain) - height, len(branch))
+                REORGANIZATIONS.inc()
+                self.reorganize(height, [branch_node.block for branch_node in branch])
+            return True
+
+    def get_block_locator(self) -> List[str]:
+        """최근 10개 블록 이후로는 간격을 두 배씩 늘려 고른 블록 해시 목록 (제네시스 포함)"""
+        locator = []
+        height = len(self.chain) - 1
+        step = 1
+        first = self.first_height
+        while height > first:
+            locator.append(self.chain[height].hash)
+            if len(locator) >= 10:
+                step *= 2
+            height -= step
+        if first:
+            # 스냅샷 블록 이전은 가지고 있지 않으므로 스냅샷 블록에서 멈춤
+            locator.append(self.chain[first].hash)
+        locator.append(self.genesis_hash)
+        return locator
+
+    def find_fork_height(self, locator: List[str]) -> int:
+        """locator 에서 처음으로 우리 체인에 있는 블록의 높이 (공통 블록이 없으면 -1)"""
+        for block_hash in locator:
+            height = self.height_by_hash.get(block_hash)
+            if height is not None:
+                return height
+        return -1
+
+    def is_valid_header_chain(self, headers: List[Dict]) -> bool:
+        """헤더 목록의 해시, 연결 관계, 목표값과 작업증명 검증 (첫 헤더의 부모는 우리 체인에 있어야 함)"""
+        previous = headers[0]
+        now = time.time()
+        engine = self.difficulty.clone()
+        if previous["index"] > 0:
+            parent_height = self.height_by_hash.get(previous["previous_hash"])
+            if parent_height is None or parent_height + 1 != previous["index"]:
                 return False
+            engine.reset(self.window_entries(self.tree.get(previous["previous_hash"])))
 
+        for position, header in enumerate(headers):
+            if position and (previous["index"] + 1 != header["index"] or previous["hash"] != header["previous_hash"]):
+                return False
+            if Block.header_hash(header) != header["hash"]:
+                return False
+            # 목표값은 앞 블록들로 정해지며, 제네시스는 채굴하지 않으므로 작업증명 확인 제외
+            target = int(header["target"], 16)
+            if target != engine.next_target():
+                return False
+            if header["index"] > 0 and not meets_target(header["hash"], target_to_hex(target)):
+                return False
+            if header["index"] > 0 and not is_valid_timestamp(header["timestamp"], engine.median_time_past(), now):
+                return False
+            engine.push(header["timestamp"], target_work(target))
+            previous = header
         return True
 
+    @staticmethod
+    def _block_fees(block: Block):
+        """블록 수수료 합계와 받을 채굴자 (보상 트랜잭션 수신자, 없으면 수수료는 소각)"""
+        fees = 0
+        miner = None
+        for transaction in block.transactions:
+            if transaction.sender == "network":
+                miner = miner or transaction.recipient
+            elif transaction.fee:
+                fees += transaction.fee
+        return fees, miner
+
+    def _apply_block_balances(self, block: Block):
+        for transaction in block.transactions:
+            amount = transaction.amount + (transaction.fee or 0)
+            sender = transaction.sender
+            recipient = transaction.recipient
+            self.balances[sender] = self.balances.get(sender, 0) - amount
+            self.balances[recipient] = self.balances.get(recipient, 0) + transaction.amount
+        fees, miner = self._block_fees(block)
+        if fees and miner is not None:
+            self.balances[miner] += fees
+
+    def _revert_block_balances(self, block: Block):
+        fees, miner = self._block_fees(block)
+        if fees and miner is not None:
+            self.balances[miner] -= fees
+        for transaction in reversed(block.transactions):
+            amount = transaction.amount + (transaction.fee or 0)
+            sender = transaction.sender
+            recipient = transaction.recipient
+            self.balances[recipient] -= transaction.amount
+            self.balances[sender] += amount
+
+    def is_chain_valid(self) -> bool:
+        # 제네시스 다음 블록부터 해시, 작업증명, 머클 루트, 이전 블록 연결 검증
+        return self.validate_chain(self.chain) is None
+
+    def validate_chain(self, blocks) -> Optional[int]:
+        """blocks 의 첫 블록을 기준으로 검증하고 처음 실패한 블록의 위치 반환 (유효하면 None)
+
+        기준 블록이 우리 트리에 있거나 제네시스면 그 뒤 블록들의 목표값이 재조정 규칙과 같은지도 확인한다.
+        """
+        iterator = iter(blocks)
+        anchor = next(iterator, None)
+        if anchor is None:
+            return None
+        return self.validator.validate(itertools.chain([anchor], iterator), self._retarget_from(anchor),
+                                       self.confirmed_before(anchor))
+
+    def iter_valid_blocks(self, blocks):
+        """validate_chain 과 같은 검증을 하면서 확인된 블록(첫 기준 블록 제외)을 순서대로 내보냄
+
+        실패하면 그 앞 블록까지만 내보내며, 실패 위치와 사유는 validator.last_failure 에 남는다.
+        """
+        iterator = iter(blocks)
+        anchor = next(iterator, None)
+        if anchor is None:
+            return iter(())
+        return self.validator.iter_valid(itertools.chain([anchor], iterator), self._retarget_from(anchor),
+                                         self.confirmed_before(anchor))
+
+    def _retarget_from(self, anchor: Block) -> Optional[DifficultyEngine]:
+        """기준 블록까지 반영한 난이도 엔진 (우리 트리에 없고 제네시스도 아니면 None)"""
+        retarget = self.difficulty.clone()
+        node = self.tree.get(anchor.hash)
+        if node is not None:
+            retarget.reset(self.window_entries(node))
+        elif anchor.index == 0:
+            retarget.push(anchor.timestamp, target_work(anchor.target))
+        else:
+            retarget = None
+        return retarget
+
     def add_block_from_network(self, block_data: Dict):
-        """네트워크에서 받은 블록을 추가"""
-        block = Block(
-            block_data["index"],
-            block_data["transactions"],
-            block_data["timestamp"],
-            block_data["previous_hash"]
-        )
-        block.nonce = block_data["nonce"]
-        block.hash = block_data["hash"]
-        
-        if self.is_valid_new_block(block, self.get_latest_block()):
-            self.chain.append(block)
-            return True
-        return False
+        """네트워크에서 받은 블록을 블록 트리에 추가"""
+        return self.add_block(Block.from_dict(block_data))
 
-    def add_transaction_from_network(self, transaction: Dict):
-        """네트워크에서 받은 트랜잭션을 추가"""
-        self.pending_transactions.append(transaction)
+    @property
+    def verifier(self) -> SignatureVerifier:
+        if self._verifier is None:
+            self._verifier = SignatureVerifier(self.verify_workers)
+        return self._verifier
+
+    def add_transaction_from_network(self, transaction: Transaction, on_accepted=None):
+        """네트워크에서 받은 트랜잭션을 검증 파이프라인에 넣고, 서명이 유효한 경우에만 추가"""
+        if transaction.sender == "network":
+            # 채굴 보상은 블록 안에서만 유효
+            log.warning("보상 트랜잭션은 네트워크로 받을 수 없음: %s", transaction)
+            return
+        if transaction.txid in self.mempool:
+            # 브로드캐스트로 되돌아온 트랜잭션은 다시 검증하지 않음
+            return
+        if self.tx_index.lookup(transaction.txid) is not None:
+            # 이미 확정된 트랜잭션 (gossip 중복 제거 기간이 지난 재전송)
+            log.debug("이미 확정된 트랜잭션 무시: %s", transaction)
+            return
+        if not transaction.has_valid_amounts():
+            log.warning("금액이나 수수료가 유효하지 않은 트랜잭션 거부: %s", transaction)
+            return
+        if not transaction.public_key or not key_matches_sender(transaction.public_key.encode(), transaction.sender):
+            log.warning("공개키가 보내는 주소의 키가 아닌 트랜잭션 거부: %s", transaction)
+            return
+        self.verifier.submit(transaction, lambda verified: self._accept_transaction(verified, on_accepted))
+
+    def _accept_transaction(self, transaction: Transaction, on_accepted=None):
+        # 검증 중에 같은 트랜잭션이 먼저 들어왔거나 블록에 포함됐을 수 있으므로 새로 추가된 경우에만 전파
+        with self.lock:
+            if self.tx_index.lookup(transaction.txid) is not None or not self.mempool.add(transaction):
+                return
+        if on_accepted:
+            on_accepted(transaction)
 
     def to_dict(self) -> Dict:
         """블록체인을 딕셔너리로 변환"""
         return {
-            "chain": [{
-                "index": block.index,
-                "transactions": block.transactions,
-                "timestamp": block.timestamp,
-                "previous_hash": block.previous_hash,
-                "nonce": block.nonce,
-                "hash": block.hash
-            } for block in self.chain],
-            "pending_transactions": self.pending_transactions
+            "chain": list(self.iter_block_dicts()),
+            "pending_transactions": [transaction.to_dict() for transaction in self.pending_transactions]
         }
 
+    def iter_block_dicts(self):
+        """블록 딕셔너리를 높이 순으로 생성 (디스크 체인은 Block 객체를 만들지 않음)"""
+        if isinstance(self.chain, (StoredChain, SnapshotChain)):
+            return self.chain.iter_block_dicts()
+        return (block.to_dict() for block in self.chain)
+
+    def iter_block_bytes(self, encode=None):
+        """블록 JSON 바이트를 높이 순으로 생성 (디스크 체인은 저장된 레코드를 그대로 읽음)
+
+        encode 는 메모리에 있는 블록을 직렬화하는 함수이며 (네트워크의 캐시 등), 없으면 매번 json.dumps.
+        """
+        encode = encode or (lambda block: json.dumps(block.to_dict()).encode())
+        if isinstance(self.chain, (StoredChain, SnapshotChain)):
+            return self.chain.iter_block_bytes(encode)
+        return (encode(block) for block in self.chain)
+
+    def has_replayed_transactions(self, block: Block, parent) -> bool:
+        """보상이 아닌 트랜잭션이 블록 안에서 반복되거나 parent 까지의 분기에 이미 확정되어 있으면 True
+
+        최선 체인은 공통 조상 높이까지만 트랜잭션 색인으로 확인하고, 그 위의 분기 블록은 트리에 보관된
+        본문으로 확인한다. 타임스탬프 없는 채굴 보상은 같은 txid 가 반복될 수 있으므로 제외한다.
+        """
+        txids = [transaction.txid for transaction in block.transactions if transaction.sender != "network"]
+        if len(set(txids)) != len(txids):
+            return True
+        best = self.tree.best
+        fork = self.tree.fork_point(best, parent)
+        branch_txids = set()
+        for node in self.tree.branch(fork, parent):
+            branch_txids.update(transaction.txid for transaction in node.block.transactions)
+        fork_height = fork.height if fork is not None else -1
+        for txid in txids:
+            location = self.tx_index.lookup(txid)
+            if txid in branch_txids or (location is not None and location[0] <= fork_height):
+                return True
+        return False
+
+    def confirmed_before(self, anchor: Block) -> Optional[Callable[[str], bool]]:
+        """anchor 까지의 최선 체인에 확정된 txid 인지 확인하는 함수 (anchor 가 최선 체인에 없으면 None)"""
+        if self.height_by_hash.get(anchor.hash) != anchor.index:
+            return None
+
+        def confirmed(txid: str) -> bool:
+            location = self.tx_index.lookup(txid)
+            return location is not None and location[0] <= anchor.index
+        return confirmed
+
     def is_valid_new_block(self, new_block: Block, previous_block: Block) -> bool:
         """새로운 블록의 유효성 검증"""
         if previous_block.index + 1 != new_block.index:
             return False
         if previous_block.hash != new_block.previous_hash:
             return False
+        if len(new_block.transactions) > MAX_BLOCK_TRANSACTIONS:
+            return False
+        if not all(transaction.has_valid_amounts() for transaction in new_block.transactions):
+            return False
+        parent = self.tree.get(previous_block.hash)
+        if parent is None:
+            return False
+        if self.has_replayed_transactions(new_block, parent):
+            return False
+        engine = self.engine_at(parent)
+        if new_block.target != engine.next_target():
+            return False
+        if not is_valid_timestamp(new_block.timestamp, engine.median_time_past(), time.time()):
+            return False
         if new_block.calculate_hash() != new_block.hash:
             return False
+        if not meets_target(new_block.hash, target_to_hex(new_block.target)):
+            return False
+        if not new_block.has_valid_merkle_root():
+            return False
         return True
 
 # 사용 예시
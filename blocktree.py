@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional
+
+
+class TreeNode:
+    """블록 트리의 노드 (누적 작업량은 루트부터 이 블록까지의 작업량 합)
+
+    timestamp 는 분기의 난이도 창을 다시 계산할 때 쓴다. block 은 현재 최선 체인에 없는
+    분기 블록만 보관하고 (BlockTree.keep_block/release_block 으로 바꿈), 최선 체인의 블록은 체인에서 읽는다.
+    """
+    __slots__ = ("hash", "parent", "height", "timestamp", "work", "block")
+
+    def __init__(self, block_hash: str, parent: Optional["TreeNode"], height: int, timestamp: float,
+                 work: int, block=None):
+        self.hash = block_hash
+        self.parent = parent
+        self.height = height
+        self.timestamp = timestamp
+        self.work = work
+        self.block = block
+
+
+class BlockTree:
+    """해시로 색인한 블록 트리와 누적 작업량이 가장 큰 최선 끝 블록
+
+    새 블록의 누적 작업량은 부모 값에 더해 한 번에 계산되므로, 최선 끝과의 비교는
+    체인 길이와 무관하게 상수 시간이다.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, TreeNode] = {}
+        self.side: Dict[str, TreeNode] = {}  # 블록을 보관 중인 분기 노드 (최선 체인 밖)
+        self.best: Optional[TreeNode] = None  # 현재 최선 체인의 끝 블록
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.nodes
+
+    def get(self, block_hash: str) -> Optional[TreeNode]:
+        return self.nodes.get(block_hash)
+
+    def add(self, block_hash: str, parent: Optional[TreeNode], height: int, timestamp: float, work: int,
+            block=None) -> TreeNode:
+        """parent 아래에 블록 추가 (work 는 이 블록 하나의 작업량, parent 가 None 이면 새 루트)"""
+        total = parent.work + work if parent is not None else work
+        node = TreeNode(block_hash, parent, height, timestamp, total, block)
+        self.nodes[block_hash] = node
+        if block is not None:
+            self.side[block_hash] = node
+        return node
+
+    def keep_block(self, node: TreeNode, block):
+        """최선 체인에서 빠진 노드의 블록을 분기 블록으로 보관"""
+        node.block = block
+        self.side[node.hash] = node
+
+    def release_block(self, node: TreeNode):
+        """최선 체인에 들어간 노드의 블록은 체인에서 읽으므로 놓음"""
+        node.block = None
+        self.side.pop(node.hash, None)
+
+    def prune(self, max_height: int) -> int:
+        """높이가 max_height 이하인 분기 노드를 트리에서 제거하고 제거한 수를 반환"""
+        stale = [node for node in self.side.values() if node.height <= max_height]
+        for node in stale:
+            del self.side[node.hash]
+            del self.nodes[node.hash]
+        return len(stale)
+
+    @staticmethod
+    def fork_point(a: TreeNode, b: TreeNode) -> Optional[TreeNode]:
+        """두 노드의 공통 조상 (루트가 다르면 None)"""
+        while a is not b:
+            if a is None or b is None:
+                return None
+            if a.height >= b.height:
+                a = a.parent
+            else:
+                b = b.parent
+        return a
+
+    @staticmethod
+    def branch(ancestor: Optional[TreeNode], tip: TreeNode) -> List[TreeNode]:
+        """ancestor 다음부터 tip 까지의 노드 (높이 순)"""
+        nodes = []
+        while tip is not ancestor:
+            nodes.append(tip)
+            tip = tip.parent
+        nodes.reverse()
+        return nodes
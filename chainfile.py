@@ -0,0 +1,129 @@
+"""체인을 파일로 스트리밍해 내보내고 가져오기 (대량 부트스트랩용)
+
+블록마다 json.dumps(block.to_dict()) 바이트 하나를 레코드로 쓴다.
+- ndjson: 레코드마다 한 줄
+- lp: 블록 저장소 세그먼트와 같은 길이(4바이트) + CRC32(4바이트) 헤더 뒤에 레코드
+
+가져올 때는 첫 바이트가 "{" 이면 ndjson, 아니면 lp 로 읽는다 (lp 의 첫 바이트는 레코드 길이의 최상위
+바이트라 블록 하나가 2GB 를 넘지 않는 한 "{" 가 될 수 없음). 양쪽 모두 제너레이터로 한 블록씩 처리하므로
+파일을 다루는 데 쓰는 메모리는 체인 길이와 무관하다.
+"""
+import itertools
+import json
+import logging
+import os
+import time
+import zlib
+from typing import Iterable, Iterator, Optional
+from storage import RECORD_HEADER
+
+FORMATS = ("ndjson", "lp")
+PROGRESS_INTERVAL = 100_000  # 진행 상황을 기록하는 블록 간격
+
+log = logging.getLogger(__name__)
+
+
+def write_chain_file(path: str, records: Iterable[bytes], file_format: str = "ndjson") -> int:
+    """블록 JSON 레코드를 파일로 원자적으로 저장하고 레코드 수 반환"""
+    if file_format not in FORMATS:
+        raise ValueError(f"알 수 없는 체인 파일 형식: {file_format}")
+    count = 0
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        for data in records:
+            if file_format == "ndjson":
+                f.write(data)
+                f.write(b"\n")
+            else:
+                f.write(RECORD_HEADER.pack(len(data), zlib.crc32(data)))
+                f.write(data)
+            count += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return count
+
+
+def read_chain_file(path: str) -> Iterator[bytes]:
+    """체인 파일의 블록 JSON 레코드를 순서대로 읽음 (형식은 첫 바이트로 판별)"""
+    with open(path, "rb") as f:
+        if f.peek(1)[:1] == b"{":
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+            return
+        position = 0
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < RECORD_HEADER.size:
+                raise ValueError(f"체인 파일 레코드 {position} 가 잘림")
+            length, checksum = RECORD_HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) < length or zlib.crc32(data) != checksum:
+                raise ValueError(f"체인 파일 레코드 {position} 가 손상됨")
+            yield data
+            position += 1
+
+
+def export_chain(blockchain, path: str, file_format: str = "ndjson") -> int:
+    """제네시스부터 체인 끝까지 내보내고 블록 수 반환 (디스크 체인은 저장된 레코드를 그대로 복사)"""
+    if blockchain.first_height:
+        raise ValueError("스냅샷 이전 블록이 없어 내보낼 수 없음 (백필한 뒤 다시 시도)")
+    return write_chain_file(path, blockchain.iter_block_bytes(), file_format)
+
+
+def import_chain(blockchain, path: str, parallel: bool = False) -> int:
+    """체인 파일의 블록을 검증하며 체인 끝에 이어 붙이고 추가한 블록 수 반환
+
+    비어 있는 체인(제네시스만 있음)이면 파일의 제네시스로 바꾸고, 이미 가진 높이의 블록은 해시만
+    비교하고 건너뛴다 (중단된 가져오기를 이어서 할 수 있음). parallel 이면 blockchain.validator 의
+    워커들이 앞선 구간을 미리 검증하고, 아니면 블록마다 add_block 으로 검증한다.
+    """
+    from blockchain import Block
+
+    blocks = (Block.from_dict(json.loads(data)) for data in read_chain_file(path))
+    genesis = next(blocks, None)
+    if genesis is None:
+        raise ValueError("체인 파일이 비어 있음")
+    if genesis.hash != blockchain.genesis_hash:
+        if len(blockchain.chain) > 1 or blockchain.checkpoint_height:
+            raise ValueError("다른 제네시스에서 시작한 체인은 가져올 수 없음")
+        blockchain.replace_chain([genesis])
+
+    # 이미 가진 블록은 건너뜀
+    first: Optional[Block] = None
+    for block in blocks:
+        if block.index >= len(blockchain.chain):
+            first = block
+            break
+        if block.index >= blockchain.first_height and blockchain.chain[block.index].hash != block.hash:
+            raise ValueError(f"높이 {block.index}에서 체인이 갈라짐")
+    if first is None:
+        return 0
+    remaining = itertools.chain([first], blocks)
+
+    added = 0
+    started = time.perf_counter()
+    if parallel:
+        for block in blockchain.iter_valid_blocks(itertools.chain([blockchain.get_latest_block()], remaining)):
+            blockchain.append_block(block)
+            added += 1
+            _report_progress(added, started)
+        failure = blockchain.validator.last_failure
+        if failure is not None:
+            raise ValueError(f"블록 {blockchain.get_latest_block().index + 1}가 유효하지 않음: {failure[1]}")
+    else:
+        for block in remaining:
+            if not blockchain.add_block(block) or blockchain.tree.best.hash != block.hash:
+                raise ValueError(f"블록 {block.index}가 유효하지 않음")
+            added += 1
+            _report_progress(added, started)
+    return added
+
+
+def _report_progress(added: int, started: float):
+    if added % PROGRESS_INTERVAL == 0:
+        log.info("%d 블록 가져옴 (%.0f blocks/s)", added, added / (time.perf_counter() - started))
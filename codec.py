@@ -0,0 +1,291 @@
+"""블록/트랜잭션 메시지의 압축 바이너리 인코딩
+
+JSON 형식과 같은 딕셔너리를 주고받되, 키 이름 없이 정해진 순서로 필드를 쓰고
+주소·공개키 같은 문자열은 메시지 안에서 한 번만 싣고 이후에는 번호로 참조한다.
+64자리 16진수 해시/목표값과 base64 서명은 원래 바이트로 줄인다. 숫자는 int/float 구분을 유지하므로
+디코딩한 딕셔너리의 정규 JSON(=txid)은 원본과 같다.
+"""
+import base64
+import binascii
+import json
+import struct
+from typing import Dict, List, Optional
+
+DOUBLE = struct.Struct("!d")
+INT64 = struct.Struct("!q")
+
+# 숫자 태그
+NUMBER_NONE = 0
+NUMBER_INT = 1
+NUMBER_FLOAT = 2
+NUMBER_TEXT = 3  # 64비트를 넘는 정수 등은 JSON 텍스트로
+
+# 트랜잭션 필드 플래그
+TX_TIMESTAMP = 0x01
+TX_SIGNED = 0x02
+TX_FEE = 0x04
+
+
+class Encoder:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.strings: Dict[str, int] = {}
+
+    def varint(self, value: int):
+        if value < 0:
+            raise ValueError(f"음수는 varint 로 인코딩할 수 없음: {value}")
+        buffer = self.buffer
+        while value >= 0x80:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buffer.append(value)
+
+    def string(self, value: str):
+        """처음 나온 문자열은 0 뒤에 본문을, 이후에는 (번호 + 1) 만 기록"""
+        index = self.strings.get(value)
+        if index is not None:
+            self.varint(index + 1)
+            return
+        self.strings[value] = len(self.strings)
+        data = value.encode()
+        self.varint(0)
+        self.varint(len(data))
+        self.buffer += data
+
+    def number(self, value):
+        if value is None:
+            self.buffer.append(NUMBER_NONE)
+        elif type(value) is float:
+            self.buffer.append(NUMBER_FLOAT)
+            self.buffer += DOUBLE.pack(value)
+        elif type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            self.buffer.append(NUMBER_INT)
+            self.buffer += INT64.pack(value)
+        else:
+            self.buffer.append(NUMBER_TEXT)
+            self.string(json.dumps(value))
+
+    def hash(self, value: str):
+        """64자리 소문자 16진수면 32바이트로, 아니면(제네시스의 "0" 등) 문자열로"""
+        if len(value) == 64 and value == value.lower():
+            try:
+                raw = bytes.fromhex(value)
+            except ValueError:
+                raw = None
+            if raw is not None and len(raw) == 32:
+                self.buffer.append(1)
+                self.buffer += raw
+                return
+        self.buffer.append(0)
+        self.string(value)
+
+    def signature(self, value: str):
+        """base64 서명은 원래 바이트로 (다시 인코딩해 같은 문자열이 나오는 경우만)"""
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except (binascii.Error, ValueError):
+            raw = None
+        if raw is not None and base64.b64encode(raw).decode() == value:
+            self.buffer.append(1)
+            self.varint(len(raw))
+            self.buffer += raw
+            return
+        self.buffer.append(0)
+        self.string(value)
+
+    def transaction(self, data: Dict):
+        flags = 0
+        if "timestamp" in data:
+            flags |= TX_TIMESTAMP
+        if "signature" in data:
+            flags |= TX_SIGNED
+        if "fee" in data:
+            flags |= TX_FEE
+        self.buffer.append(flags)
+        self.string(data["from"])
+        self.string(data["to"])
+        self.number(data["amount"])
+        if flags & TX_FEE:
+            self.number(data["fee"])
+        if flags & TX_TIMESTAMP:
+            self.number(data["timestamp"])
+        if flags & TX_SIGNED:
+            self.signature(data["signature"])
+            self.string(data["public_key"])
+
+    def transactions(self, items: List[Dict]):
+        self.varint(len(items))
+        for item in items:
+            self.transaction(item)
+
+    def header(self, data: Dict):
+        self.varint(data["index"])
+        self.number(data["timestamp"])
+        self.hash(data["previous_hash"])
+        self.hash(data["merkle_root"])
+        self.hash(data["target"])
+        self.varint(data["nonce"])
+        self.hash(data["hash"])
+
+    def block(self, data: Dict):
+        self.header(data)
+        self.transactions(data["transactions"])
+
+    def blocks(self, items: List[Dict]):
+        self.varint(len(items))
+        for item in items:
+            self.block(item)
+
+
+class Decoder:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.position = 0
+        self.strings: List[str] = []
+
+    def byte(self) -> int:
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def take(self, size: int) -> memoryview:
+        start = self.position
+        self.position += size
+        if self.position > len(self.data):
+            raise ValueError("바이너리 메시지가 잘림")
+        return self.data[start:self.position]
+
+    def varint(self) -> int:
+        data = self.data
+        value = 0
+        shift = 0
+        while True:
+            byte = data[self.position]
+            self.position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def string(self) -> str:
+        reference = self.varint()
+        if reference:
+            return self.strings[reference - 1]
+        value = str(self.take(self.varint()), "utf-8")
+        self.strings.append(value)
+        return value
+
+    def number(self):
+        tag = self.byte()
+        if tag == NUMBER_NONE:
+            return None
+        if tag == NUMBER_FLOAT:
+            return DOUBLE.unpack(self.take(8))[0]
+        if tag == NUMBER_INT:
+            return INT64.unpack(self.take(8))[0]
+        if tag == NUMBER_TEXT:
+            return json.loads(self.string())
+        raise ValueError(f"알 수 없는 숫자 태그: {tag}")
+
+    def hash(self) -> str:
+        if self.byte():
+            return self.take(32).hex()
+        return self.string()
+
+    def signature(self) -> str:
+        if self.byte():
+            return base64.b64encode(self.take(self.varint())).decode()
+        return self.string()
+
+    def transaction(self) -> Dict:
+        # 키 순서는 Transaction.to_dict 와 같게 유지
+        flags = self.byte()
+        data = {"from": self.string(), "to": self.string(), "amount": self.number()}
+        if flags & TX_FEE:
+            data["fee"] = self.number()
+        if flags & TX_TIMESTAMP:
+            data["timestamp"] = self.number()
+        if flags & TX_SIGNED:
+            data["signature"] = self.signature()
+            data["public_key"] = self.string()
+        return data
+
+    def transactions(self) -> List[Dict]:
+        return [self.transaction() for _ in range(self.varint())]
+
+    def header(self) -> Dict:
+        return {
+            "index": self.varint(),
+            "timestamp": self.number(),
+            "previous_hash": self.hash(),
+            "merkle_root": self.hash(),
+            "target": self.hash(),
+            "nonce": self.varint(),
+            "hash": self.hash()
+        }
+
+    def block(self) -> Dict:
+        data = self.header()
+        data["transactions"] = self.transactions()
+        return data
+
+    def blocks(self) -> List[Dict]:
+        return [self.block() for _ in range(self.varint())]
+
+
+def _encode_blocks(encoder: Encoder, data: Dict):
+    encoder.blocks(data["blocks"])
+
+
+def _decode_blocks(decoder: Decoder) -> Dict:
+    return {"blocks": decoder.blocks()}
+
+
+def _encode_headers(encoder: Encoder, data: Dict):
+    encoder.varint(len(data["headers"]))
+    for header in data["headers"]:
+        encoder.header(header)
+
+
+def _decode_headers(decoder: Decoder) -> Dict:
+    return {"headers": [decoder.header() for _ in range(decoder.varint())]}
+
+
+def _encode_chain(encoder: Encoder, data: Dict):
+    encoder.blocks(data["chain"])
+    encoder.transactions(data["pending_transactions"])
+
+
+def _decode_chain(decoder: Decoder) -> Dict:
+    return {"chain": decoder.blocks(), "pending_transactions": decoder.transactions()}
+
+
+# 메시지 타입별 (인코더, 디코더). 여기에 없는 타입은 항상 JSON 으로 보냄
+BINARY_MESSAGES = {
+    "NEW_BLOCK": (Encoder.block, Decoder.block),
+    "NEW_TRANSACTION": (Encoder.transaction, Decoder.transaction),
+    "BLOCKS": (_encode_blocks, _decode_blocks),
+    "HEADERS": (_encode_headers, _decode_headers),
+    "CHAIN_RESPONSE": (_encode_chain, _decode_chain),
+}
+
+
+def encode_data(message_type: str, data) -> Optional[bytes]:
+    """바이너리로 보낼 수 있는 메시지면 data 를 인코딩, 아니면 None"""
+    codec = BINARY_MESSAGES.get(message_type)
+    if codec is None:
+        return None
+    encoder = Encoder()
+    codec[0](encoder, data)
+    return bytes(encoder.buffer)
+
+
+def decode_data(message_type: str, payload: bytes):
+    codec = BINARY_MESSAGES.get(message_type)
+    if codec is None:
+        raise ValueError(f"바이너리 인코딩을 지원하지 않는 메시지: {message_type}")
+    decoder = Decoder(payload)
+    data = codec[1](decoder)
+    if decoder.position != len(decoder.data):
+        raise ValueError("바이너리 메시지 끝에 남은 데이터가 있음")
+    return data
@@ -0,0 +1,114 @@
+"""256비트 목표값 기반 작업증명 난이도와 이동 창 재조정
+
+블록 해시를 256비트 정수로 보고 목표값 이하이면 유효하다. 다음 블록의 목표값은 최근
+window 개 블록 간격의 작업량 합과 걸린 시간으로 정해지며, 창의 작업량 합은 블록이 들어오고
+나갈 때 더하고 빼는 누적값이라 블록당 재조정 비용은 창 크기와 무관하다.
+"""
+import itertools
+from collections import deque
+from typing import Iterable, Sequence, Tuple
+
+MAX_TARGET = 2 ** 256 - 1  # 가장 쉬운 목표값
+BLOCK_TIME = 10.0  # 목표 블록 간격 (초)
+RETARGET_WINDOW = 60  # 재조정에 쓰는 최근 블록 간격 수
+MAX_ADJUSTMENT = 4  # 창의 경과 시간을 기대값의 1/4 ~ 4배로 제한 (한 번에 급변하지 않도록)
+# 블록 타임스탬프는 최근 MEDIAN_TIME_SPAN 개 블록의 중앙값보다 늦고 현재 시각 + MAX_FUTURE_DRIFT 이내여야 함
+# (타임스탬프를 마음대로 정해 창의 경과 시간을 늘려 난이도를 낮추는 것을 막음)
+MEDIAN_TIME_SPAN = 11
+MAX_FUTURE_DRIFT = 2 * 60 * 60
+
+
+def difficulty_to_target(zeros: int) -> int:
+    """해시 앞 zeros 자리가 16진수 0 이어야 하는 예전 난이도에 해당하는 목표값"""
+    return 16 ** (64 - zeros) - 1
+
+
+def target_to_hex(target: int) -> str:
+    return f"{target:064x}"
+
+
+def target_work(target: int) -> int:
+    """목표값 이하의 해시 하나를 찾는 데 필요한 평균 해시 횟수"""
+    return 2 ** 256 // (target + 1)
+
+
+def meets_target(block_hash: str, target_hex: str) -> bool:
+    """해시가 target_to_hex 로 만든 목표값 이하인지
+
+    같은 길이의 소문자 16진수 문자열 비교는 256비트 정수 비교와 같으므로, 채굴 루프는 목표값을 한 번만
+    변환해 두고 해시마다 int 변환 없이 비교한다.
+    """
+    return block_hash <= target_hex
+
+
+def median_time_past(timestamps: Sequence[float]) -> float:
+    """직전 블록들의 타임스탬프(오래된 순) 중 마지막 MEDIAN_TIME_SPAN 개의 중앙값 (없으면 -inf)"""
+    recent = sorted(itertools.islice(reversed(timestamps), MEDIAN_TIME_SPAN))
+    return recent[len(recent) // 2] if recent else float("-inf")
+
+
+def is_valid_timestamp(timestamp: float, median_time: float, now: float) -> bool:
+    """median_time 보다 늦고 now + MAX_FUTURE_DRIFT 를 넘지 않는 타임스탬프인지"""
+    return median_time < timestamp <= now + MAX_FUTURE_DRIFT
+
+
+INITIAL_TARGET = difficulty_to_target(4)
+
+
+class DifficultyEngine:
+    """최근 window + 1 개 블록의 (타임스탬프, 작업량)으로 다음 목표값 계산
+
+    초당 해시 수 = 창의 작업량 합 / 경과 시간 으로 추정하고, 다음 블록의 작업량이
+    block_time 동안의 해시 수가 되도록 목표값을 정한다. 정수 연산만 사용하므로 모든
+    노드가 같은 블록들에서 같은 목표값을 얻는다.
+    """
+
+    def __init__(self, initial_target: int = INITIAL_TARGET, block_time: float = BLOCK_TIME,
+                 window: int = RETARGET_WINDOW, max_target: int = MAX_TARGET):
+        self.initial_target = initial_target
+        self.block_time = block_time
+        self.window = window
+        self.max_target = max_target
+        self._entries: deque = deque()  # (타임스탬프, 작업량), 오래된 순
+        self._work_sum = 0  # _entries 의 작업량 합
+
+    def clone(self) -> "DifficultyEngine":
+        """같은 규칙의 빈 엔진 (분기나 받은 체인을 따로 계산할 때)"""
+        return DifficultyEngine(self.initial_target, self.block_time, self.window, self.max_target)
+
+    def reset(self, entries: Iterable[Tuple[float, int]] = ()):
+        self._entries.clear()
+        self._work_sum = 0
+        for timestamp, work in entries:
+            self.push(timestamp, work)
+
+    def push(self, timestamp: float, work: int):
+        """체인 끝에 블록 추가"""
+        self._entries.append((timestamp, work))
+        self._work_sum += work
+        if len(self._entries) > self.window + 1:
+            self._work_sum -= self._entries.popleft()[1]
+
+    def recent_timestamps(self) -> list:
+        """창 끝의 최근 MEDIAN_TIME_SPAN 개 블록 타임스탬프 (오래된 순)"""
+        recent = [timestamp for timestamp, _ in itertools.islice(reversed(self._entries), MEDIAN_TIME_SPAN)]
+        recent.reverse()
+        return recent
+
+    def median_time_past(self) -> float:
+        """다음 블록의 타임스탬프가 넘어야 하는 값 (최근 블록 타임스탬프의 중앙값)"""
+        return median_time_past(self.recent_timestamps())
+
+    def next_target(self) -> int:
+        """현재 창 다음에 올 블록의 목표값"""
+        entries = self._entries
+        intervals = len(entries) - 1
+        if intervals < 1:
+            return self.initial_target
+        # 첫 블록은 간격의 시작점이므로 그 작업량은 빼고 계산
+        work = self._work_sum - entries[0][1]
+        expected = round(self.block_time * 1000) * intervals
+        timespan = round((entries[-1][0] - entries[0][0]) * 1000)
+        timespan = min(max(timespan, expected // MAX_ADJUSTMENT, 1), expected * MAX_ADJUSTMENT)
+        next_work = work * round(self.block_time * 1000) // timespan
+        return min(max(2 ** 256 // max(next_work, 1) - 1, 1), self.max_target)
@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+SEEN_CACHE_SIZE = 100_000  # 기억하는 블록 해시/txid 수
+SEEN_CACHE_TTL = 600.0  # 본 항목을 기억하는 시간 (초)
+RELAY_CACHE_SIZE = 10_000  # GETDATA 응답용으로 보관하는 프레임 수
+RELAY_CACHE_TTL = 120.0
+REQUEST_TTL = 5.0  # 한 피어에게 GETDATA 를 보낸 뒤 다른 피어에게 다시 요청하기까지 대기 시간
+
+
+class SeenCache:
+    """크기와 TTL 이 제한된 키 집합 (값을 함께 보관할 수도 있음)
+
+    항목은 추가된 순서로 저장되고 TTL 이 모두 같으므로, 만료와 크기 초과 정리는 항상
+    가장 오래된 항목부터 일어난다.
+    """
+
+    def __init__(self, max_size: int = SEEN_CACHE_SIZE, ttl: float = SEEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()  # 키 -> (만료 시각, 값)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._expire(time.monotonic())
+            return key in self._items
+
+    def add(self, key: str, value: Any = None) -> bool:
+        """처음 보는 키면 기록하고 True, 이미 있으면 False"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if key in self._items:
+                return False
+            self._items[key] = (now + self.ttl, value)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            return True
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            item = self._items.get(key)
+            return item[1] if item is not None else None
+
+    def discard(self, key: str):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def _expire(self, now: float):
+        items = self._items
+        while items:
+            key, (expires, _) = next(iter(items.items()))
+            if expires > now:
+                break
+            del items[key]
@@ -1,16 +1,43 @@
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                            QTextEdit, QMessageBox, QGroupBox, QFileDialog)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from blockchain import Blockchain
+from transaction import Transaction
 from network import P2PNetwork
+from storage import BlockStore
+from metrics import configure_logging, enable as enable_metrics, snapshot as metrics_snapshot
+import logging
 import sys
 import time
 import os
-import json
+
+HISTORY_LIMIT = 50  # 거래 내역에 표시하는 최근 트랜잭션 수
+METRICS_POLL_MS = 1000  # 지표 표시를 갱신하는 간격 (밀리초)
+
+log = logging.getLogger(__name__)
+
+def format_metrics(metrics):
+    """지표 스냅샷을 한 줄 요약으로 (아직 없는 값은 0)"""
+    def mean_ms(name):
+        histogram = metrics.get(name)
+        if not histogram:
+            return 0.0
+        return histogram["sum"] / max(histogram["count"], 1) * 1000
+
+    received = sum((metrics.get("blockchain_p2p_received_bytes_total") or {}).values())
+    sent = sum((metrics.get("blockchain_p2p_sent_bytes_total") or {}).values())
+    return (f"높이: {metrics.get('blockchain_height') or 0}  "
+            f"해시레이트: {metrics.get('blockchain_mining_hashrate') or 0:.0f} H/s  "
+            f"멤풀: {metrics.get('blockchain_mempool_transactions') or 0}건  "
+            f"피어: {metrics.get('blockchain_p2p_peers') or 0}  "
+            f"서명 검증: {mean_ms('blockchain_signature_verify_seconds'):.2f} ms  "
+            f"수신/송신: {received / 1024:.0f}/{sent / 1024:.0f} KiB  "
+            f"동기화: {mean_ms('blockchain_sync_seconds') / 1000:.2f} s")
 
 class MiningThread(QThread):
     finished = pyqtSignal(str)
+    cancelled = pyqtSignal(str)
     
     def __init__(self, blockchain, miner_address):
         super().__init__()
@@ -18,13 +45,19 @@ class MiningThread(QThread):
         self.miner_address = miner_address
         
     def run(self):
-        self.blockchain.mine_pending_transactions(self.miner_address)
-        self.finished.emit(self.miner_address)
+        block = self.blockchain.mine_pending_transactions(self.miner_address)
+        if block is None:
+            self.cancelled.emit(self.miner_address)
+        else:
+            self.finished.emit(self.miner_address)
+
+    def cancel(self):
+        self.blockchain.cancel_mining()
 
 class BlockchainGUI(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.blockchain = Blockchain()
+        self.blockchain = Blockchain(mining_workers=os.cpu_count() or 1)
         self.network = None
         self.init_ui()
         
@@ -90,6 +123,9 @@ class BlockchainGUI(QMainWindow):
         self.amount_input = QLineEdit()
         self.amount_input.setPlaceholderText('금액')
         
+        self.fee_input = QLineEdit()
+        self.fee_input.setPlaceholderText('수수료 (선택)')
+        
         send_btn = QPushButton('전송')
         send_btn.clicked.connect(self.create_transaction)
         
@@ -99,6 +135,8 @@ class BlockchainGUI(QMainWindow):
         transaction_layout.addWidget(self.recipient_input)
         transaction_layout.addWidget(QLabel('금액:'))
         transaction_layout.addWidget(self.amount_input)
+        transaction_layout.addWidget(QLabel('수수료:'))
+        transaction_layout.addWidget(self.fee_input)
         transaction_layout.addWidget(send_btn)
         transaction_group.setLayout(transaction_layout)
         
@@ -112,9 +150,13 @@ class BlockchainGUI(QMainWindow):
         mine_btn = QPushButton('채굴 시작')
         mine_btn.clicked.connect(self.start_mining)
         
+        stop_mining_btn = QPushButton('채굴 중지')
+        stop_mining_btn.clicked.connect(self.stop_mining)
+        
         mining_layout.addWidget(QLabel('채굴자 주소:'))
         mining_layout.addWidget(self.miner_input)
         mining_layout.addWidget(mine_btn)
+        mining_layout.addWidget(stop_mining_btn)
         mining_layout.addStretch()
         mining_group.setLayout(mining_layout)
         
@@ -128,15 +170,29 @@ class BlockchainGUI(QMainWindow):
         check_balance_btn = QPushButton('잔액 확인')
         check_balance_btn.clicked.connect(self.check_balance)
         
+        history_btn = QPushButton('거래 내역')
+        history_btn.clicked.connect(self.show_history)
+
         self.balance_label = QLabel('잔액: 0')
         
         balance_layout.addWidget(QLabel('주소:'))
         balance_layout.addWidget(self.balance_address_input)
         balance_layout.addWidget(check_balance_btn)
+        balance_layout.addWidget(history_btn)
         balance_layout.addWidget(self.balance_label)
         balance_layout.addStretch()
         balance_group.setLayout(balance_layout)
         
+        # 지표 영역 (METRICS_POLL_MS 마다 스냅샷을 읽어 갱신)
+        metrics_group = QGroupBox('지표')
+        metrics_layout = QHBoxLayout()
+        self.metrics_label = QLabel(format_metrics({}))
+        metrics_layout.addWidget(self.metrics_label)
+        metrics_group.setLayout(metrics_layout)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_metrics)
+        self.metrics_timer.start(METRICS_POLL_MS)
+
         # 로그 영역
         log_group = QGroupBox('로그')
         log_layout = QVBoxLayout()
@@ -172,15 +228,29 @@ class BlockchainGUI(QMainWindow):
         layout.addWidget(transaction_group)
         layout.addWidget(mining_group)
         layout.addWidget(balance_group)
+        layout.addWidget(metrics_group)
         layout.addWidget(log_group)
         layout.insertWidget(1, wallet_group)
         
+    def closeEvent(self, event):
+        if self.network:
+            self.network.close()
+        self.blockchain.close()
+        super().closeEvent(event)
+        
     def log(self, message):
         self.log_text.append(message)
+
+    def update_metrics(self):
+        self.metrics_label.setText(format_metrics(metrics_snapshot()))
         
     def start_network(self):
         try:
             port = int(self.port_input.text())
+            # 포트별 데이터 디렉터리에 저장된 체인을 불러와 이어서 사용
+            self.blockchain.close()
+            self.blockchain = Blockchain(mining_workers=os.cpu_count() or 1,
+                                         store=BlockStore(os.path.join("data", str(port))))
             self.network = P2PNetwork("localhost", port, self.blockchain)
             self.blockchain.network = self.network
             self.network.start()
@@ -209,36 +279,35 @@ class BlockchainGUI(QMainWindow):
             sender = self.wallet.address
             recipient = self.recipient_input.text()
             amount = float(self.amount_input.text())
+            # 수수료는 선택 항목 (비워 두면 수수료 없는 트랜잭션)
+            fee = float(self.fee_input.text()) if self.fee_input.text().strip() else None
             
-            # 트랜잭션 데이터 생성 (timestamp 제외)
-            transaction_data = {
-                "from": sender,
-                "to": recipient,
-                "amount": amount
-            }
-            
-            # 메시지 생성
-            message = json.dumps(transaction_data, sort_keys=True)
-            print(f"서명할 메시지: {message}")  # 디버깅용
+            # 메시지 생성 (timestamp 와 수수료도 서명에 포함)
+            timestamp = time.time()
+            message = Transaction(sender, recipient, amount, timestamp, fee=fee).signing_message()
+            log.debug("서명할 메시지: %s", message)
             
             # 트랜잭션 서명
             signature = self.wallet.sign_transaction(message)
-            print(f"생성된 서명: {signature}")  # 디버깅용
+            log.debug("생성된 서명: %s", signature)
             
             # 트랜잭션 추가
             self.blockchain.add_transaction(
                 sender, recipient, amount, 
                 signature=signature, 
-                public_key=self.wallet.public_key
+                public_key=self.wallet.public_key,
+                timestamp=timestamp,
+                fee=fee
             )
             
-            self.log(f"트랜잭션 생성: {sender} -> {recipient}: {amount}")
+            self.log(f"트랜잭션 생성: {sender} -> {recipient}: {amount}" + (f" (수수료 {fee})" if fee else ""))
             
             # 입력 필드 초기화
             self.recipient_input.clear()
             self.amount_input.clear()
+            self.fee_input.clear()
         except Exception as e:
-            print(f"트랜잭션 생성 오류: {str(e)}")  # 디버깅용
+            log.warning("트랜잭션 생성 오류: %s", e)
             QMessageBox.critical(self, "오류", f"트랜잭션 생성 실패: {str(e)}")
             
     def start_mining(self):
@@ -246,13 +315,21 @@ class BlockchainGUI(QMainWindow):
             miner = self.miner_input.text()
             self.mining_thread = MiningThread(self.blockchain, miner)
             self.mining_thread.finished.connect(self.mining_finished)
+            self.mining_thread.cancelled.connect(self.mining_cancelled)
             self.mining_thread.start()
             self.log("채굴 시작...")
         except Exception as e:
             QMessageBox.critical(self, "오류", f"채굴 실패: {str(e)}")
             
+    def stop_mining(self):
+        if hasattr(self, 'mining_thread') and self.mining_thread.isRunning():
+            self.mining_thread.cancel()
+            
     def mining_finished(self, miner):
         self.log(f"채굴 완료: {miner}")
+        
+    def mining_cancelled(self, miner):
+        self.log(f"채굴 취소됨: {miner}")
             
     def check_balance(self):
         try:
@@ -263,10 +340,19 @@ class BlockchainGUI(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "오류", f"잔액 조회 실패: {str(e)}")
 
+    def show_history(self):
+        try:
+            address = self.balance_address_input.text()
+            history = self.blockchain.get_address_history(address, limit=HISTORY_LIMIT)
+            self.log(f"거래 내역: {address} - 최근 {len(history)}건")
+            for height, transaction in reversed(history):
+                self.log(f"  블록 {height}: {transaction.sender} -> {transaction.recipient}: {transaction.amount}")
+        except Exception as e:
+            QMessageBox.critical(self, "오류", f"거래 내역 조회 실패: {str(e)}")
+
     def create_wallet(self):
         try:
-            import sys
-            print("Python 경로:", sys.path)  # 디버깅용
+            log.debug("Python 경로: %s", sys.path)
             
             from wallet.wallet import Wallet
             self.wallet = Wallet()
@@ -275,7 +361,7 @@ class BlockchainGUI(QMainWindow):
             self.wallet_info.setText(f'월렛 주소: {address}\n파일: {filename}')
             self.log(f"새 월렛 생성됨: {address}")
         except Exception as e:
-            print(f"월렛 생성 오류 상세: {str(e)}")  # 디버깅용
+            log.warning("월렛 생성 오류 상세: %s", e)
             QMessageBox.critical(self, "오류", f"월렛 생성 실패: {str(e)}")
 
     def load_wallet(self):
@@ -292,6 +378,8 @@ class BlockchainGUI(QMainWindow):
             QMessageBox.critical(self, "오류", f"월렛 로드 실패: {str(e)}")
 
 if __name__ == '__main__':
+    configure_logging(os.environ.get("LOG_LEVEL", "info").lower())
+    enable_metrics()
     app = QApplication(sys.argv)
     window = BlockchainGUI()
     window.show()
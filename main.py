@@ -1,18 +1,84 @@
 from blockchain import Blockchain
 from network import P2PNetwork
+from storage import BlockStore
+from snapshot import read_snapshot, write_snapshot
+from chainfile import FORMATS, export_chain, import_chain
+from metrics import LOG_LEVELS, configure_logging, serve_metrics
+import argparse
 import time
 import sys
+import os
+
+def chain_file_command(argv):
+    """export/import 하위 명령: 데이터 디렉터리의 체인을 파일로 내보내거나 파일에서 가져오기"""
+    parser = argparse.ArgumentParser(prog="python main.py")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--log-level", choices=LOG_LEVELS, default="info")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", parents=[common], help="체인을 파일로 내보내기")
+    export_parser.add_argument("datadir")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    import_parser = commands.add_parser("import", parents=[common], help="파일의 체인을 검증하며 가져오기")
+    import_parser.add_argument("datadir")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--workers", type=int, default=1,
+                               help="2 이상이면 이 수의 프로세스로 앞선 구간을 미리 검증")
+    args = parser.parse_args(argv)
+    configure_logging(args.log_level)
+
+    start = time.perf_counter()
+    workers = getattr(args, "workers", 1)
+    blockchain = Blockchain(store=BlockStore(args.datadir), validation_workers=workers)
+    try:
+        if args.command == "export":
+            count = export_chain(blockchain, args.file, args.format)
+            print(f"내보내기 완료: {count} 블록 -> {args.file}")
+        else:
+            count = import_chain(blockchain, args.file, parallel=workers > 1)
+            elapsed = time.perf_counter() - start
+            print(f"가져오기 완료: {count} 블록, 체인 높이 {len(blockchain.chain) - 1} "
+                  f"({count / max(elapsed, 1e-9):.0f} blocks/s)")
+    except ValueError as e:
+        print(f"{'내보내기' if args.command == 'export' else '가져오기'} 실패: {e}")
+    finally:
+        blockchain.close()
+
+def node_arguments(argv):
+    """노드 실행 인자: 포트 번호 (와 데이터 디렉터리, 시작용 스냅샷과 그 digest), 로그 수준, 지표 포트"""
+    parser = argparse.ArgumentParser(prog="python main.py")
+    parser.add_argument("port", type=int)
+    parser.add_argument("datadir", nargs="?")
+    parser.add_argument("snapshot", nargs="?", help="시작용 스냅샷 파일 (digest 와 함께 지정)")
+    parser.add_argument("digest", nargs="?")
+    parser.add_argument("--log-level", choices=LOG_LEVELS, default="info", help="off 면 로그를 모두 끔")
+    parser.add_argument("--metrics-port", type=int, help="지정하면 지표를 켜고 localhost 의 이 포트 /metrics 로 제공")
+    args = parser.parse_args(argv)
+    if args.snapshot and not args.digest:
+        parser.error("스냅샷은 digest 와 함께 지정해야 함")
+    return args
 
 def main():
-    # 커맨드 라인 인자로 포트 번호 받기
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <port>")
+    if len(sys.argv) >= 2 and sys.argv[1] in ("export", "import"):
+        chain_file_command(sys.argv[1:])
         return
+
+    if len(sys.argv) < 2:
+        print("Usage: python main.py <port> [datadir [snapshot.json snapshot_digest]] [--log-level LEVEL] "
+              "[--metrics-port PORT]")
+        print("       python main.py export <datadir> <file> [--format ndjson|lp]")
+        print("       python main.py import <datadir> <file> [--workers N]")
+        return
+
+    args = node_arguments(sys.argv[1:])
+    configure_logging(args.log_level)
+    port = args.port
+    datadir = args.datadir or os.path.join("data", str(port))
+    snapshot = read_snapshot(args.snapshot, args.digest) if args.snapshot else None
+    metrics_server = serve_metrics(args.metrics_port) if args.metrics_port is not None else None
     
-    port = int(sys.argv[1])
-    
-    # 블록체인 및 P2P 네트워크 초기화
-    blockchain = Blockchain()
+    # 블록체인 및 P2P 네트워크 초기화 (datadir 에 저장된 체인이 있으면 이어서 사용)
+    blockchain = Blockchain(mining_workers=os.cpu_count() or 1, store=BlockStore(datadir), snapshot=snapshot)
     network = P2PNetwork("localhost", port, blockchain)
     blockchain.network = network
     
@@ -25,6 +91,8 @@ def main():
         print("3. 채굴하기")
         print("4. 잔액 확인")
         print("5. 종료")
+        print("6. 스냅샷 저장")
+        print("7. 스냅샷 이전 블록 백필")
         
         choice = input("선택: ")
         
@@ -37,7 +105,8 @@ def main():
             sender = input("보내는 사람: ")
             recipient = input("받는 사람: ")
             amount = float(input("금액: "))
-            blockchain.add_transaction(sender, recipient, amount)
+            fee_text = input("수수료 (없으면 Enter): ").strip()
+            blockchain.add_transaction(sender, recipient, amount, fee=float(fee_text) if fee_text else None)
             
         elif choice == "3":
             miner_address = input("채굴자 주소: ")
@@ -50,7 +119,21 @@ def main():
             
         elif choice == "5":
             network.close()
+            blockchain.close()
+            if metrics_server:
+                metrics_server.shutdown()
             break
 
+        elif choice == "6":
+            path = input("스냅샷 파일: ")
+            digest = write_snapshot(blockchain, path)
+            print(f"스냅샷 digest: {digest}")
+
+        elif choice == "7":
+            if network.peers:
+                network.start_backfill(network.peers[0]["socket"])
+            else:
+                print("연결된 피어가 없음")
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""보류 트랜잭션 멤풀
+
+txid 로 색인해 중복 트랜잭션을 O(1) 로 거르고, 보낸 사람별 도착 순서(시퀀스)를 지키면서
+바이트당 수수료가 높은 트랜잭션부터 블록 템플릿에 담는다. 전체 크기가 한도를 넘으면
+우선순위가 가장 낮은 트랜잭션부터 내보낸다.
+"""
+import heapq
+import itertools
+import threading
+from typing import Dict, Iterable, List, Optional
+from transaction import Transaction
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # 멤풀 전체 크기 한도 (정규 직렬화 기준)
+
+
+class MempoolEntry:
+    __slots__ = ("transaction", "sequence", "size", "priority")
+
+    def __init__(self, transaction: Transaction, sequence: int):
+        self.transaction = transaction
+        self.sequence = sequence  # 도착 순서 (같은 보낸 사람 안에서는 이 순서대로 포함)
+        self.size = transaction.size
+        self.priority = (transaction.fee or 0) / self.size  # 바이트당 수수료
+
+
+class Mempool:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries: Dict[str, MempoolEntry] = {}  # txid -> 항목 (도착 순서 유지)
+        self.by_sender: Dict[str, Dict[str, MempoolEntry]] = {}  # 보낸 사람 -> txid -> 항목 (도착 순)
+        self.size_bytes = 0
+        self.duplicates = 0  # 이미 있어서 버린 트랜잭션 수
+        self.evicted = 0  # 크기 한도로 내보낸 트랜잭션 수
+        self.invalid = 0  # 금액이나 수수료가 유효하지 않아 버린 트랜잭션 수
+        self._sequence = itertools.count()
+        # 내보낼 후보 힙 (우선순위 낮은 것, 같으면 늦게 온 것부터). 제거된 항목은 꺼낼 때 건너뜀
+        self._eviction_heap = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, txid: str) -> bool:
+        return txid in self.entries
+
+    def __iter__(self):
+        """도착 순서대로 트랜잭션 반환 (호출 시점의 사본)"""
+        with self._lock:
+            transactions = [entry.transaction for entry in self.entries.values()]
+        return iter(transactions)
+
+    def get(self, txid: str) -> Optional[Transaction]:
+        entry = self.entries.get(txid)
+        return entry.transaction if entry is not None else None
+
+    def add(self, transaction: Transaction) -> bool:
+        """새 트랜잭션이면 추가하고 True, 중복이거나 금액/수수료가 유효하지 않거나 한도 때문에 바로 밀려나면 False"""
+        if not transaction.has_valid_amounts():
+            self.invalid += 1
+            return False
+        txid = transaction.txid
+        with self._lock:
+            if txid in self.entries:
+                self.duplicates += 1
+                return False
+            entry = MempoolEntry(transaction, next(self._sequence))
+            self.entries[txid] = entry
+            self.by_sender.setdefault(transaction.sender, {})[txid] = entry
+            self.size_bytes += entry.size
+            heapq.heappush(self._eviction_heap, (entry.priority, -entry.sequence, txid))
+            self._evict()
+            return txid in self.entries
+
+    def remove(self, txid: str) -> Optional[Transaction]:
+        with self._lock:
+            entry = self.entries.pop(txid, None)
+            if entry is None:
+                return None
+            sender = entry.transaction.sender
+            sender_entries = self.by_sender[sender]
+            del sender_entries[txid]
+            if not sender_entries:
+                del self.by_sender[sender]
+            self.size_bytes -= entry.size
+            # 힙에는 지연 삭제 항목이 남으므로 너무 커지면 다시 구성
+            if len(self._eviction_heap) > 2 * len(self.entries) + 1024:
+                self._eviction_heap = [(e.priority, -e.sequence, t) for t, e in self.entries.items()]
+                heapq.heapify(self._eviction_heap)
+            return entry.transaction
+
+    def remove_transactions(self, transactions: Iterable[Transaction]):
+        """블록에 포함된 트랜잭션을 제거"""
+        with self._lock:
+            for transaction in transactions:
+                self.remove(transaction.txid)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.by_sender.clear()
+            self._eviction_heap.clear()
+            self.size_bytes = 0
+
+    def _evict(self):
+        while self.size_bytes > self.max_bytes and self._eviction_heap:
+            priority, negative_sequence, txid = heapq.heappop(self._eviction_heap)
+            entry = self.entries.get(txid)
+            if entry is None or entry.sequence != -negative_sequence:
+                continue
+            self.remove(txid)
+            self.evicted += 1
+
+    def select(self, max_transactions: int, max_bytes: int) -> List[Transaction]:
+        """블록 템플릿용 트랜잭션 선택
+
+        보낸 사람마다 가장 먼저 온 트랜잭션만 힙에 올려 두고, 꺼낼 때마다 그 사람의 다음
+        트랜잭션을 올린다. 보낸 사람 안의 순서는 유지되고 전체적으로는 우선순위 순이 된다.
+        """
+        with self._lock:
+            heap = []
+            pending = {}
+            for sender, sender_entries in self.by_sender.items():
+                entries = iter(sender_entries.values())
+                first = next(entries)
+                heap.append((-first.priority, first.sequence, sender, first))
+                pending[sender] = entries
+            heapq.heapify(heap)
+
+            selected = []
+            used_bytes = 0
+            while heap and len(selected) < max_transactions:
+                _, _, sender, entry = heapq.heappop(heap)
+                if used_bytes + entry.size > max_bytes:
+                    # 이 보낸 사람의 이후 트랜잭션은 순서를 건너뛸 수 없으므로 함께 제외
+                    continue
+                selected.append(entry.transaction)
+                used_bytes += entry.size
+                following = next(pending[sender], None)
+                if following is not None:
+                    heapq.heappush(heap, (-following.priority, following.sequence, sender, following))
+            return selected
@@ -0,0 +1,84 @@
+import hashlib
+from typing import Dict, List
+from transaction import Transaction
+
+# RFC 6962 방식의 도메인 분리 (리프/내부 노드 해시가 서로 충돌하지 않도록)
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+EMPTY_ROOT = "0" * 64
+
+
+def hash_transaction(transaction: Transaction) -> bytes:
+    """트랜잭션 txid 로 리프 해시 계산"""
+    return hashlib.sha256(LEAF_PREFIX + transaction.digest).digest()
+
+
+def hash_pair(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def next_level(level: List[bytes]) -> List[bytes]:
+    parents = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    # 홀수 개일 때 마지막 노드는 복제하지 않고 그대로 상위 레벨로 올림
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(transactions: List[Transaction]) -> str:
+    """트랜잭션 목록의 머클 루트 (16진수 문자열)"""
+    if not transactions:
+        return EMPTY_ROOT
+
+    level = [hash_transaction(transaction) for transaction in transactions]
+    while len(level) > 1:
+        level = next_level(level)
+    return level[0].hex()
+
+
+class MerkleTree:
+    """레벨별 해시를 보관해 O(log n) 포함 증명을 생성하는 머클 트리"""
+
+    def __init__(self, transactions: List[Transaction]):
+        self.levels: List[List[bytes]] = []
+        level = [hash_transaction(transaction) for transaction in transactions]
+        if level:
+            self.levels.append(level)
+        while len(level) > 1:
+            level = next_level(level)
+            self.levels.append(level)
+
+    @property
+    def root(self) -> str:
+        if not self.levels:
+            return EMPTY_ROOT
+        return self.levels[-1][0].hex()
+
+    def get_proof(self, index: int) -> List[Dict]:
+        """index 번째 트랜잭션의 포함 증명 (리프에서 루트 방향의 형제 노드 목록)"""
+        if not self.levels or not 0 <= index < len(self.levels[0]):
+            raise IndexError("트랜잭션 인덱스 범위 초과")
+
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            # 형제가 없는 마지막 홀수 노드는 그대로 올라가므로 증명 단계가 없음
+            if sibling < len(level):
+                proof.append({
+                    "position": "left" if sibling < index else "right",
+                    "hash": level[sibling].hex()
+                })
+            index //= 2
+        return proof
+
+
+def verify_proof(transaction: Transaction, proof: List[Dict], root: str) -> bool:
+    """포함 증명으로 트랜잭션이 root 에 커밋되어 있는지 확인"""
+    current = hash_transaction(transaction)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["position"] == "left":
+            current = hash_pair(sibling, current)
+        else:
+            current = hash_pair(current, sibling)
+    return current.hex() == root
@@ -0,0 +1,248 @@
+"""노드 지표(카운터, 게이지, 지연 히스토그램)와 로그 설정
+
+지표는 프로세스 전역 REGISTRY 에 이름으로 등록하고, 쓰는 모듈에서 모듈 상수로 들고 있는다.
+기본은 꺼져 있어 기록 호출은 enabled 확인 한 번으로 끝나며, enable() 한 뒤부터 값이 쌓인다.
+멤풀 크기나 피어 수처럼 이미 다른 곳에 있는 값은 게이지에 함수를 지정해 수집할 때만 읽는다
+(한 프로세스에 노드가 여럿이면 마지막에 지정한 노드의 값).
+
+snapshot() 은 GUI 가 주기적으로 읽는 딕셔너리이고, serve_metrics() 는 /metrics 에서 Prometheus
+텍스트 형식(/metrics.json 은 snapshot)으로 응답하는 로컬 HTTP 서버를 띄운다.
+"""
+import bisect
+import json
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# 지연 히스토그램 기본 구간 (초): 서명 검증(수십 us ~ ms)부터 동기화(수 초 이상)까지
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+LOG_LEVELS = ("debug", "info", "warning", "error", "off")
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+log = logging.getLogger(__name__)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, description: str, labels: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Counter(Metric):
+    """증가만 하는 누적 값 (라벨 값 조합별)"""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, *label_values: str):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    """현재 값 (직접 넣거나, 수집할 때 호출할 함수를 지정)"""
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, *label_values: str):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = value
+
+    def set_function(self, function: Callable[[], float]):
+        """수집할 때마다 function() 을 값으로 사용 (라벨 없는 게이지)"""
+        self._function = function
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        if self._function is not None:
+            try:
+                return {(): self._function()}
+            except Exception as e:
+                log.debug("게이지 %s 수집 실패: %s", self.name, e)
+                return {}
+        return super().collect()
+
+
+class Histogram(Metric):
+    """관측 값 분포 (구간별 개수, 합계, 개수)"""
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *label_values: str):
+        if not self.registry.enabled:
+            return
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                # [구간별 개수..., +Inf 개수, 합계]
+                state = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[position] += 1
+            state[-1] += value
+
+    def collect(self) -> Dict[Tuple[str, ...], Dict]:
+        with self._lock:
+            states = {labels: list(state) for labels, state in self._values.items()}
+        result = {}
+        for labels, state in states.items():
+            cumulative = []
+            total = 0
+            for count in state[:-1]:
+                total += count
+                cumulative.append(total)
+            result[labels] = {"count": total, "sum": state[-1],
+                              "buckets": dict(zip(self.buckets + (math.inf,), cumulative))}
+        return result
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, description: str, labels: Sequence[str], **options) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, description, labels, **options)
+            elif type(metric) is not cls or metric.labels != tuple(labels):
+                raise ValueError(f"지표 {name} 이 다른 종류나 라벨로 이미 등록됨")
+            return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, description, labels)
+
+    def gauge(self, name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, description, labels)
+
+    def histogram(self, name: str, description: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, description, labels, buckets=buckets)
+
+    def snapshot(self) -> Dict:
+        """지표 이름 -> 값 (라벨이 있으면 라벨 값을 ","로 이은 키 -> 값, 히스토그램은 count/sum/buckets)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {}
+        for metric in metrics:
+            values = metric.collect()
+            if metric.labels:
+                snapshot[metric.name] = {",".join(labels): value for labels, value in values.items()}
+            else:
+                snapshot[metric.name] = values.get((), None)
+        return snapshot
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in sorted(metric.collect().items()):
+                pairs = list(zip(metric.labels, labels))
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{_format_labels(pairs)} {_format_value(value)}")
+                    continue
+                for bound, count in value["buckets"].items():
+                    bucket_labels = _format_labels(pairs + [("le", _format_value(bound))])
+                    lines.append(f"{metric.name}_bucket{bucket_labels} {count}")
+                lines.append(f"{metric.name}_sum{_format_labels(pairs)} {_format_value(value['sum'])}")
+                lines.append(f"{metric.name}_count{_format_labels(pairs)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def enable(enabled: bool = True):
+    """지표 기록을 켜거나 끔 (끄면 이미 쌓인 값은 유지하고 더 기록하지 않음)"""
+    REGISTRY.enabled = enabled
+
+
+def snapshot() -> Dict:
+    return REGISTRY.snapshot()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = self.registry.render().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = json.dumps(self.registry.snapshot()).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("지표 요청 %s: " + format, self.address_string(), *args)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """지표 기록을 켜고 /metrics 를 제공하는 HTTP 서버를 데몬 스레드로 시작 (shutdown() 으로 종료)"""
+    enable()
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info("지표 제공: http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+def configure_logging(level: str = "info"):
+    """로그 수준 설정 (off 면 모든 로그를 끔)"""
+    if level == "off":
+        logging.disable(logging.CRITICAL)
+        return
+    logging.disable(logging.NOTSET)
+    logging.basicConfig(level=getattr(logging, level.upper()), format=LOG_FORMAT)
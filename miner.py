@@ -0,0 +1,237 @@
+import hashlib
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from difficulty import meets_target, target_to_hex
+from metrics import REGISTRY
+
+MINING_CHECK_INTERVAL = 10_000  # 단일 스레드 채굴에서 체인 끝이 바뀌었는지 확인하는 nonce 간격
+
+log = logging.getLogger(__name__)
+
+MINING_HASHES = REGISTRY.counter("blockchain_mining_hashes_total", "채굴에 쓴 해시 수")
+MINING_HASHRATE = REGISTRY.gauge("blockchain_mining_hashrate", "마지막 템플릿 채굴의 초당 해시 수")
+MINING_RESTARTS = REGISTRY.counter("blockchain_mining_restarts_total", "체인 끝이 바뀌어 채굴을 다시 시작한 횟수")
+BLOCKS_MINED = REGISTRY.counter("blockchain_blocks_mined_total", "채굴해 체인에 추가한 블록 수")
+
+
+def _mine_worker(worker_id: int, header_prefix: bytes, start: int, step: int, target: str,
+                 stop_event, result_queue, check_interval: int):
+    """nonce 공간에서 start, start+step, start+2*step ... 을 탐색하는 워커 (target 은 target_to_hex 값)"""
+    from blockchain import Block
+
+    prefix_hash = hashlib.sha256(header_prefix)
+    nonce = start
+    hashes = 0
+    started = time.perf_counter()
+
+    while not stop_event.is_set():
+        # 매 nonce 마다 이벤트를 확인하지 않고 check_interval 단위로 확인
+        for _ in range(check_interval):
+            block_hash = Block.hash_with_nonce(prefix_hash, nonce)
+            hashes += 1
+            if meets_target(block_hash, target):
+                result_queue.put(("found", worker_id, nonce, block_hash))
+                stop_event.set()
+                break
+            nonce += step
+
+    result_queue.put(("stats", worker_id, hashes, time.perf_counter() - started))
+
+
+class ParallelMiner:
+    """multiprocessing 기반 병렬 작업증명 엔진"""
+
+    def __init__(self, workers: Optional[int] = None, start_method: Optional[str] = None,
+                 check_interval: int = 1000):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.context = multiprocessing.get_context(start_method)
+        self.check_interval = check_interval
+        self.last_stats: List[Dict] = []  # 마지막 채굴의 워커별 해시레이트
+        self._stop_event = None
+        self._lock = threading.Lock()
+
+    def mine(self, block, target: int) -> bool:
+        """유효한 nonce 를 찾으면 block 에 반영하고 True, 취소되면 False"""
+        stop_event = self.context.Event()
+        result_queue = self.context.Queue()
+        with self._lock:
+            self._stop_event = stop_event
+
+        processes = [
+            self.context.Process(
+                target=_mine_worker,
+                args=(i, block.header_prefix(), block.nonce + i, self.workers, target_to_hex(target),
+                      stop_event, result_queue, self.check_interval),
+                daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        found = None
+        stats = {}
+        try:
+            while len(stats) < self.workers:
+                try:
+                    kind, worker_id, *result = result_queue.get(timeout=0.5)
+                except queue.Empty:
+                    # 워커가 비정상 종료된 경우 무한 대기하지 않도록 확인
+                    if not any(process.is_alive() for process in processes) and result_queue.empty():
+                        break
+                    continue
+                if kind == "found" and found is None:
+                    found = result
+                    stop_event.set()
+                elif kind == "stats":
+                    stats[worker_id] = result
+        finally:
+            stop_event.set()
+            for process in processes:
+                process.join()
+            with self._lock:
+                self._stop_event = None
+
+        self.last_stats = [{
+            "worker": worker_id,
+            "hashes": hashes,
+            "elapsed": elapsed,
+            "hashrate": hashes / elapsed if elapsed > 0 else 0.0
+        } for worker_id, (hashes, elapsed) in sorted(stats.items())]
+        for stat in self.last_stats:
+            log.debug("워커 %d: %d 해시, %.0f H/s", stat["worker"], stat["hashes"], stat["hashrate"])
+
+        if found is None:
+            return False
+        block.nonce, block.hash = found
+        return True
+
+    def cancel(self):
+        """진행 중인 채굴을 중단"""
+        with self._lock:
+            if self._stop_event is not None:
+                self._stop_event.set()
+
+
+class MiningCoordinator:
+    """블록 템플릿을 만들어 채굴하고, 그 사이 체인 끝이 바뀌면 새 끝에서 다시 시작
+
+    템플릿은 blockchain.lock 안에서 멤풀과 체인 끝을 한 번에 읽어 만든다. 멤풀의 트랜잭션은
+    채굴 중에도 그대로 남아 있으므로 그 사이 도착한 트랜잭션은 다음 템플릿에 들어가고,
+    다른 노드의 블록에 포함된 트랜잭션은 그 블록이 추가될 때 멤풀에서 빠진다.
+    check_interval 개 nonce 마다 (병렬 엔진이면 poll_interval 초마다) 체인 끝과 취소 여부를 확인한다.
+
+    취소는 공유 이벤트를 지우고 다시 쓰는 대신 세대 번호로 구분한다. mine() 은 시작할 때의 세대를
+    기억하고 cancel() 은 세대를 올리므로, 템플릿을 만든 뒤 병렬 엔진이 시작되기 전처럼 작업 사이의
+    어느 시점에 온 취소도 그 작업에서 사라지지 않는다.
+    """
+
+    def __init__(self, blockchain, miner: Optional[ParallelMiner] = None,
+                 check_interval: int = MINING_CHECK_INTERVAL, poll_interval: float = 0.05,
+                 abort_on_new_tip: bool = True):
+        self.blockchain = blockchain
+        self.miner = miner
+        self.check_interval = check_interval
+        self.poll_interval = poll_interval
+        self.abort_on_new_tip = abort_on_new_tip  # False 면 블록을 찾은 뒤에야 끝이 바뀐 것을 알아챔
+        self._generation = 0  # cancel() 마다 증가 (작업은 시작할 때의 값과 다르면 취소된 것)
+        self._stale_since: Optional[float] = None  # 채굴 중인 템플릿의 부모가 최선 끝에서 밀려난 시각
+        # 통계: 전체 해시 수, 체인 끝이 바뀐 뒤 낡은 부모 위에서 쓴 해시 수 (경과 시간 비율로 추정),
+        # 새 끝에서 다시 시작한 횟수, 체인에 추가한 블록별 (해시, 해시 수)
+        self.hashes = 0
+        self.stale_hashes = 0
+        self.restarts = 0
+        self.found: List[Tuple[str, int]] = []
+
+    def cancel(self):
+        self._generation += 1
+        if self.miner:
+            self.miner.cancel()
+
+    def _cancelled(self, generation: int) -> bool:
+        return self._generation != generation
+
+    def tip_changed(self):
+        """최선 끝이 바뀔 때 Blockchain.append_block 에서 호출"""
+        if self._stale_since is None:
+            self._stale_since = time.perf_counter()
+
+    def mine(self, miner_address: str):
+        """체인에 추가된 블록 반환 (취소되면 None)"""
+        generation = self._generation
+        while not self._cancelled(generation):
+            with self.blockchain.lock:
+                block = self.blockchain.create_template(miner_address)
+                parent = self.blockchain.tree.best
+                self._stale_since = None
+            started = time.perf_counter()
+            found, hashes = self._search(block, parent, generation)
+            self.hashes += hashes
+            MINING_HASHES.inc(hashes)
+            MINING_HASHRATE.set(hashes / max(time.perf_counter() - started, 1e-9))
+            with self.blockchain.lock:
+                # 찾는 사이 끝이 바뀌었으면 이 블록은 이어 붙일 수 없음
+                if found and self.blockchain.tree.best is parent:
+                    self.blockchain.append_block(block)
+                    self.found.append((block.hash, hashes))
+                    BLOCKS_MINED.inc()
+                    return block
+                stale_since = self._stale_since
+            if stale_since is not None:
+                # 끝이 바뀐 뒤에 쓴 해시 수는 그 뒤로 흐른 시간의 비율로 추정
+                now = time.perf_counter()
+                self.stale_hashes += round(hashes * min(1.0, (now - stale_since) / max(now - started, 1e-9)))
+            if not self._cancelled(generation):
+                self.restarts += 1
+                MINING_RESTARTS.inc()
+                log.info("체인 끝이 바뀌어 높이 %d에서 채굴 다시 시작", len(self.blockchain.chain))
+        return None
+
+    def _stale(self, parent) -> bool:
+        return self.abort_on_new_tip and self.blockchain.tree.best is not parent
+
+    def _search(self, block, parent, generation: int) -> Tuple[bool, int]:
+        """(찾았는지, 사용한 해시 수)"""
+        if self.miner:
+            return self._search_parallel(block, parent, generation)
+        from blockchain import Block
+
+        target = target_to_hex(block.target)
+        if meets_target(block.hash, target):
+            return True, 1
+        prefix_hash = hashlib.sha256(block.header_prefix())
+        start = nonce = block.nonce
+        while not self._cancelled(generation) and not self._stale(parent):
+            for _ in range(self.check_interval):
+                nonce += 1
+                block_hash = Block.hash_with_nonce(prefix_hash, nonce)
+                if meets_target(block_hash, target):
+                    block.nonce, block.hash = nonce, block_hash
+                    return True, nonce - start + 1
+        return False, nonce - start + 1
+
+    def _search_parallel(self, block, parent, generation: int) -> Tuple[bool, int]:
+        """워커 프로세스는 체인을 볼 수 없으므로 감시 스레드가 끝이 바뀌거나 취소되면 채굴을 취소
+
+        엔진이 작업을 등록하기 전의 cancel() 은 엔진에 닿지 않으므로, 감시 스레드가 등록될 때까지
+        계속 취소를 보낸다.
+        """
+        done = threading.Event()
+
+        def watch():
+            while not done.wait(self.poll_interval):
+                if self._stale(parent) or self._cancelled(generation):
+                    self.miner.cancel()
+
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+        try:
+            found = self.miner.mine(block, block.target)
+        finally:
+            done.set()
+            watcher.join()
+        return found, sum(stat["hashes"] for stat in self.miner.last_stats)
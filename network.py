@@ -1,33 +1,87 @@
+import logging
 import socket
 import threading
 import json
 import time
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from blockchain import Blockchain, Block
+from transaction import Transaction
+from protocol import (FrameReader, WireCache, compress_parts, encode_message, decode_message, encode_frame_header,
+                      sendmsg_all, ENCODING_FLAGS, FLAG_BINARY, FLAG_COMPRESSED, FRAME_HEADER,
+                      MAX_BLOCKS_RESPONSE_BYTES, MESSAGE_NAMES, TYPE_MASK, WIRE_CACHE_BYTES)
+from metrics import REGISTRY
+from snapshot import SnapshotChain
+from gossip import SeenCache, SEEN_CACHE_SIZE, RELAY_CACHE_SIZE, RELAY_CACHE_TTL, REQUEST_TTL
+
+MAX_HEADERS = 2000  # HEADERS 메시지 하나에 담는 최대 헤더 수
+MAX_BLOCKS_PER_REQUEST = 100  # GET_BLOCKS 한 번에 요청하는 최대 블록 수
+INVENTORY_MESSAGES = {"block": "NEW_BLOCK", "tx": "NEW_TRANSACTION"}  # INV 항목 종류 -> 본문 메시지
+
+log = logging.getLogger(__name__)
+
+RECEIVED_BYTES = REGISTRY.counter("blockchain_p2p_received_bytes_total", "받은 프레임 바이트 (메시지 타입별)", ("type",))
+RECEIVED_MESSAGES = REGISTRY.counter("blockchain_p2p_received_messages_total", "받은 프레임 수 (메시지 타입별)",
+                                     ("type",))
+SENT_BYTES = REGISTRY.counter("blockchain_p2p_sent_bytes_total", "보낸 프레임 바이트 (메시지 타입별)", ("type",))
+SENT_MESSAGES = REGISTRY.counter("blockchain_p2p_sent_messages_total", "보낸 프레임 수 (메시지 타입별)", ("type",))
+PEERS = REGISTRY.gauge("blockchain_p2p_peers", "연결된 피어 수")
+SYNC_SECONDS = REGISTRY.histogram("blockchain_sync_seconds", "헤더 우선 동기화에 걸린 시간 (초)")
+
+
+def count_frame(byte_counter, message_counter, type_code: int, size: int):
+    """프레임 하나를 메시지 타입별 바이트/개수 지표에 더함 (지표가 꺼져 있으면 아무것도 안 함)"""
+    if REGISTRY.enabled:
+        message_type = MESSAGE_NAMES.get(type_code & TYPE_MASK, "UNKNOWN")
+        byte_counter.inc(size, message_type)
+        message_counter.inc(1, message_type)
+
 
 class P2PNetwork:
-    def __init__(self, host: str, port: int, blockchain: Blockchain):
+    def __init__(self, host: str, port: int, blockchain: Blockchain, announce: bool = True,
+                 compact: bool = True, wire_cache_bytes: int = WIRE_CACHE_BYTES):
         self.host = host
         self.port = port
         self.blockchain = blockchain
         self.peers: List[Dict] = []  # 연결된 피어들의 목록
+        self.send_locks: Dict[socket.socket, threading.Lock] = {}  # 소켓별 전송 잠금 (프레임 섞임 방지)
+        self.sync_states: Dict[socket.socket, Dict] = {}  # 피어별 헤더 우선 동기화 진행 상태
+        self.backfill_states: Dict[socket.socket, Dict] = {}  # 스냅샷 이전 블록 백필 진행 상태
+        # 가십 중복 제거: 이미 처리한 블록 해시/txid 는 다시 처리하거나 전파하지 않음
+        self.announce = announce  # True 면 INV 로 알리고 GETDATA 로 요청한 피어에게만 본문 전송
+        self.seen = SeenCache()
+        self.relay_cache = SeenCache(RELAY_CACHE_SIZE, RELAY_CACHE_TTL)  # 전파한 프레임 (GETDATA 응답용)
+        self.requested = SeenCache(SEEN_CACHE_SIZE, REQUEST_TTL)  # 응답을 기다리는 GETDATA 항목
+        # 바이너리/압축 인코딩은 HELLO 로 서로 지원을 확인한 피어에게만 사용 (그 외에는 JSON)
+        self.encodings = FLAG_BINARY | FLAG_COMPRESSED if compact else 0
+        self.peer_encodings: Dict[socket.socket, int] = {}
+        self.hello_sent = set()
+        # 블록 JSON 과 NEW_BLOCK 프레임을 블록 해시별로 한 번만 직렬화해 두는 LRU 캐시
+        self.wire_cache = WireCache(wire_cache_bytes)
+        self.closing = False  # close() 가 소켓을 닫는 중이면 True (그 뒤의 소켓 오류는 정상 종료)
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         # 소켓 재사용 옵션 추가
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        PEERS.set_function(lambda: len(self.peers))
         
     def start(self):
         # 서버 시작
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen(5)
-        print(f"P2P 네트워크 시작됨 - {self.host}:{self.port}")
+        log.info("P2P 네트워크 시작됨 - %s:%d", self.host, self.port)
         
         # 연결 수신 대기 스레드 시작
         threading.Thread(target=self.listen_for_connections).start()
 
     def listen_for_connections(self):
         while True:
-            client, address = self.server_socket.accept()
-            print(f"새로운 피어 연결됨: {address}")
+            try:
+                client, address = self.server_socket.accept()
+            except OSError as e:
+                # close() 로 서버 소켓이 닫힌 경우는 알리지 않음
+                if not self.closing:
+                    log.warning("연결 수신 중 오류: %s", e)
+                break
+            log.info("새로운 피어 연결됨: %s", address)
             self.peers.append({"socket": client, "address": address})
             
             # 각 피어에 대한 메시지 수신 스레드 시작
@@ -38,129 +92,525 @@ class P2PNetwork:
             peer_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             peer_socket.connect((host, port))
             self.peers.append({"socket": peer_socket, "address": (host, port)})
-            print(f"피어에 연결됨: {host}:{port}")
+            log.info("피어에 연결됨: %s:%d", host, port)
             
             # 연결된 피어의 메시지 수신 스레드 시작
             threading.Thread(target=self.handle_peer, args=(peer_socket, (host, port))).start()
             
-            # 새로 연결된 피어와 블록체인 동기화
+            # 인코딩 협상 후 새로 연결된 피어와 블록체인 동기화
+            self.send_hello(peer_socket)
             self.sync_blockchain(peer_socket)
             
         except Exception as e:
-            print(f"피어 연결 실패: {e}")
+            log.warning("피어 연결 실패: %s", e)
 
     def handle_peer(self, peer_socket: socket.socket, address):
+        reader = FrameReader(peer_socket)
         while True:
             try:
-                message = peer_socket.recv(4096).decode()
-                if not message:
+                frame = reader.read_frame()
+                if frame is None:
                     break
                 
-                self.process_message(message, peer_socket)
+                type_code, message = frame
+                self.process_message(message, peer_socket, type_code)
                 
+            except OSError as e:
+                if not self.closing:
+                    log.warning("피어 %s 처리 중 오류: %s", address, e)
+                break
             except Exception as e:
-                print(f"피어 {address} 처리 중 오류: {e}")
+                log.warning("피어 %s 처리 중 오류: %s", address, e)
                 break
         
         self.remove_peer(peer_socket)
 
-    def process_message(self, message: str, sender_socket: socket.socket):
+    def process_message(self, message: bytes, sender_socket: socket.socket, type_code: int = None):
+        if type_code is not None:
+            count_frame(RECEIVED_BYTES, RECEIVED_MESSAGES, type_code, FRAME_HEADER.size + len(message))
         try:
-            data = json.loads(message)
+            # 타입 바이트가 없으면 플래그 없는 JSON 페이로드로 처리
+            data = json.loads(message) if type_code is None else decode_message(type_code, message)
             message_type = data.get("type")
             
             if message_type == "CHAIN_RESPONSE":
                 # 블록체인 응답 수신
                 chain_data = data.get("data")
-                print(f"체인 데이터 수신: 길이 {len(chain_data['chain'])}")
+                log.info("체인 데이터 수신: 길이 %d", len(chain_data["chain"]))
                 
-                # 받은 체인이 현재 체인보다 길거나 같으면 업데이트
-                if len(chain_data["chain"]) >= len(self.blockchain.chain):
-                    print("새로운 체인 발견, 업데이트 중...")
-                    new_chain = []
-                    for block_data in chain_data["chain"]:
-                        block = Block(
-                            block_data["index"],
-                            block_data["transactions"],
-                            block_data["timestamp"],
-                            block_data["previous_hash"]
-                        )
-                        block.nonce = block_data["nonce"]
-                        block.hash = block_data["hash"]
-                        new_chain.append(block)
+                # 받은 체인의 누적 작업량이 현재 체인보다 클 때만 업데이트 (같으면 교체하지 않음)
+                if self.blockchain.has_more_work(chain_data["chain"][self.blockchain.checkpoint_height:]):
+                    log.info("새로운 체인 발견, 업데이트 중...")
+                    new_chain = [Block.from_dict(block_data) for block_data in chain_data["chain"]]
                     
-                    # 새 체인이 유효한지 확인
-                    is_valid = True
-                    for i in range(1, len(new_chain)):
-                        if not self.blockchain.is_valid_new_block(new_chain[i], new_chain[i-1]):
-                            is_valid = False
-                            print(f"블록 {i}가 유효하지 않음")
-                            break
+                    # 새 체인이 유효한지 확인 (스냅샷 노드는 같은 제네시스에서 시작해야 하며, 구간별 병렬 검증)
+                    if self.blockchain.checkpoint_height and new_chain[0].hash != self.blockchain.genesis_hash:
+                        bad_index = 0
+                    else:
+                        bad_index = self.blockchain.validate_chain(new_chain)
+                    if bad_index is not None:
+                        log.warning("블록 %d가 유효하지 않음", bad_index)
                     
-                    if is_valid:
-                        print(f"유효한 체인 발견. 현재 길이: {len(self.blockchain.chain)}, 새 체인 길이: {len(new_chain)}")
-                        self.blockchain.chain = new_chain
-                        self.blockchain.pending_transactions = chain_data["pending_transactions"]
-                        print("체인 업데이트 완료")
+                    if bad_index is None:
+                        log.info("유효한 체인 발견. 현재 길이: %d, 새 체인 길이: %d", len(self.blockchain.chain),
+                                 len(new_chain))
+                        self.blockchain.replace_chain(new_chain)
+                        # 상대의 보류 트랜잭션은 서명 검증을 거쳐 멤풀에 합침 (중복은 멤풀에서 걸러짐)
+                        for transaction in chain_data["pending_transactions"]:
+                            self.blockchain.add_transaction_from_network(Transaction.from_dict(transaction))
+                        log.info("체인 업데이트 완료")
                     else:
-                        print("받은 체인이 유효하지 않음")
+                        log.warning("받은 체인이 유효하지 않음")
             
             # 나머지 message_type 처리는 그대로 유지
             elif message_type == "NEW_BLOCK":
                 block_data = data.get("data")
+                block_hash = block_data["hash"]
+                if self.has_seen(block_hash) or block_hash in self.blockchain.tree:
+                    return
                 if self.blockchain.add_block_from_network(block_data):
-                    print(f"새 블록 추가됨: {block_data['index']}")  # 디버깅용
-                    self.broadcast_message(message, sender_socket)
+                    # 해시는 보낸 쪽이 적은 값이므로 검증을 통과한 뒤에만 본 것으로 기록
+                    self.mark_seen(block_hash)
+                    if self.blockchain.tree.best.hash == block_hash:
+                        # 최선 체인이 된 블록만 전파 (작업량이 적은 분기 블록은 보관만 함)
+                        log.debug("새 블록 추가됨: %d", block_data["index"])
+                        self.relay("block", block_hash, data, sender_socket)
+                elif block_data["previous_hash"] not in self.blockchain.tree:
+                    # 부모를 모르는 블록이면 뒤처졌거나 다른 분기이므로 헤더 동기화 시작
+                    self.sync_blockchain(sender_socket)
                 
             elif message_type == "NEW_TRANSACTION":
-                transaction = data.get("data")
-                self.blockchain.add_transaction_from_network(transaction)
-                print(f"새 트랜잭션 추가됨: {transaction}")  # 디버깅용
-                self.broadcast_message(message, sender_socket)
+                transaction = Transaction.from_dict(data.get("data"))
+                txid = transaction.txid
+                # txid 는 받은 내용으로 직접 계산하므로 검증 전에 기록해도 됨
+                if not self.mark_seen(txid):
+                    return
+                # 서명 검증을 통과한 경우에만 다른 피어에게 전달
+                self.blockchain.add_transaction_from_network(
+                    transaction, lambda accepted: self.relay("tx", txid, data, sender_socket))
+                log.debug("새 트랜잭션 검증 대기: %s", transaction)
+
+            elif message_type == "INV":
+                wanted = [item for item in data["data"]["items"] if self.wants(item)]
+                if wanted:
+                    self.send_message(sender_socket, {"type": "GETDATA", "data": {"items": wanted}})
+
+            elif message_type == "GETDATA":
+                for item in data["data"]["items"]:
+                    response = self.inventory_message(item)
+                    if response is not None:
+                        self.send_message(sender_socket, response)
+
+            elif message_type == "HELLO":
+                self.process_hello(data["data"], sender_socket)
                 
             elif message_type == "REQUEST_CHAIN":
-                chain_data = self.blockchain.to_dict()
-                response = {
-                    "type": "CHAIN_RESPONSE",
-                    "data": chain_data
-                }
-                sender_socket.send(json.dumps(response).encode())
-                print("체인 데이터 전송됨")  # 디버깅용
+                self.send_chain(sender_socket)
+                log.debug("체인 데이터 전송됨")
+                
+            elif message_type == "GET_HEADERS":
+                self.send_headers(data["data"]["locator"], sender_socket)
+                
+            elif message_type == "HEADERS":
+                if self.is_history_response(sender_socket, "headers", data["data"]["headers"]):
+                    self.process_history_headers(data["data"]["headers"], sender_socket)
+                else:
+                    self.process_headers(data["data"]["headers"], sender_socket)
+                
+            elif message_type == "GET_BLOCKS":
+                self.send_blocks(data["data"]["hashes"], sender_socket)
+                
+            elif message_type == "BLOCKS":
+                if self.is_history_response(sender_socket, "blocks", data["data"]["blocks"]):
+                    self.process_history_blocks(data["data"]["blocks"], sender_socket)
+                else:
+                    self.process_blocks(data["data"]["blocks"], sender_socket)
                 
         except Exception as e:
-            print(f"메시지 처리 중 오류: {e}")
+            log.warning("메시지 처리 중 오류: %s", e)
+
+    def broadcast_message(self, message: Dict, exclude_socket=None):
+        message_type = message["type"]
+        if message_type == "NEW_BLOCK":
+            block_hash = message["data"]["hash"]
+            self.mark_seen(block_hash)
+            self.relay("block", block_hash, message, exclude_socket)
+        elif message_type == "NEW_TRANSACTION":
+            txid = Transaction.from_dict(message["data"]).txid
+            self.mark_seen(txid)
+            self.relay("tx", txid, message, exclude_socket)
+        else:
+            self.broadcast_encoded(message, exclude_socket)
+
+    def broadcast_encoded(self, message: Dict, exclude_socket=None):
+        """피어마다 협상된 인코딩으로 전송 (인코딩별로 한 번만 직렬화)"""
+        groups: Dict[int, List] = {}
+        for peer in list(self.peers):
+            if peer["socket"] != exclude_socket:
+                groups.setdefault(self.peer_encodings.get(peer["socket"], 0), []).append(peer["socket"])
+        if len(groups) == 1:
+            flags = next(iter(groups))
+            self.broadcast_frame(self.message_frame(message, flags), exclude_socket)
+            return
+        for flags, sockets in groups.items():
+            frame = self.message_frame(message, flags)
+            for peer_socket in sockets:
+                try:
+                    self.send_frame(peer_socket, frame)
+                except Exception as e:
+                    log.warning("메시지 브로드캐스트 중 오류: %s", e)
+
+    def send_message(self, peer_socket: socket.socket, message: Dict):
+        self.send_frame(peer_socket, self.message_frame(message, self.peer_encodings.get(peer_socket, 0)))
+
+    def message_frame(self, message: Dict, flags: int) -> bytes:
+        """메시지 프레임 (NEW_BLOCK 은 블록 해시와 인코딩별로 한 번만 만들어 캐시)"""
+        if message["type"] != "NEW_BLOCK":
+            return encode_message(message, flags)
+        key = (message["data"]["hash"], flags)
+        frame = self.wire_cache.get(key)
+        if frame is None:
+            frame = encode_message(message, flags)
+            self.wire_cache.put(key, frame)
+        return frame
+
+    def block_json(self, block: Block) -> bytes:
+        """블록의 JSON 바이트 (json.dumps(block.to_dict()) 와 같으며 캐시에서 재사용)"""
+        key = (block.hash, None)
+        data = self.wire_cache.get(key)
+        if data is None:
+            data = json.dumps(block.to_dict()).encode()
+            self.wire_cache.put(key, data)
+        return data
+
+    def send_chain(self, peer_socket: socket.socket):
+        """CHAIN_RESPONSE 를 블록별 JSON 바이트를 다시 직렬화하지 않고 이어서 전송
+
+        바이너리 레이아웃은 메시지 전체가 문자열 표를 공유해 블록 단위로 미리 만들어 둘 수 없으므로,
+        인코딩을 협상한 피어에게도 JSON 프레임으로 보낸다 (받는 쪽은 프레임 플래그로 구분).
+        zlib 을 협상한 피어에게는 같은 조각들을 하나의 압축 스트림으로 흘려 압축된 조각만 보관한다.
+        """
+        parts = self.chain_parts()
+        if self.peer_encodings.get(peer_socket, 0) & FLAG_COMPRESSED:
+            self.send_frame_parts(peer_socket, "CHAIN_RESPONSE", compress_parts(parts), FLAG_COMPRESSED)
+        else:
+            self.send_frame_parts(peer_socket, "CHAIN_RESPONSE", list(parts))
+
+    def chain_parts(self) -> Iterator[bytes]:
+        """CHAIN_RESPONSE JSON 페이로드 조각 (json.dumps(message) 와 같은 바이트가 되도록 기본 구분자 사용)"""
+        pending = [transaction.to_dict() for transaction in self.blockchain.pending_transactions]
+        yield b'{"type": "CHAIN_RESPONSE", "data": {"chain": ['
+        for position, data in enumerate(self.blockchain.iter_block_bytes(self.block_json)):
+            if position:
+                yield b", "
+            yield data
+        yield b'], "pending_transactions": ' + json.dumps(pending).encode() + b"}}"
+
+    def send_hello(self, peer_socket: socket.socket):
+        """지원하는 인코딩을 알림 (HELLO 는 항상 JSON)"""
+        self.hello_sent.add(peer_socket)
+        encodings = [name for name, flag in ENCODING_FLAGS.items() if self.encodings & flag]
+        self.send_frame(peer_socket, encode_message({"type": "HELLO", "data": {"encodings": encodings}}))
 
-    def broadcast_message(self, message: str, exclude_socket=None):
+    def process_hello(self, hello: Dict, peer_socket: socket.socket):
+        """양쪽이 모두 지원하는 인코딩만 사용하고, 아직 알리지 않았으면 HELLO 로 응답"""
+        flags = 0
+        for name in hello.get("encodings", []):
+            flags |= ENCODING_FLAGS.get(name, 0)
+        if peer_socket not in self.hello_sent:
+            self.send_hello(peer_socket)
+        self.peer_encodings[peer_socket] = flags & self.encodings
+
+    def has_seen(self, key: str) -> bool:
+        return key in self.seen
+
+    def mark_seen(self, key: str) -> bool:
+        """처음 보는 블록 해시/txid 면 기록하고 True"""
+        return self.seen.add(key)
+
+    def relay(self, kind: str, key: str, message: Dict, exclude_socket=None):
+        """검증된 블록/트랜잭션 전파 (announce 모드는 INV 만 보내고 본문은 GETDATA 에 응답)"""
+        if not self.announce:
+            self.broadcast_encoded(message, exclude_socket)
+            return
+        self.relay_cache.add(key, message)
+        inventory = {"type": "INV", "data": {"items": [{"type": kind, "hash": key}]}}
+        self.broadcast_frame(encode_message(inventory), exclude_socket)
+
+    def wants(self, item: Dict) -> bool:
+        """INV 항목을 요청해야 하는지 (이미 가졌거나 다른 피어에게 요청 중이면 False)"""
+        key = item["hash"]
+        if item["type"] not in INVENTORY_MESSAGES or self.has_seen(key):
+            return False
+        if item["type"] == "block" and key in self.blockchain.tree:
+            return False
+        if item["type"] == "tx" and key in self.blockchain.mempool:
+            return False
+        return self.requested.add(key)
+
+    def inventory_message(self, item: Dict):
+        """GETDATA 항목의 본문 메시지 (전파 캐시에 없으면 체인/멤풀에서 다시 만듦)"""
+        key = item["hash"]
+        message = self.relay_cache.get(key)
+        if message is not None:
+            return message
+        if item["type"] == "block":
+            block = self.blockchain.get_block_by_hash(key)
+            if block is not None:
+                return {"type": "NEW_BLOCK", "data": block.to_dict()}
+        elif item["type"] == "tx":
+            transaction = self.blockchain.mempool.get(key)
+            if transaction is not None:
+                return {"type": "NEW_TRANSACTION", "data": transaction.to_dict()}
+        return None
+
+    def broadcast_frame(self, frame: bytes, exclude_socket=None):
         for peer in self.peers:
             if peer["socket"] != exclude_socket:
                 try:
-                    peer["socket"].send(message.encode())
+                    self.send_frame(peer["socket"], frame)
                 except Exception as e:
-                    print(f"메시지 브로드캐스트 중 오류: {e}")
+                    log.warning("메시지 브로드캐스트 중 오류: %s", e)
+
+    def send_frame(self, peer_socket: socket.socket, frame: bytes):
+        """여러 스레드가 같은 소켓에 동시에 써도 프레임이 섞이지 않도록 잠금 후 전송"""
+        lock = self.send_locks.setdefault(peer_socket, threading.Lock())
+        with lock:
+            peer_socket.sendall(frame)
+        count_frame(SENT_BYTES, SENT_MESSAGES, frame[FRAME_HEADER.size - 1], len(frame))
 
-    def sync_blockchain(self, peer_socket: socket.socket):
+    def send_frame_parts(self, peer_socket: socket.socket, message_type: str, parts: List[bytes], flags: int = 0):
+        """조각들을 합친 것이 페이로드인 프레임을 sendmsg 로 복사 없이 전송 (flags 는 페이로드 인코딩)"""
+        length = sum(len(part) for part in parts)
+        header = encode_frame_header(message_type, length, flags)
+        lock = self.send_locks.setdefault(peer_socket, threading.Lock())
+        with lock:
+            sendmsg_all(peer_socket, [header] + parts)
+        count_frame(SENT_BYTES, SENT_MESSAGES, header[-1], len(header) + length)
+
+    def sync_blockchain(self, peer_socket: socket.socket, locator: List[str] = None):
         try:
-            # 블록체인 데이터 요청
+            # 전체 체인 대신 locator 이후의 헤더부터 요청
             request = {
-                "type": "REQUEST_CHAIN",
-                "data": None
+                "type": "GET_HEADERS",
+                "data": {"locator": locator or self.blockchain.get_block_locator()}
             }
-            print("체인 동기화 요청 전송")  # 디버깅 추가
-            peer_socket.send(json.dumps(request).encode())
+            log.debug("체인 동기화 요청 전송")
+            self.send_message(peer_socket, request)
         except Exception as e:
-            print(f"체인 동기화 중 오류: {e}")
+            log.warning("체인 동기화 중 오류: %s", e)
+
+    def send_headers(self, locator: List[str], peer_socket: socket.socket):
+        """locator 와의 공통 블록 다음부터 최대 MAX_HEADERS 개의 헤더 전송"""
+        chain = self.blockchain.chain
+        start = self.blockchain.find_fork_height(locator) + 1
+        if start < self.blockchain.first_height:
+            # 스냅샷으로 시작해 가지고 있지 않은 구간은 제공할 수 없음
+            start = len(chain)
+        headers = [chain[i].header() for i in range(start, min(len(chain), start + MAX_HEADERS))]
+        self.send_message(peer_socket, {"type": "HEADERS", "data": {"headers": headers}})
+
+    def process_headers(self, headers: List[Dict], peer_socket: socket.socket):
+        """받은 헤더를 검증하고 우리 체인에 없는 구간의 블록만 요청"""
+        if not headers:
+            self.sync_states.pop(peer_socket, None)
+            log.info("체인 동기화 완료")
+            return
+        if not self.blockchain.is_valid_header_chain(headers):
+            log.warning("받은 헤더가 유효하지 않음")
+            self.sync_states.pop(peer_socket, None)
+            return
+
+        state = self.sync_states.get(peer_socket)
+        missing = [header for header in headers if header["hash"] not in self.blockchain.tree]
+        has_more = len(headers) == MAX_HEADERS
+        if not missing:
+            if has_more:
+                self.sync_blockchain(peer_socket, [headers[-1]["hash"]])
+            return
+        if self.blockchain.checkpoint_height and missing[0]["index"] <= self.blockchain.checkpoint_height:
+            log.warning("스냅샷 이전에서 갈라진 체인은 적용할 수 없음")
+            self.sync_states.pop(peer_socket, None)
+            return
+        if missing[0]["index"] == 0:
+            # 제네시스가 다른 체인은 블록 트리에 붙일 수 없으므로 전체 체인을 받아 검증한 뒤 교체
+            self.sync_states.pop(peer_socket, None)
+            if self.blockchain.has_more_work(missing) or has_more:
+                log.info("제네시스가 다른 체인, 전체 체인 요청")
+                self.send_message(peer_socket, {"type": "REQUEST_CHAIN", "data": None})
+            return
+
+        if state and state["headers"] and state["headers"][-1]["hash"] == missing[0]["previous_hash"]:
+            # 아직 적용되지 않은 분기의 이어지는 헤더
+            state["headers"].extend(missing)
+        elif self.blockchain.has_more_work(missing) or has_more:
+            state = {
+                "headers": missing,
+                "next": 0,       # 다음에 받을 헤더 위치
+                "started": time.monotonic()
+            }
+            self.sync_states[peer_socket] = state
+        else:
+            log.info("받은 체인의 누적 작업량이 현재 체인보다 크지 않음")
+            return
+        state["more"] = has_more
+        self.request_blocks(state, peer_socket)
+
+    def request_blocks(self, state: Dict, peer_socket: socket.socket):
+        wanted = state["headers"][state["next"]:state["next"] + MAX_BLOCKS_PER_REQUEST]
+        if wanted:
+            request = {"type": "GET_BLOCKS", "data": {"hashes": [header["hash"] for header in wanted]}}
+            self.send_message(peer_socket, request)
+        elif state["more"]:
+            # 다음 헤더 구간 요청 (적용 전인 분기의 끝을 locator 맨 앞에 둠)
+            self.sync_blockchain(peer_socket, [state["headers"][-1]["hash"]] + self.blockchain.get_block_locator())
+        else:
+            self.sync_states.pop(peer_socket, None)
+            SYNC_SECONDS.observe(time.monotonic() - state["started"])
+            log.info("체인 동기화 완료. 현재 길이: %d", len(self.blockchain.chain))
+
+    def send_blocks(self, hashes: List[str], peer_socket: socket.socket):
+        """요청한 블록 전송 (크기 한도를 넘으면 앞부분만 보내고, 받는 쪽은 나머지를 다시 요청)"""
+        blocks = []
+        size = 0
+        for block_hash in hashes[:MAX_BLOCKS_PER_REQUEST]:
+            height = self.blockchain.height_by_hash.get(block_hash)
+            if height is not None:
+                block = self.blockchain.chain[height]
+                size += len(self.block_json(block))
+                if blocks and size > MAX_BLOCKS_RESPONSE_BYTES:
+                    break
+                blocks.append(block.to_dict())
+        self.send_message(peer_socket, {"type": "BLOCKS", "data": {"blocks": blocks}})
+
+    def process_blocks(self, blocks: List[Dict], peer_socket: socket.socket):
+        """요청한 블록을 받는 대로 블록 트리에 추가 (분기의 누적 작업량이 더 커지면 트리에서 재구성)"""
+        state = self.sync_states.get(peer_socket)
+        if state is None:
+            return
+        blockchain = self.blockchain
+
+        for block_data in blocks:
+            block = Block.from_dict(block_data)
+            expected = state["headers"][state["next"]]
+            if block.hash != expected["hash"] or block.merkle_root != expected["merkle_root"]:
+                log.warning("블록 %d가 헤더와 일치하지 않음", block.index)
+                self.sync_states.pop(peer_socket, None)
+                return
+            state["next"] += 1
+            if not blockchain.add_block(block) and block.hash not in blockchain.tree:
+                log.warning("블록 %d가 유효하지 않음", block.index)
+                self.sync_states.pop(peer_socket, None)
+                return
+
+        self.request_blocks(state, peer_socket)
+
+    def start_backfill(self, peer_socket: socket.socket):
+        """스냅샷 이전 블록을 피어에게서 받아 채움 (헤더가 스냅샷 블록 해시로 이어지는지 확인)"""
+        chain = self.blockchain.chain
+        if not isinstance(chain, SnapshotChain) or chain.history_complete:
+            return
+        history = chain.history
+        state = {
+            "hashes": [] if history else [chain.genesis_hash],  # 본문을 받을 블록 해시 (높이 순)
+            "last_index": len(history) - 1 if history else 0,  # 마지막으로 확인한 헤더
+            "last_hash": history[-1].hash if history else chain.genesis_hash,
+            "headers_done": False,  # 스냅샷 블록까지 헤더 확인 완료
+            "waiting": None
+        }
+        self.backfill_states[peer_socket] = state
+        log.info("백필 시작: 높이 %d ~ %d", len(history), chain.base_height - 1)
+        self.request_history(state, peer_socket)
+
+    def is_history_response(self, peer_socket, waiting: str, items: List[Dict]) -> bool:
+        """백필 요청에 대한 응답인지 (백필 구간은 스냅샷 높이보다 낮음)"""
+        state = self.backfill_states.get(peer_socket)
+        if state is None or state["waiting"] != waiting:
+            return False
+        return not items or items[0]["index"] <= self.blockchain.chain.base_height
+
+    def request_history(self, state: Dict, peer_socket: socket.socket):
+        if state["hashes"]:
+            state["waiting"] = "blocks"
+            hashes = state["hashes"][:MAX_BLOCKS_PER_REQUEST]
+            self.send_message(peer_socket, {"type": "GET_BLOCKS", "data": {"hashes": hashes}})
+        elif not state["headers_done"]:
+            state["waiting"] = "headers"
+            self.send_message(peer_socket, {"type": "GET_HEADERS", "data": {"locator": [state["last_hash"]]}})
+        else:
+            self.backfill_states.pop(peer_socket, None)
+
+    def process_history_headers(self, headers: List[Dict], peer_socket: socket.socket):
+        state = self.backfill_states[peer_socket]
+        chain = self.blockchain.chain
+        if not headers:
+            log.warning("피어가 스냅샷 이전 블록을 제공하지 않음, 백필 중단")
+            self.backfill_states.pop(peer_socket, None)
+            return
+        for header in headers:
+            if (header["index"] != state["last_index"] + 1 or header["previous_hash"] != state["last_hash"]
+                    or Block.header_hash(header) != header["hash"]):
+                log.warning("백필 헤더가 유효하지 않음, 백필 중단")
+                self.backfill_states.pop(peer_socket, None)
+                return
+            if header["index"] == chain.base_height:
+                # 받은 이력이 신뢰하는 스냅샷 블록으로 이어져야 함
+                if header["hash"] != chain.blocks[0].hash:
+                    log.warning("백필 체인이 스냅샷 블록과 다름, 백필 중단")
+                    self.backfill_states.pop(peer_socket, None)
+                    return
+                state["headers_done"] = True
+                break
+            state["hashes"].append(header["hash"])
+            state["last_index"] = header["index"]
+            state["last_hash"] = header["hash"]
+        self.request_history(state, peer_socket)
+
+    def process_history_blocks(self, blocks: List[Dict], peer_socket: socket.socket):
+        state = self.backfill_states[peer_socket]
+        next_height = len(self.blockchain.chain.history)
+        received = []
+        for offset, block_data in enumerate(blocks):
+            block = Block.from_dict(block_data)
+            # 해시는 헤더 단계에서 확인한 값과 같아야 하고, 본문(머클 루트)까지 해시에 포함됨
+            if (offset >= len(state["hashes"]) or block.hash != state["hashes"][offset]
+                    or block.index != next_height + offset or block.calculate_hash() != block.hash):
+                log.warning("백필 블록 %d가 헤더와 일치하지 않음, 백필 중단", block.index)
+                self.backfill_states.pop(peer_socket, None)
+                return
+            received.append(block)
+        if not received:
+            log.warning("피어가 백필 블록을 보내지 않음, 백필 중단")
+            self.backfill_states.pop(peer_socket, None)
+            return
+        del state["hashes"][:len(received)]
+        self.blockchain.add_history(received)
+        self.request_history(state, peer_socket)
 
     def remove_peer(self, peer_socket: socket.socket):
         self.peers = [peer for peer in self.peers if peer["socket"] != peer_socket]
+        self.send_locks.pop(peer_socket, None)
+        self.sync_states.pop(peer_socket, None)
+        self.backfill_states.pop(peer_socket, None)
+        self.peer_encodings.pop(peer_socket, None)
+        self.hello_sent.discard(peer_socket)
         try:
             peer_socket.close()
         except:
             pass
 
     def close(self):
-        for peer in self.peers:
+        # close() 만으로는 recv/accept 에서 대기 중인 스레드가 깨어나지 않으므로 먼저 shutdown
+        # (깨어난 스레드가 닫힌 소켓에서 받는 오류는 closing 으로 구분해 경고하지 않음)
+        self.closing = True
+        for peer in list(self.peers):
             try:
+                peer["socket"].shutdown(socket.SHUT_RDWR)
                 peer["socket"].close()
             except:
                 pass
+        try:
+            self.server_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
         self.server_socket.close() 
\ No newline at end of file
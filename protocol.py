@@ -0,0 +1,222 @@
+import json
+import socket
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import codec
+
+# 프레임 헤더: 페이로드 길이(4바이트, big-endian) + 메시지 타입(1바이트)
+FRAME_HEADER = struct.Struct("!IB")
+# 프레임 크기 한도: 가장 큰 일반 메시지인 BLOCKS 응답(MAX_BLOCKS_RESPONSE_BYTES)과 트랜잭션 수 한도를 채운
+# 블록 하나보다 넉넉하게. 전체 체인을 담는 CHAIN_RESPONSE 만 따로 큰 한도를 둔다
+MAX_FRAME_SIZE = 32 * 1024 * 1024
+MAX_CHAIN_FRAME_SIZE = 256 * 1024 * 1024
+MAX_BLOCKS_RESPONSE_BYTES = 16 * 1024 * 1024  # BLOCKS 응답에 담는 블록 JSON 크기 합 한도 (블록 하나는 항상 포함)
+
+MESSAGE_TYPES = {
+    "NEW_BLOCK": 1,
+    "NEW_TRANSACTION": 2,
+    "REQUEST_CHAIN": 3,
+    "CHAIN_RESPONSE": 4,
+    "GET_HEADERS": 5,
+    "HEADERS": 6,
+    "GET_BLOCKS": 7,
+    "BLOCKS": 8,
+    "INV": 9,
+    "GETDATA": 10,
+    "HELLO": 11,
+}
+MESSAGE_NAMES = {code: name for name, code in MESSAGE_TYPES.items()}
+
+# 타입 바이트의 상위 2비트는 페이로드 인코딩 플래그
+TYPE_MASK = 0x3F
+FLAG_BINARY = 0x40      # codec 의 바이너리 레이아웃 (없으면 JSON)
+FLAG_COMPRESSED = 0x80  # zlib 압축
+ENCODING_FLAGS = {"binary": FLAG_BINARY, "zlib": FLAG_COMPRESSED}  # HELLO 에서 알리는 이름
+COMPRESS_THRESHOLD = 1024  # 이보다 작은 페이로드는 압축하지 않음
+COMPRESS_LEVEL = 6
+WIRE_CACHE_BYTES = 64 * 1024 * 1024  # 직렬화한 블록 바이트 캐시 한도
+IOV_MAX = 1024  # sendmsg 한 번에 넘기는 버퍼 수 (리눅스 기본 한도)
+
+
+def frame_limit(type_code: int) -> int:
+    """타입 바이트에 해당하는 메시지의 (압축 해제 후) 최대 페이로드 크기"""
+    if type_code & TYPE_MASK == MESSAGE_TYPES["CHAIN_RESPONSE"]:
+        return MAX_CHAIN_FRAME_SIZE
+    return MAX_FRAME_SIZE
+
+
+def encode_frame(message_type: str, payload: bytes, flags: int = 0) -> bytes:
+    """페이로드 앞에 길이와 타입 헤더를 붙인 프레임 생성"""
+    return encode_frame_header(message_type, len(payload), flags) + payload
+
+
+def encode_frame_header(message_type: str, length: int, flags: int = 0) -> bytes:
+    type_code = MESSAGE_TYPES[message_type] | flags
+    if length > frame_limit(type_code):
+        raise ValueError(f"프레임 크기 초과: {length} 바이트")
+    return FRAME_HEADER.pack(length, type_code)
+
+
+def sendmsg_all(sock: socket.socket, buffers: List[bytes]):
+    """여러 버퍼를 이어 붙이지 않고 순서대로 전송 (sendmsg 가 없는 플랫폼은 합쳐서 sendall)"""
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(buffers))
+        return
+    views = [memoryview(buffer) for buffer in buffers if buffer]
+    position = 0
+    while position < len(views):
+        sent = sock.sendmsg(views[position:position + IOV_MAX])
+        # 다 보낸 버퍼는 건너뛰고, 일부만 보낸 버퍼는 남은 부분부터 다시 보냄
+        while sent:
+            size = len(views[position])
+            if sent < size:
+                views[position] = views[position][sent:]
+                break
+            sent -= size
+            position += 1
+
+
+def compress_parts(parts: Iterable[bytes]) -> List[bytes]:
+    """조각들을 이어 붙인 바이트를 하나의 zlib 스트림으로 압축한 조각 목록 (원본을 합치지 않음)"""
+    compressor = zlib.compressobj(COMPRESS_LEVEL)
+    compressed = [compressor.compress(part) for part in parts]
+    compressed.append(compressor.flush())
+    return [part for part in compressed if part]
+
+
+def encode_message(message: Dict, flags: int = 0) -> bytes:
+    """{"type": ..., "data": ...} 메시지를 프레임으로 변환
+
+    flags 는 상대가 받을 수 있는 인코딩이다. 바이너리 레이아웃이 없는 메시지는 JSON 으로,
+    작은 페이로드는 압축 없이 보낸다.
+    """
+    message_type = message["type"]
+    payload = None
+    frame_flags = 0
+    if flags & FLAG_BINARY:
+        payload = codec.encode_data(message_type, message["data"])
+        if payload is not None:
+            frame_flags |= FLAG_BINARY
+    if payload is None:
+        payload = json.dumps(message).encode()
+    if flags & FLAG_COMPRESSED and len(payload) >= COMPRESS_THRESHOLD:
+        payload = zlib.compress(payload, COMPRESS_LEVEL)
+        frame_flags |= FLAG_COMPRESSED
+    return encode_frame(message_type, payload, frame_flags)
+
+
+def decode_message(type_code: int, payload: bytes) -> Dict:
+    """프레임 타입 바이트의 플래그에 따라 압축 해제/디코딩한 메시지 딕셔너리"""
+    if type_code & FLAG_COMPRESSED:
+        limit = frame_limit(type_code)
+        decompressor = zlib.decompressobj()
+        payload = decompressor.decompress(payload, limit)
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"압축 해제 크기 초과: {limit} 바이트")
+    if type_code & FLAG_BINARY:
+        message_type = MESSAGE_NAMES[type_code & TYPE_MASK]
+        return {"type": message_type, "data": codec.decode_data(message_type, payload)}
+    return json.loads(payload)
+
+
+class WireCache:
+    """직렬화된 바이트의 LRU 캐시 (값 크기의 합이 max_bytes 이하, 여러 피어 스레드가 공유)"""
+
+    def __init__(self, max_bytes: int = WIRE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                self.size -= len(self._items.popitem(last=False)[1])
+
+
+class FrameReader:
+    """재사용 버퍼에 recv_into 로 수신하며 프레임 단위로 재조립
+
+    큰 프레임은 헤더의 길이만큼 미리 할당하지 않고 받은 만큼 버퍼를 두 배씩 늘리며,
+    그 프레임을 꺼낸 뒤에는 버퍼를 기본 크기로 되돌려 연결마다 큰 버퍼가 남지 않게 한다.
+    """
+
+    def __init__(self, sock: socket.socket, buffer_size: int = 64 * 1024):
+        self.sock = sock
+        self.buffer_size = buffer_size
+        self.buffer = bytearray(buffer_size)
+        self.start = 0  # 아직 처리하지 않은 데이터의 시작 위치
+        self.end = 0    # 수신된 데이터의 끝 위치
+
+    def read_frame(self) -> Optional[Tuple[int, bytes]]:
+        """다음 프레임의 (타입 바이트, 페이로드) 반환, 연결이 끊기면 None"""
+        if not self._fill(FRAME_HEADER.size):
+            return None
+        length, type_code = FRAME_HEADER.unpack_from(self.buffer, self.start)
+        if length > frame_limit(type_code):
+            raise ValueError(f"프레임 크기 초과: {length} 바이트")
+        if type_code & TYPE_MASK not in MESSAGE_NAMES:
+            raise ValueError(f"알 수 없는 메시지 타입: {type_code}")
+
+        if not self._fill(FRAME_HEADER.size + length):
+            return None
+        payload_start = self.start + FRAME_HEADER.size
+        payload = bytes(self.buffer[payload_start:payload_start + length])
+        self.start = payload_start + length
+        if len(self.buffer) > self.buffer_size and self.end - self.start <= self.buffer_size:
+            self._shrink()
+        return type_code, payload
+
+    def _fill(self, size: int) -> bool:
+        """버퍼에 처리되지 않은 데이터가 size 바이트 이상 쌓일 때까지 수신"""
+        while self.end - self.start < size:
+            if self.end == len(self.buffer):
+                self._compact(size)
+            received = self.sock.recv_into(memoryview(self.buffer)[self.end:])
+            if not received:
+                return False
+            self.end += received
+        return True
+
+    def _compact(self, size: int):
+        """남은 데이터를 버퍼 앞으로 옮기고, 버퍼가 가득 찼는데 프레임이 더 크면 두 배까지 확장"""
+        pending = self.end - self.start
+        self.buffer[:pending] = self.buffer[self.start:self.end]
+        self.start = 0
+        self.end = pending
+        if pending == len(self.buffer):
+            self.buffer.extend(bytes(min(size, 2 * len(self.buffer)) - len(self.buffer)))
+
+    def _shrink(self):
+        """큰 프레임을 받느라 늘어난 버퍼를 남은 데이터만 옮긴 기본 크기 버퍼로 교체"""
+        pending = self.end - self.start
+        buffer = bytearray(self.buffer_size)
+        buffer[:pending] = self.buffer[self.start:self.end]
+        self.buffer = buffer
+        self.start = 0
+        self.end = pending
@@ -0,0 +1,147 @@
+"""잔액 상태 스냅샷과 스냅샷 높이부터 시작하는 체인
+
+스냅샷은 높이 H 의 블록, 그 시점의 잔액과 난이도 창을 담은 JSON 파일이며, 정규 직렬화의
+SHA-256(digest)으로 고정(pin)한다. 새 노드는 신뢰하는 digest 와 일치하는 스냅샷으로
+시작해 H 이후의 블록만 검증하고, H 이전 블록은 필요하면 나중에 백필한다.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, List
+
+SNAPSHOT_VERSION = 2  # 2: 스냅샷 블록 이전의 난이도 창 포함
+
+
+def snapshot_digest(snapshot: Dict) -> str:
+    return hashlib.sha256(json.dumps(snapshot, sort_keys=True).encode()).hexdigest()
+
+
+def create_snapshot(blockchain) -> Dict:
+    """현재 체인 끝의 블록과 잔액으로 스냅샷 생성"""
+    tip = blockchain.get_latest_block()
+    # 스냅샷 이후 블록의 목표값을 계산할 수 있도록 스냅샷 블록 직전까지의 난이도 창을 함께 담음
+    window = blockchain.window_entries(blockchain.tree.best)[:-1]
+    return {
+        "version": SNAPSHOT_VERSION,
+        "height": tip.index,
+        "hash": tip.hash,
+        "genesis_hash": blockchain.genesis_hash,
+        "block": tip.to_dict(),
+        "balances": dict(blockchain.balances),
+        "difficulty_window": [list(entry) for entry in window]
+    }
+
+
+def write_snapshot(blockchain, path: str) -> str:
+    """스냅샷을 파일로 원자적으로 저장하고 digest 반환"""
+    snapshot = create_snapshot(blockchain)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(snapshot, f, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return snapshot_digest(snapshot)
+
+
+def read_snapshot(path: str, expected_digest: str) -> Dict:
+    """digest 가 고정값과 같고 블록 해시가 맞는 스냅샷만 반환"""
+    from blockchain import Block
+
+    with open(path) as f:
+        snapshot = json.load(f)
+    digest = snapshot_digest(snapshot)
+    if digest != expected_digest:
+        raise ValueError(f"스냅샷 digest 불일치: {digest}")
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"지원하지 않는 스냅샷 버전: {snapshot.get('version')}")
+    block = Block.from_dict(snapshot["block"])
+    if block.index != snapshot["height"] or block.hash != snapshot["hash"] or block.calculate_hash() != block.hash:
+        raise ValueError("스냅샷 블록이 높이/해시와 일치하지 않음")
+    return snapshot
+
+
+class SnapshotChain:
+    """스냅샷 높이(base_height)부터의 블록만 가진 체인 뷰
+
+    blocks[0] 이 스냅샷 블록이며 blocks 는 리스트나 StoredChain 이다. 그 이전 블록은
+    history 에 제네시스부터 순서대로 백필되며, 모두 채워지기 전에는 접근할 수 없다.
+    history 도 리스트나 StoredChain 이며, StoredChain 이면 백필한 블록이 재시작 후에도 남아
+    남은 높이부터 이어서 받는다 (리스트면 메모리에만 있어 매번 다시 받음).
+    """
+
+    def __init__(self, base_height: int, blocks, genesis_hash: str, history=None):
+        self.base_height = base_height
+        self.blocks = blocks
+        self.genesis_hash = genesis_hash
+        self.history = history if history is not None else []  # 백필된 블록 (높이 0 부터 연속)
+
+    @property
+    def history_complete(self) -> bool:
+        return len(self.history) >= self.base_height
+
+    @property
+    def first_height(self) -> int:
+        """접근 가능한 가장 낮은 높이"""
+        return 0 if self.history_complete else self.base_height
+
+    def __len__(self) -> int:
+        return self.base_height + len(self.blocks)
+
+    def _load(self, height: int):
+        if height >= self.base_height:
+            return self.blocks[height - self.base_height]
+        if height < len(self.history):
+            return self.history[height]
+        raise IndexError(f"스냅샷 이전 블록 {height} 은 아직 백필되지 않음")
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._load(height) for height in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("블록 높이 범위 초과")
+        return self._load(key)
+
+    def __iter__(self):
+        for height in range(self.first_height, len(self)):
+            yield self._load(height)
+
+    def iter_block_dicts(self) -> Iterator[Dict]:
+        if self.history_complete:
+            for block in self.history:
+                yield block.to_dict()
+        if hasattr(self.blocks, "iter_block_dicts"):
+            yield from self.blocks.iter_block_dicts()
+        else:
+            for block in self.blocks:
+                yield block.to_dict()
+
+    def iter_block_bytes(self, encode) -> Iterator[bytes]:
+        """블록 JSON 바이트를 순서대로 (메모리의 블록은 encode 로 직렬화)"""
+        if self.history_complete:
+            for block in self.history:
+                yield encode(block)
+        if hasattr(self.blocks, "iter_block_bytes"):
+            yield from self.blocks.iter_block_bytes(encode)
+        else:
+            for block in self.blocks:
+                yield encode(block)
+
+    def append(self, block):
+        self.blocks.append(block)
+
+    def __delitem__(self, key):
+        if not isinstance(key, slice) or key.stop is not None or key.step is not None:
+            raise TypeError("체인 끝부분 슬라이스 삭제만 지원")
+        height = key.indices(len(self))[0]
+        if height <= self.base_height:
+            raise IndexError("스냅샷 블록 이전으로는 되돌릴 수 없음")
+        del self.blocks[height - self.base_height:]
+
+    def extend_history(self, blocks: List):
+        """검증된 백필 블록을 이어 붙임 (스냅샷 높이 직전까지)"""
+        for block in blocks[:self.base_height - len(self.history)]:
+            self.history.append(block)
+
@@ -0,0 +1,461 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from txindex import encode_block_entries
+
+if TYPE_CHECKING:
+    from blockchain import Block
+
+# 세그먼트 레코드: 페이로드 길이(4바이트) + CRC32(4바이트) + 블록 JSON
+RECORD_HEADER = struct.Struct("!II")
+# 인덱스 엔트리 (높이 순서 고정 길이): 세그먼트 번호, 오프셋, 레코드 길이, 블록 해시(32바이트),
+# 타임스탬프, 작업증명 목표값(32바이트) - 재시작 시 블록 본문 없이 블록 트리와 난이도 창을 복원
+INDEX_ENTRY = struct.Struct("!IQI32sd32s")
+# 트랜잭션 색인 파일: 높이 순으로 블록마다 세그먼트와 같은 형식의 레코드 (txindex.encode_block_entries)
+
+FSYNC_POLICIES = ("always", "batch", "never")
+INDEX_REMAP_INTERVAL = 10_000  # 메모리에 쌓인 추가분 인덱스 엔트리를 매핑으로 옮기는 간격
+
+
+class BlockStore:
+    """append-only 세그먼트 파일과 고정 길이 인덱스로 구성된 디스크 블록 저장소
+
+    - always: 블록마다 세그먼트와 인덱스를 fsync
+    - batch: fsync_interval 개 블록마다, 그리고 close() 시 fsync
+    - never: fsync 없이 OS 에 맡김
+
+    트랜잭션 색인 레코드는 txindex.dat 에 블록과 같은 순서로 따로 쌓는다. 레코드가 블록보다
+    적으면 (이전 형식 저장소, 레코드 없이 추가된 블록) 그 뒤의 레코드는 append_tx_record 로 채운다.
+    """
+
+    def __init__(self, directory: str, fsync_policy: str = "batch", fsync_interval: int = 100,
+                 segment_size: int = 64 * 1024 * 1024):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"알 수 없는 fsync 정책: {fsync_policy}")
+        self.directory = directory
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.segment_size = segment_size
+        self._unsynced = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self.index_path = os.path.join(directory, "index.dat")
+        self.state_path = os.path.join(directory, "state.json")
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.tx_index_path = os.path.join(directory, "txindex.dat")
+        self._index_file = open(self.index_path, "a+b")
+        self._tx_file = open(self.tx_index_path, "a+b")
+        self._tx_offsets = array("Q")  # 높이별 트랜잭션 색인 레코드 위치
+        self._index_map: Optional[mmap.mmap] = None
+        self._mapped_count = 0
+        self._tail_entries: List[Tuple] = []  # mmap 이후 추가된 엔트리
+        self._segment_file = None
+        self._segment_number = 0
+        self._read_fds: Dict[int, int] = {}  # 세그먼트별 읽기용 fd (pread 로 위치 공유 없이 읽음)
+
+        self._recover()
+
+    # ---- 경로 및 파일 ----
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"blk{number:05d}.dat")
+
+    def _open_segment(self, number: int):
+        if self._segment_file:
+            self._segment_file.close()
+        self._segment_number = number
+        self._segment_file = open(self._segment_path(number), "a+b")
+
+    def _remap_index(self):
+        """인덱스 파일을 다시 메모리 매핑 (추가분 tail 은 매핑에 합쳐짐)"""
+        if self._index_map:
+            self._index_map.close()
+            self._index_map = None
+        self._index_file.flush()
+        size = os.path.getsize(self.index_path)
+        self._mapped_count = size // INDEX_ENTRY.size
+        if self._mapped_count:
+            self._index_map = mmap.mmap(self._index_file.fileno(), self._mapped_count * INDEX_ENTRY.size,
+                                        access=mmap.ACCESS_READ)
+        self._tail_entries = []
+
+    # ---- 복구 ----
+
+    def _recover(self):
+        """마지막 레코드가 잘린 경우(충돌 등) 인덱스와 세그먼트를 마지막 온전한 레코드로 맞춤"""
+        size = os.path.getsize(self.index_path)
+        if size % INDEX_ENTRY.size:
+            self._truncate_file(self.index_path, size - size % INDEX_ENTRY.size)
+        self._remap_index()
+
+        # 인덱스 끝 엔트리가 가리키는 레코드가 온전하지 않으면 제거
+        count = len(self)
+        while count and self._read_record(*self._entry(count - 1)[:3]) is None:
+            count -= 1
+        if count < len(self):
+            self._truncate_index(count)
+
+        # 인덱스에 기록되기 전에 중단된 세그먼트 레코드를 다시 색인
+        segment, offset = 0, 0
+        if count:
+            segment, offset, length = self._entry(count - 1)[:3]
+            offset += RECORD_HEADER.size + length
+        recovered = []
+        while os.path.exists(self._segment_path(segment)):
+            path = self._segment_path(segment)
+            while True:
+                record = self._read_record(segment, offset, None)
+                if record is None:
+                    break
+                payload, length = record
+                recovered.append(self._index_entry(segment, offset, length, json.loads(payload)))
+                offset += RECORD_HEADER.size + length
+            # 잘린 레코드 꼬리 제거
+            if os.path.getsize(path) > offset:
+                self._truncate_file(path, offset)
+            if not os.path.exists(self._segment_path(segment + 1)):
+                break
+            segment, offset = segment + 1, 0
+
+        self._open_segment(segment)
+        for entry in recovered:
+            self._write_index_entry(entry)
+        if recovered:
+            self._sync(force=True)
+        self._recover_tx_index()
+
+    def _recover_tx_index(self):
+        """트랜잭션 색인 레코드 위치를 헤더만 따라가며 모으고, 잘린 꼬리와 블록보다 많은 레코드는 제거
+
+        세그먼트와 마찬가지로 CRC 는 마지막 레코드만 확인한다.
+        """
+        size = os.path.getsize(self.tx_index_path)
+        offset = 0
+        if size:
+            with open(self.tx_index_path, "rb") as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as data:
+                while len(self._tx_offsets) < len(self) and offset + RECORD_HEADER.size <= size:
+                    length = RECORD_HEADER.unpack_from(data, offset)[0]
+                    if offset + RECORD_HEADER.size + length > size:
+                        break
+                    self._tx_offsets.append(offset)
+                    offset += RECORD_HEADER.size + length
+                while self._tx_offsets:
+                    last = self._tx_offsets[-1]
+                    length, crc = RECORD_HEADER.unpack_from(data, last)
+                    if zlib.crc32(data[last + RECORD_HEADER.size:offset]) == crc:
+                        break
+                    offset = self._tx_offsets.pop()
+        if size > offset:
+            self._truncate_file(self.tx_index_path, offset)
+
+    def _read_record(self, segment: int, offset: int, length: Optional[int]):
+        """(페이로드, 길이) 반환, 레코드가 잘렸거나 CRC 가 맞지 않으면 None"""
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            f.seek(offset)
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return None
+            record_length, crc = RECORD_HEADER.unpack(header)
+            if length is not None and record_length != length:
+                return None
+            payload = f.read(record_length)
+        if len(payload) < record_length or zlib.crc32(payload) != crc:
+            return None
+        return payload, record_length
+
+    @staticmethod
+    def _truncate_file(path: str, size: int):
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+    # ---- 인덱스 ----
+
+    def __len__(self) -> int:
+        return self._mapped_count + len(self._tail_entries)
+
+    @staticmethod
+    def _index_entry(segment: int, offset: int, length: int, block_data: Dict) -> Tuple:
+        return (segment, offset, length, bytes.fromhex(block_data["hash"]), block_data["timestamp"],
+                bytes.fromhex(block_data["target"]))
+
+    def _entry(self, height: int) -> Tuple:
+        if height < self._mapped_count:
+            return INDEX_ENTRY.unpack_from(self._index_map, height * INDEX_ENTRY.size)
+        return self._tail_entries[height - self._mapped_count]
+
+    def _write_index_entry(self, entry: Tuple):
+        self._index_file.write(INDEX_ENTRY.pack(*entry))
+        self._tail_entries.append(entry)
+        if len(self._tail_entries) >= INDEX_REMAP_INTERVAL:
+            # 긴 가져오기나 동기화에서도 메모리의 추가분이 계속 늘지 않도록 다시 매핑
+            self._remap_index()
+
+    def _truncate_index(self, height: int):
+        if self._index_map:
+            self._index_map.close()
+            self._index_map = None
+        self._index_file.flush()
+        self._truncate_file(self.index_path, height * INDEX_ENTRY.size)
+        self._remap_index()
+
+    def block_hash(self, height: int) -> str:
+        return self._entry(height)[3].hex()
+
+    def iter_hashes(self) -> Iterator[str]:
+        """블록 본문을 읽지 않고 인덱스만으로 높이 순 해시 나열"""
+        for height in range(len(self)):
+            yield self._entry(height)[3].hex()
+
+    @property
+    def tx_record_count(self) -> int:
+        """트랜잭션 색인 레코드가 있는 블록 수 (앞에서부터 연속)"""
+        return len(self._tx_offsets)
+
+    def iter_tx_records(self) -> Iterator[bytes]:
+        """높이 순 트랜잭션 색인 레코드 (블록 본문을 읽지 않음)"""
+        self._tx_file.flush()
+        with open(self.tx_index_path, "rb") as f:
+            for _ in range(len(self._tx_offsets)):
+                length, _ = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                yield f.read(length)
+
+    def iter_headers(self) -> Iterator[Tuple[str, float, int]]:
+        """블록 본문을 읽지 않고 높이 순 (해시, 타임스탬프, 목표값) 나열"""
+        for height in range(len(self)):
+            _, _, _, block_hash, timestamp, target = self._entry(height)
+            yield block_hash.hex(), timestamp, int.from_bytes(target, "big")
+
+    # ---- 읽기/쓰기 ----
+
+    def read_block_data(self, height: int) -> Dict:
+        return json.loads(self.read_block_bytes(height))
+
+    def read_block_bytes(self, height: int) -> bytes:
+        """파싱하지 않은 블록 JSON 레코드 (json.dumps(block.to_dict()) 와 같은 바이트)"""
+        if not 0 <= height < len(self):
+            raise IndexError("블록 높이 범위 초과")
+        segment, offset, length = self._entry(height)[:3]
+        if segment == self._segment_number:
+            self._segment_file.flush()
+        fd = self._read_fds.get(segment)
+        if fd is None:
+            fd = self._read_fds[segment] = os.open(self._segment_path(segment), os.O_RDONLY)
+        return os.pread(fd, length, offset + RECORD_HEADER.size)
+
+    def record_size(self, height: int) -> int:
+        """블록 JSON 레코드 크기 (메모리 사용량 추정용)"""
+        return self._entry(height)[2]
+
+    def _close_readers(self):
+        for fd in self._read_fds.values():
+            os.close(fd)
+        self._read_fds = {}
+
+    def append(self, block_data: Dict, tx_record: Optional[bytes] = None):
+        """블록 레코드 추가 (tx_record 는 블록의 트랜잭션 색인 레코드, 앞 레코드가 모두 있을 때만 기록)"""
+        payload = json.dumps(block_data).encode()
+        offset = self._segment_file.tell()
+        if offset and offset + RECORD_HEADER.size + len(payload) > self.segment_size:
+            self._sync(force=True)
+            self._open_segment(self._segment_number + 1)
+            offset = 0
+        self._segment_file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._write_index_entry(self._index_entry(self._segment_number, offset, len(payload), block_data))
+        if tx_record is not None and len(self._tx_offsets) == len(self) - 1:
+            self._write_tx_record(tx_record)
+        self._unsynced += 1
+        self._sync()
+
+    def append_tx_record(self, tx_record: bytes):
+        """트랜잭션 색인 레코드가 빠진 다음 높이(tx_record_count)의 레코드 기록"""
+        if len(self._tx_offsets) >= len(self):
+            raise IndexError("색인 레코드가 빠진 블록이 없음")
+        self._write_tx_record(tx_record)
+
+    def _write_tx_record(self, tx_record: bytes):
+        self._tx_file.seek(0, os.SEEK_END)
+        self._tx_offsets.append(self._tx_file.tell())
+        self._tx_file.write(RECORD_HEADER.pack(len(tx_record), zlib.crc32(tx_record)) + tx_record)
+
+    def truncate(self, height: int):
+        """height 이상의 블록 제거 (재구성 시 사용)"""
+        if height >= len(self):
+            return
+        self._segment_file.flush()
+        segment, offset = self._entry(height)[:2]
+        self._truncate_index(height)
+        self._close_readers()
+        number = segment + 1
+        while os.path.exists(self._segment_path(number)):
+            os.remove(self._segment_path(number))
+            number += 1
+        self._segment_file.close()
+        self._segment_file = None
+        self._truncate_file(self._segment_path(segment), offset)
+        self._open_segment(segment)
+        if height < len(self._tx_offsets):
+            self._tx_file.flush()
+            self._tx_file.truncate(self._tx_offsets[height])
+            del self._tx_offsets[height:]
+        self._sync(force=True)
+
+    def _sync(self, force: bool = False):
+        if self.fsync_policy == "never" and not force:
+            return
+        if force or self.fsync_policy == "always" or self._unsynced >= self.fsync_interval:
+            self._segment_file.flush()
+            self._index_file.flush()
+            self._tx_file.flush()
+            if self.fsync_policy != "never":
+                os.fsync(self._segment_file.fileno())
+                os.fsync(self._index_file.fileno())
+                os.fsync(self._tx_file.fileno())
+            self._unsynced = 0
+
+    # ---- 상태 체크포인트 ----
+
+    def save_state(self, state: Dict):
+        """잔액 등 파생 상태를 원자적으로 저장 (임시 파일 후 rename)"""
+        self._write_json(self.state_path, state)
+
+    def load_state(self) -> Optional[Dict]:
+        return self._read_json(self.state_path)
+
+    def save_snapshot(self, snapshot: Dict):
+        """저장소가 스냅샷 높이부터 시작할 때 기준 상태 보관 (체크포인트가 없을 때 복구용)"""
+        self._write_json(self.snapshot_path, snapshot)
+
+    def load_snapshot(self) -> Optional[Dict]:
+        return self._read_json(self.snapshot_path)
+
+    @staticmethod
+    def _write_json(path: str, data: Dict):
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def close(self):
+        self._sync(force=True)
+        self._close_readers()
+        if self._index_map:
+            self._index_map.close()
+            self._index_map = None
+        self._index_file.close()
+        self._tx_file.close()
+        self._segment_file.close()
+
+
+class StoredChain:
+    """BlockStore 를 리스트처럼 다루는 체인 뷰
+
+    체인 끝의 recent_blocks 개 블록은 항상 메모리에 두고, 그 이전 블록은 접근할 때
+    디스크에서 읽어 cache_budget 바이트 한도의 LRU 캐시에 보관한다.
+    """
+
+    # 블록 객체의 메모리 사용량을 JSON 레코드 크기의 배수로 추정
+    MEMORY_FACTOR = 4
+
+    def __init__(self, store: BlockStore, recent_blocks: int = 64, cache_budget: int = 64 * 1024 * 1024):
+        self.store = store
+        self.recent_blocks = recent_blocks
+        self.cache_budget = cache_budget
+        self._recent: Dict[int, "Block"] = {}  # 체인 끝 구간의 블록 (축출 대상 아님)
+        self._cache: "OrderedDict[int, Tuple[Block, int]]" = OrderedDict()  # 높이 -> (블록, 추정 크기)
+        self.cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _normalize(self, height: int) -> int:
+        if height < 0:
+            height += len(self)
+        if not 0 <= height < len(self):
+            raise IndexError("블록 높이 범위 초과")
+        return height
+
+    def _load(self, height: int):
+        from blockchain import Block
+
+        block = self._recent.get(height)
+        if block is not None:
+            self.hits += 1
+            return block
+        cached = self._cache.get(height)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(height)
+            return cached[0]
+
+        self.misses += 1
+        block = Block.from_dict(self.store.read_block_data(height))
+        if height >= len(self) - self.recent_blocks:
+            self._recent[height] = block
+        else:
+            self._cache_block(height, block)
+        return block
+
+    def _cache_block(self, height: int, block):
+        size = self.store.record_size(height) * self.MEMORY_FACTOR
+        self._cache[height] = (block, size)
+        self.cache_bytes += size
+        while self.cache_bytes > self.cache_budget and self._cache:
+            _, (_, evicted_size) = self._cache.popitem(last=False)
+            self.cache_bytes -= evicted_size
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._load(height) for height in range(*key.indices(len(self)))]
+        return self._load(self._normalize(key))
+
+    def __iter__(self):
+        for height in range(len(self)):
+            yield self._load(height)
+
+    def iter_block_dicts(self) -> Iterator[Dict]:
+        """Block 객체를 만들지 않고 저장된 블록 딕셔너리를 순서대로 읽음"""
+        for height in range(len(self)):
+            yield self.store.read_block_data(height)
+
+    def iter_block_bytes(self, encode=None) -> Iterator[bytes]:
+        """저장된 블록 JSON 레코드를 그대로 순서대로 읽음 (레코드가 곧 블록 JSON 이라 encode 는 쓰지 않음)"""
+        for height in range(len(self)):
+            yield self.store.read_block_bytes(height)
+
+    def append(self, block):
+        self.store.append(block.to_dict(), encode_block_entries(block.transactions))
+        self._recent[len(self) - 1] = block
+        # 최근 구간을 벗어난 블록은 LRU 캐시로 이동
+        boundary = len(self) - self.recent_blocks
+        for height in [h for h in self._recent if h < boundary]:
+            self._cache_block(height, self._recent.pop(height))
+
+    def __delitem__(self, key):
+        if not isinstance(key, slice) or key.stop is not None or key.step is not None:
+            raise TypeError("체인 끝부분 슬라이스 삭제만 지원")
+        height = key.indices(len(self))[0]
+        self.store.truncate(height)
+        for cached in [h for h in self._recent if h >= height]:
+            del self._recent[cached]
+        for cached in [h for h in self._cache if h >= height]:
+            self.cache_bytes -= self._cache.pop(cached)[1]
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import math
+from typing import Dict, Optional
+
+
+class Transaction:
+    """불변 트랜잭션 레코드
+
+    네트워크/저장 형식은 기존과 같은 {"from", "to", "amount", "timestamp"} 딕셔너리이며,
+    변환은 from_dict/to_dict 로 경계에서만 한다. txid 는 처음 필요할 때 한 번 계산해 보관하고,
+    정규 직렬화(canonical)는 요청된 경우에만 캐시해 트랜잭션당 메모리를 줄인다.
+    """
+
+    __slots__ = ("sender", "recipient", "amount", "timestamp", "signature", "public_key", "fee",
+                 "_canonical", "_digest", "_size")
+
+    def __init__(self, sender: str, recipient: str, amount: float, timestamp: Optional[float] = None,
+                 signature: Optional[str] = None, public_key: Optional[str] = None,
+                 fee: Optional[float] = None):
+        set_field = object.__setattr__
+        set_field(self, "sender", sender)
+        set_field(self, "recipient", recipient)
+        set_field(self, "amount", amount)
+        set_field(self, "timestamp", timestamp)  # 채굴 보상 트랜잭션은 timestamp 가 없음
+        # 서명(base64)과 공개키(PEM 문자열)는 다른 노드가 다시 검증할 수 있도록 함께 전달
+        set_field(self, "signature", signature)
+        set_field(self, "public_key", public_key)
+        # 수수료는 선택 항목이며 멤풀 우선순위와 채굴자 보상에 쓰임 (없으면 기존 형식 그대로)
+        set_field(self, "fee", fee)
+        set_field(self, "_canonical", None)
+        set_field(self, "_digest", None)
+        set_field(self, "_size", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Transaction 은 변경할 수 없음")
+
+    def __reduce__(self):
+        # 캐시 슬롯은 제외하고 필드만으로 다시 생성 (멀티프로세스 전달용)
+        return (Transaction, (self.sender, self.recipient, self.amount, self.timestamp,
+                              self.signature, self.public_key, self.fee))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Transaction":
+        return cls(data["from"], data["to"], data["amount"], data.get("timestamp"),
+                   data.get("signature"), data.get("public_key"), data.get("fee"))
+
+    def to_dict(self) -> Dict:
+        data = {
+            "from": self.sender,
+            "to": self.recipient,
+            "amount": self.amount
+        }
+        if self.fee is not None:
+            data["fee"] = self.fee
+        if self.timestamp is not None:
+            data["timestamp"] = self.timestamp
+        if self.signature is not None:
+            data["signature"] = self.signature
+            data["public_key"] = self.public_key
+        return data
+
+    def signing_message(self) -> str:
+        """서명 대상 메시지 (서명 제외, 수수료와 timestamp 는 있으면 포함)
+
+        timestamp 도 서명하므로 확정된 트랜잭션의 시각만 바꿔 다른 txid 로 다시 보낼 수 없다.
+        """
+        message = {
+            "from": self.sender,
+            "to": self.recipient,
+            "amount": self.amount
+        }
+        if self.fee is not None:
+            message["fee"] = self.fee
+        if self.timestamp is not None:
+            message["timestamp"] = self.timestamp
+        return json.dumps(message, sort_keys=True)
+
+    def has_valid_amounts(self) -> bool:
+        """금액은 0 보다 큰 숫자, 수수료는 없거나 0 이상의 숫자 (음수 수수료는 채굴자에게서 빼 감)"""
+        if not _is_number(self.amount) or self.amount <= 0:
+            return False
+        return self.fee is None or (_is_number(self.fee) and self.fee >= 0)
+
+    def _serialize(self) -> bytes:
+        return json.dumps(self.to_dict(), sort_keys=True).encode()
+
+    @property
+    def canonical(self) -> bytes:
+        """정렬된 키의 JSON 직렬화 (한 번만 계산)"""
+        if self._canonical is None:
+            object.__setattr__(self, "_canonical", self._serialize())
+        return self._canonical
+
+    @property
+    def digest(self) -> bytes:
+        """정규 직렬화의 SHA-256 (32바이트)"""
+        if self._digest is None:
+            data = self._canonical if self._canonical is not None else self._serialize()
+            object.__setattr__(self, "_digest", hashlib.sha256(data).digest())
+            object.__setattr__(self, "_size", len(data))
+        return self._digest
+
+    @property
+    def size(self) -> int:
+        """정규 직렬화의 바이트 수 (digest 와 함께 계산되어 보관)"""
+        if self._size is None:
+            self.digest
+        return self._size
+
+    @property
+    def txid(self) -> str:
+        return self.digest.hex()
+
+    def __eq__(self, other):
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"Transaction({self.sender!r} -> {self.recipient!r}: {self.amount!r})"
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
@@ -0,0 +1,121 @@
+import json
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+POSITION_BITS = 16  # 참조 = 높이 << POSITION_BITS | 블록 안 위치 (블록당 트랜잭션 수 한도보다 넉넉하게)
+# 블록별 색인 레코드: 트랜잭션 수(4바이트) + txid digest(32바이트씩) + [보낸 사람, 받는 사람, ...] JSON
+ENTRY_COUNT = struct.Struct("!I")
+DIGEST_SIZE = 32
+
+_decode_addresses = json.JSONDecoder().decode
+
+
+def make_ref(height: int, position: int) -> int:
+    return height << POSITION_BITS | position
+
+
+def split_ref(ref: int) -> Tuple[int, int]:
+    """참조 -> (높이, 블록 안 위치)"""
+    return ref >> POSITION_BITS, ref & ((1 << POSITION_BITS) - 1)
+
+
+def encode_block_entries(transactions: Iterable) -> bytes:
+    """블록의 색인 항목을 저장용 레코드로 (재시작 시 블록 본문을 파싱하지 않고 색인을 복원)"""
+    transactions = list(transactions)
+    addresses = []
+    for transaction in transactions:
+        addresses.append(transaction.sender)
+        addresses.append(transaction.recipient)
+    return (ENTRY_COUNT.pack(len(transactions)) + b"".join(transaction.digest for transaction in transactions)
+            + json.dumps(addresses).encode())
+
+
+class TransactionIndex:
+    """최선 체인의 트랜잭션 보조 색인: txid -> 참조, 주소 -> 참조 목록
+
+    참조는 (높이, 위치)를 정수 하나로 묶은 값이다. txid 는 16진수 문자열 대신 32바이트 digest 를
+    키로 쓰고, 주소별 참조는 array('q') 에 8바이트씩 담아 트랜잭션이 많아도 객체 수가 늘지 않는다.
+    같은 txid 가 여러 번 포함되면 (타임스탬프 없는 같은 주소의 채굴 보상 등) 처음 포함된 위치를
+    가리키며, 블록은 체인 끝부터 되돌리므로 되돌릴 때도 처음 위치가 유지된다.
+    """
+
+    def __init__(self):
+        self.by_txid: Dict[bytes, int] = {}
+        self.by_address: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_txid)
+
+    def add_block(self, height: int, transactions: Iterable):
+        for position, transaction in enumerate(transactions):
+            self._add(make_ref(height, position), transaction.digest, transaction.sender, transaction.recipient)
+
+    def add_encoded(self, height: int, record: bytes):
+        """encode_block_entries 로 저장한 레코드로 블록의 항목 추가 (add_block 과 같은 결과)"""
+        count, = ENTRY_COUNT.unpack_from(record)
+        end = ENTRY_COUNT.size + count * DIGEST_SIZE
+        addresses = _decode_addresses(record[end:].decode())
+        for position in range(count):
+            start = ENTRY_COUNT.size + position * DIGEST_SIZE
+            self._add(make_ref(height, position), record[start:start + DIGEST_SIZE],
+                      addresses[2 * position], addresses[2 * position + 1])
+
+    def _add(self, ref: int, digest: bytes, sender: str, recipient: str):
+        self.by_txid.setdefault(digest, ref)
+        self._add_ref(sender, ref)
+        if recipient != sender:
+            self._add_ref(recipient, ref)
+
+    def remove_block(self, height: int, transactions: List):
+        for position in reversed(range(len(transactions))):
+            transaction = transactions[position]
+            ref = make_ref(height, position)
+            # 이 위치를 가리키는 항목만 지움 (먼저 포함된 같은 txid 의 항목은 남김)
+            if self.by_txid.get(transaction.digest) == ref:
+                del self.by_txid[transaction.digest]
+            self._remove_ref(transaction.sender, ref)
+            if transaction.recipient != transaction.sender:
+                self._remove_ref(transaction.recipient, ref)
+
+    def _add_ref(self, address: str, ref: int):
+        refs = self.by_address.get(address)
+        if refs is None:
+            refs = self.by_address[address] = array("q")
+        refs.append(ref)
+
+    def _remove_ref(self, address: str, ref: int):
+        refs = self.by_address.get(address)
+        if refs is None:
+            return
+        # 체인 끝 블록부터 되돌리므로 대개 배열의 마지막 항목 (백필 블록이 뒤에 붙은 경우만 검색)
+        if refs and refs[-1] == ref:
+            refs.pop()
+        elif ref in refs:
+            refs.remove(ref)
+        if not refs:
+            del self.by_address[address]
+
+    def lookup(self, txid: str) -> Optional[Tuple[int, int]]:
+        """txid 가 포함된 (높이, 위치) (없으면 None)"""
+        try:
+            key = bytes.fromhex(txid)
+        except ValueError:
+            return None
+        ref = self.by_txid.get(key)
+        return split_ref(ref) if ref is not None else None
+
+    def address_refs(self, address: str) -> List[Tuple[int, int]]:
+        """주소가 보내거나 받은 트랜잭션의 (높이, 위치) 목록, 높이 순"""
+        refs = self.by_address.get(address)
+        if refs is None:
+            return []
+        return [split_ref(ref) for ref in sorted(refs)]
+
+    def memory_bytes(self) -> int:
+        """색인이 차지하는 대략적인 메모리 (딕셔너리, 키, 참조 배열)"""
+        size = sys.getsizeof(self.by_txid) + sys.getsizeof(self.by_address)
+        size += sum(sys.getsizeof(key) + sys.getsizeof(ref) for key, ref in self.by_txid.items())
+        size += sum(sys.getsizeof(address) + sys.getsizeof(refs) for address, refs in self.by_address.items())
+        return size
@@ -0,0 +1,258 @@
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from merkle import merkle_root
+from difficulty import MEDIAN_TIME_SPAN, is_valid_timestamp, meets_target, median_time_past, target_to_hex, target_work
+
+log = logging.getLogger(__name__)
+
+NO_FAILURE = 2 ** 62  # 공유 최초 실패 위치의 초기값
+ABORT_CHECK_INTERVAL = 256  # 워커가 다른 워커의 실패를 확인하는 블록 간격
+
+_first_bad = None  # 워커 프로세스에 상속되는 공유 최초 실패 위치
+
+
+def _init_worker(first_bad):
+    global _first_bad
+    _first_bad = first_bad
+
+
+def block_record(block) -> Tuple:
+    """워커로 보낼 블록 필드 (Block 객체 대신 튜플로 피클 비용을 줄임)"""
+    return (block.index, block.timestamp, block.previous_hash, block.merkle_root, block.target,
+            block.nonce, block.hash, block.transactions)
+
+
+def validate_chunk(start: int, previous_index: int, previous_hash: str, records: List[Tuple],
+                   timestamps: List[float] = ()) -> Optional[Tuple[int, str]]:
+    """연속된 블록 구간 검증. 처음 실패한 (체인 위치, 사유) 또는 None
+
+    timestamps 는 구간 직전 블록들의 타임스탬프 (중앙값 규칙 확인용, 오래된 순).
+    앞 구간에서 이미 실패가 나왔으면 이 구간의 결과는 필요 없으므로 중간에 멈춘다.
+    """
+    from blockchain import Block, MAX_BLOCK_TRANSACTIONS
+
+    recent = deque(timestamps, maxlen=MEDIAN_TIME_SPAN)
+    now = time.time()
+
+    for offset, (index, timestamp, parent_hash, root, target, nonce, block_hash,
+                 transactions) in enumerate(records):
+        position = start + offset
+        if _first_bad is not None and offset % ABORT_CHECK_INTERVAL == 0 and _first_bad.value < position:
+            return None
+        failure = None
+        if index != previous_index + 1:
+            failure = "인덱스가 이어지지 않음"
+        elif parent_hash != previous_hash:
+            failure = "이전 블록 해시가 일치하지 않음"
+        elif not is_valid_timestamp(timestamp, median_time_past(recent), now):
+            failure = "타임스탬프가 최근 블록들의 중앙값 이전이거나 너무 먼 미래"
+        elif len(transactions) > MAX_BLOCK_TRANSACTIONS:
+            failure = "블록 트랜잭션 수 초과"
+        elif not all(transaction.has_valid_amounts() for transaction in transactions):
+            failure = "트랜잭션 금액이나 수수료가 유효하지 않음"
+        elif not meets_target(block_hash, target_to_hex(target)):
+            failure = "작업증명 목표값을 만족하지 않음"
+        elif Block.hash_with_nonce(hashlib.sha256(Block.encode_header_prefix(
+                index, timestamp, parent_hash, root, target_to_hex(target))), nonce) != block_hash:
+            failure = "블록 해시가 일치하지 않음"
+        elif merkle_root(transactions) != root:
+            failure = "머클 루트가 일치하지 않음"
+        if failure is not None:
+            if _first_bad is not None:
+                with _first_bad.get_lock():
+                    _first_bad.value = min(_first_bad.value, position)
+            return position, failure
+        previous_index = index
+        previous_hash = block_hash
+        recent.append(timestamp)
+    return None
+
+
+class ChainValidator:
+    """블록 구간을 프로세스 풀에 나눠 해시/작업증명/연결 관계를 검증
+
+    첫 블록은 기준(제네시스 또는 이미 검증된 블록)으로 보고 그 다음 블록부터 검증한다.
+    목표값이 재조정 규칙과 같은지와 트랜잭션이 다시 포함되지 않았는지는 앞 블록들에 의존하므로
+    구간을 만들면서 순서대로 확인한다.
+    어느 워커든 실패를 찾으면 공유 값에 위치를 기록하고, 그보다 뒤의 구간은 검증을 멈추며
+    아직 시작하지 않은 구간은 취소한다.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 5000,
+                 start_method: Optional[str] = None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.context = multiprocessing.get_context(start_method)
+        self.last_failure: Optional[Tuple[int, str]] = None  # 마지막 검증의 (실패 위치, 사유)
+        self._rule_failure: Optional[Tuple[int, str]] = None  # 구간 생성 중 찾은 목표값 규칙 위반
+
+    def validate(self, blocks: Iterable, retarget=None,
+                 confirmed: Optional[Callable[[str], bool]] = None) -> Optional[int]:
+        """처음으로 유효하지 않은 블록의 위치 (모두 유효하면 None)
+
+        retarget 은 기준 블록까지 반영된 DifficultyEngine (None 이면 목표값 규칙은 확인하지 않음).
+        confirmed 는 기준 블록까지 확정된 txid 인지 알려 주는 함수 (None 이면 검증 구간 안의 중복만 확인).
+        """
+        iterator = iter(blocks)
+        anchor = next(iterator, None)
+        if anchor is None:
+            self.last_failure = None
+            return None
+
+        self._rule_failure = None
+        # 구간이 하나뿐이면 프로세스 풀을 띄우지 않고 바로 검증
+        chunks = self._chunks(anchor, iterator, retarget, confirmed)
+        head = list(itertools.islice(chunks, 2))
+        chunks = itertools.chain(head, chunks)
+        if self.workers <= 1 or len(head) < 2:
+            failure = None
+            for chunk in chunks:
+                failure = validate_chunk(*chunk)
+                if failure is not None:
+                    break
+        else:
+            failure = self._validate_parallel(chunks)
+        if failure is None or (self._rule_failure is not None and self._rule_failure < failure):
+            failure = self._rule_failure
+
+        self.last_failure = failure
+        if failure is not None:
+            log.warning("블록 %d 검증 실패: %s", failure[0], failure[1])
+            return failure[0]
+        return None
+
+    def iter_valid(self, blocks: Iterable, retarget=None,
+                   confirmed: Optional[Callable[[str], bool]] = None) -> Iterator:
+        """validate 와 같은 검증을 하면서 유효한 것으로 확인된 블록(기준 블록 제외)을 순서대로 내보냄
+
+        구간 결과를 순서대로 기다리므로 메모리에는 진행 중인 구간의 블록만 남는다. 실패하면 그 앞
+        블록까지만 내보내고 멈추며, 실패 위치와 사유는 last_failure 에 남는다.
+        """
+        iterator = iter(blocks)
+        anchor = next(iterator, None)
+        self.last_failure = None
+        self._rule_failure = None
+        if anchor is None:
+            return
+        pending = deque()  # 구간으로 읽혔지만 아직 내보내지 않은 블록 (읽은 순서)
+
+        def remember():
+            for block in iterator:
+                pending.append(block)
+                yield block
+
+        failure = None
+        for chunk, result in self._ordered_results(self._chunks(anchor, remember(), retarget, confirmed)):
+            count = len(chunk[3]) if result is None else result[0] - chunk[0]
+            for _ in range(count):
+                yield pending.popleft()
+            if result is not None:
+                failure = result
+                break
+        if failure is None:
+            failure = self._rule_failure
+        self.last_failure = failure
+        if failure is not None:
+            log.warning("블록 %d 검증 실패: %s", failure[0], failure[1])
+
+    def _ordered_results(self, chunks) -> Iterator[Tuple]:
+        """(구간, 검증 결과) 를 구간 순서대로 (워커가 2개 이상이면 앞선 구간들을 미리 검증)"""
+        if self.workers <= 1:
+            for chunk in chunks:
+                yield chunk, validate_chunk(*chunk)
+            return
+        first_bad = self.context.Value("q", NO_FAILURE)
+        with ProcessPoolExecutor(self.workers, mp_context=self.context,
+                                 initializer=_init_worker, initargs=(first_bad,)) as executor:
+            in_flight = deque()  # (구간, future), 제출 순서
+            try:
+                for chunk in chunks:
+                    in_flight.append((chunk, executor.submit(validate_chunk, *chunk)))
+                    if len(in_flight) >= self.workers * 2:
+                        chunk, future = in_flight.popleft()
+                        yield chunk, future.result()
+                while in_flight:
+                    chunk, future = in_flight.popleft()
+                    yield chunk, future.result()
+            finally:
+                # 소비하는 쪽이 실패로 멈추면 남은 구간은 취소
+                for _, future in in_flight:
+                    future.cancel()
+
+    def _chunks(self, anchor, iterator, retarget, confirmed=None):
+        """(시작 위치, 직전 인덱스, 직전 해시, 레코드 목록, 직전 타임스탬프 목록) 구간 생성
+
+        목표값이 규칙과 다르거나 보상이 아닌 트랜잭션이 다시 포함된 블록을 만나면 그 앞까지만 구간으로
+        내보내고 멈춘다. 직전 타임스탬프는 retarget 이 있으면 기준 블록까지의 창에서, 없으면 기준 블록
+        하나에서 시작한다.
+        """
+        start = 1
+        previous_index, previous_hash = anchor.index, anchor.hash
+        recent = deque(retarget.recent_timestamps() if retarget is not None else [anchor.timestamp],
+                       maxlen=MEDIAN_TIME_SPAN)
+        before = list(recent)
+        records = []
+        included = set()  # 검증 구간에 포함된 보상이 아닌 트랜잭션의 txid
+        for block in iterator:
+            if retarget is not None:
+                if block.target != retarget.next_target():
+                    self._rule_failure = (start + len(records), "목표값이 난이도 재조정 규칙과 다름")
+                    break
+                retarget.push(block.timestamp, target_work(block.target))
+            if not self._include_transactions(block, included, confirmed):
+                self._rule_failure = (start + len(records), "이미 포함된 트랜잭션이 다시 포함됨")
+                break
+            records.append(block_record(block))
+            recent.append(block.timestamp)
+            if len(records) == self.chunk_size:
+                yield start, previous_index, previous_hash, records, before
+                start += len(records)
+                previous_index, previous_hash = records[-1][0], records[-1][6]
+                records = []
+                before = list(recent)
+        if records:
+            yield start, previous_index, previous_hash, records, before
+
+    @staticmethod
+    def _include_transactions(block, included: set, confirmed) -> bool:
+        """블록의 보상이 아닌 txid 를 included 에 더함 (이미 있거나 확정된 txid 가 있으면 False)"""
+        for transaction in block.transactions:
+            if transaction.sender == "network":
+                continue
+            txid = transaction.txid
+            if txid in included or (confirmed is not None and confirmed(txid)):
+                return False
+            included.add(txid)
+        return True
+
+    def _validate_parallel(self, chunks) -> Optional[Tuple[int, str]]:
+        first_bad = self.context.Value("q", NO_FAILURE)
+        failures = []
+        with ProcessPoolExecutor(self.workers, mp_context=self.context,
+                                 initializer=_init_worker, initargs=(first_bad,)) as executor:
+            # 구간은 필요한 만큼만 만들어 제출 (디스크 체인 전체를 메모리에 올리지 않음)
+            in_flight = {}  # future -> 구간 시작 위치
+            for chunk in chunks:
+                if first_bad.value < chunk[0]:
+                    break
+                in_flight[executor.submit(validate_chunk, *chunk)] = chunk[0]
+                if len(in_flight) >= self.workers * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del in_flight[future]
+                        if future.result():
+                            failures.append(future.result())
+            # 실패 위치보다 뒤에서 시작하는 구간은 결과가 필요 없으므로 취소
+            for future, start in in_flight.items():
+                if first_bad.value < start:
+                    future.cancel()
+            for future in in_flight:
+                if not future.cancelled() and future.result():
+                    failures.append(future.result())
+        return min(failures) if failures else None
@@ -0,0 +1,104 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+from transaction import Transaction
+from metrics import REGISTRY
+from wallet.crypto import CryptoHandler
+
+log = logging.getLogger(__name__)
+
+VERIFY_SECONDS = REGISTRY.histogram("blockchain_signature_verify_seconds", "트랜잭션 서명 검증 지연 (초)")
+VERIFIED = REGISTRY.counter("blockchain_signatures_verified_total", "서명을 검증한 트랜잭션 수 (결과별)",
+                            ("result",))
+
+
+def verify_transaction_signature(transaction: Transaction) -> bool:
+    """트랜잭션에 포함된 공개키로 서명 검증 (공개키가 보내는 주소의 키가 아니면 실패)"""
+    if not transaction.signature or not transaction.public_key:
+        return False
+    public_key = transaction.public_key.encode()
+    if not key_matches_sender(public_key, transaction.sender):
+        return False
+    return verify_signature(public_key, transaction.signing_message(), transaction.signature)
+
+
+def key_matches_sender(public_key: bytes, sender: str) -> bool:
+    """공개키에서 나온 주소가 보내는 주소와 같은지 (다른 키로 남의 주소에서 보내는 것을 막음)"""
+    try:
+        return CryptoHandler.get_address_from_public_key(public_key) == sender
+    except TypeError:
+        return False
+
+
+def verify_signature(public_key: bytes, message: str, signature: str) -> bool:
+    """CryptoHandler.verify_signature 에 검증 지연과 결과 지표를 더함"""
+    started = time.perf_counter()
+    valid = CryptoHandler.verify_signature(public_key, message, signature)
+    VERIFY_SECONDS.observe(time.perf_counter() - started)
+    VERIFIED.inc(1, "valid" if valid else "invalid")
+    return valid
+
+
+class SignatureVerifier:
+    """수신 트랜잭션을 배치로 모아 스레드 풀에서 서명을 검증하는 파이프라인
+
+    cryptography 의 RSA 검증은 GIL 을 놓고 실행되므로 스레드 풀로도 코어 수만큼 병렬화된다.
+    검증에 성공한 트랜잭션만 제출 시 받은 콜백으로 전달한다.
+    """
+
+    def __init__(self, workers: Optional[int] = None, batch_size: int = 64, max_delay: float = 0.01):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verify")
+        self.batch_size = batch_size
+        self.max_delay = max_delay  # 배치를 채우기 위해 기다리는 최대 시간 (초)
+        self.queue: "queue.Queue[Optional[Tuple[Transaction, Callable]]]" = queue.Queue()
+        self.verified = 0
+        self.rejected = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, transaction: Transaction, on_verified: Callable[[Transaction], None]):
+        self.queue.put((transaction, on_verified))
+
+    def verify_batch(self, transactions: List[Transaction]) -> List[bool]:
+        return list(self.executor.map(verify_transaction_signature, transactions))
+
+    def _next_batch(self) -> Optional[List[Tuple[Transaction, Callable]]]:
+        item = self.queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # 종료 신호는 현재 배치를 처리한 뒤 반영
+                self.queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            results = self.verify_batch([transaction for transaction, _ in batch])
+            for (transaction, on_verified), valid in zip(batch, results):
+                if valid:
+                    self.verified += 1
+                    on_verified(transaction)
+                else:
+                    self.rejected += 1
+                    log.warning("서명 검증 실패로 트랜잭션 거부: %s", transaction)
+
+    def close(self):
+        self.queue.put(None)
+        self._thread.join()
+        self.executor.shutdown()
@@ -2,9 +2,58 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import serialization
 from cryptography.fernet import Fernet
+from collections import OrderedDict
+import threading
+import hashlib
 import base64
+import logging
+
+log = logging.getLogger(__name__)
+
+class KeyCache:
+    """PEM 바이트의 SHA-256 을 키로 파싱된 키 객체를 보관하는 LRU 캐시"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, pem, loader):
+        fingerprint = hashlib.sha256(pem).digest()
+        with self._lock:
+            key = self._entries.get(fingerprint)
+            if key is not None:
+                self.hits += 1
+                self._entries.move_to_end(fingerprint)
+                return key
+            self.misses += 1
+
+        # 파싱은 잠금 밖에서 수행 (동시에 같은 키를 파싱해도 결과는 동일)
+        key = loader(pem)
+        with self._lock:
+            self._entries[fingerprint] = key
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return key
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
 
 class CryptoHandler:
+    # 같은 주소가 반복해서 서명/검증할 때 PEM 파싱을 건너뛰기 위한 캐시
+    public_key_cache = KeyCache()
+    private_key_cache = KeyCache(maxsize=64)
+
     @staticmethod
     def generate_keypair():
         # RSA 키페어 생성
@@ -36,13 +85,19 @@ class CryptoHandler:
         hash_result = digest.finalize()
         return base64.b64encode(hash_result).decode('utf-8')[:40]
     
+    @staticmethod
+    def load_public_key(public_key):
+        return CryptoHandler.public_key_cache.get_or_load(public_key, serialization.load_pem_public_key)
+
+    @staticmethod
+    def load_private_key(private_key):
+        return CryptoHandler.private_key_cache.get_or_load(
+            private_key, lambda pem: serialization.load_pem_private_key(pem, password=None))
+
     @staticmethod
     def sign_message(private_key, message):
         # 메시지 서명
-        private_key = serialization.load_pem_private_key(
-            private_key,
-            password=None
-        )
+        private_key = CryptoHandler.load_private_key(private_key)
         
         signature = private_key.sign(
             message.encode(),
@@ -57,8 +112,7 @@ class CryptoHandler:
     @staticmethod
     def verify_signature(public_key, message, signature):
         try:
-            print(f"검증 시도 - 메시지: {message}")  # 디버깅용
-            public_key = serialization.load_pem_public_key(public_key)
+            public_key = CryptoHandler.load_public_key(public_key)
             signature = base64.b64decode(signature)
             
             public_key.verify(
@@ -72,5 +126,5 @@ class CryptoHandler:
             )
             return True
         except Exception as e:
-            print(f"서명 검증 실패 상세: {str(e)}")  # 디버깅용
+            log.debug("서명 검증 실패 상세: %s", e)
             return False 
\ No newline at end of file
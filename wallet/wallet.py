@@ -1,7 +1,10 @@
 import json
+import logging
 from .crypto import CryptoHandler
 import os
 
+log = logging.getLogger(__name__)
+
 class Wallet:
     def __init__(self):
         self.private_key = None
@@ -47,7 +50,7 @@ class Wallet:
             self.public_key = wallet_data["public_key"].encode()
             self.address = wallet_data["address"]
         except Exception as e:
-            print(f"월렛 로드 오류: {str(e)}")  # 디버깅용
+            log.error("월렛 로드 오류: %s", e)
             raise e
         
     def sign_transaction(self, message):